@@ -0,0 +1,135 @@
+"""
+Numeric result records for stock analysis.
+
+Analysis code returns these records, and values are formatted into strings
+only where they are shown to a person or a model (see the format methods).
+For scans over many tickers, to_array() packs results into a NumPy
+structured array that can be sorted, filtered and saved column-wise.
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+# Indicator fields, with the labels used by the display dictionaries.
+INDICATOR_LABELS = {
+    "ma50": "50-Day MA",
+    "ma200": "200-Day MA",
+    "rsi": "RSI (14)",
+    "macd": "MACD",
+    "signal": "Signal Line",
+    "bollinger_upper": "Bollinger Upper",
+    "bollinger_lower": "Bollinger Lower",
+    "obv": "OBV",
+    "stochastic": "Stochastic Oscillator",
+}
+
+NO_DATA = "Data not available"
+FAILED = "Analysis failed"
+
+
+@dataclass(slots=True)
+class IndicatorValues:
+    """The latest value of each technical indicator."""
+    ma50: float
+    ma200: float
+    rsi: float
+    macd: float
+    signal: float
+    bollinger_upper: float
+    bollinger_lower: float
+    obv: float
+    stochastic: float
+
+    @classmethod
+    def from_mapping(cls, values):
+        """Builds the record from a mapping with (at least) the indicator field names."""
+        return cls(**{name: float(values[name]) for name in INDICATOR_LABELS})
+
+    def by_label(self):
+        """Returns {display label: value}, e.g. {"50-Day MA": 123.45, ...}."""
+        return {label: getattr(self, name) for name, label in INDICATOR_LABELS.items()}
+
+    def format(self):
+        """Returns the display dictionary of formatted strings."""
+        formatted = {label: f"{value:.2f}" for label, value in self.by_label().items()}
+        formatted["OBV"] = f"{self.obv:,.0f}"
+        return formatted
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """
+    The analysis of one ticker. `confidence` is a percentage from 0 to 100, or
+    NaN if it could not be computed. `indicators` is None, and `error` says
+    why, when no technical data was available.
+    """
+    ticker: str
+    confidence: float = math.nan
+    indicators: Optional[IndicatorValues] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        """True if both the confidence score and the indicators are available."""
+        return self.indicators is not None and not math.isnan(self.confidence)
+
+    def format_confidence(self):
+        return "N/A" if math.isnan(self.confidence) else f"{self.confidence:.2f}%"
+
+    def format(self):
+        """Returns the display dictionary produced by trader.analyze_watchlist()."""
+        return {
+            "Technical Indicators": self.indicators.format() if self.indicators is not None else (self.error or NO_DATA),
+            "Confidence Score": self.format_confidence(),
+        }
+
+
+@dataclass(slots=True)
+class SellPrices:
+    """The stop-loss and take-profit prices for a position."""
+    stop_loss: float
+    take_profit: float
+
+    def format(self):
+        return {
+            "stop_loss": f"{self.stop_loss:.2f}",
+            "take_profit": f"{self.take_profit:.2f}",
+        }
+
+
+def result_dtype(ticker_length=16):
+    import numpy as np
+
+    return np.dtype([("ticker", f"U{ticker_length}"), ("confidence", "f8"), ("has_indicators", "?")] +
+                    [(name, "f8") for name in INDICATOR_LABELS])
+
+
+def to_array(results, ticker_length=16):
+    """
+    Packs AnalysisResults into a structured array with a ticker column, a
+    confidence column, a has_indicators flag and one column per indicator
+    (NaN where unavailable).
+    """
+    import numpy as np
+
+    results = list(results)
+    array = np.zeros(len(results), dtype=result_dtype(ticker_length))
+    array["ticker"] = [result.ticker for result in results]
+    array["confidence"] = [result.confidence for result in results]
+    array["has_indicators"] = [result.indicators is not None for result in results]
+    for name in INDICATOR_LABELS:
+        array[name] = [getattr(result.indicators, name) if result.indicators is not None else np.nan
+                       for result in results]
+    return array
+
+
+def from_array(array):
+    """Unpacks a structured array written by to_array() into AnalysisResults."""
+    results = []
+    for row in array:
+        indicators = None
+        if row["has_indicators"]:
+            indicators = IndicatorValues(**{name: float(row[name]) for name in INDICATOR_LABELS})
+        results.append(AnalysisResult(str(row["ticker"]), float(row["confidence"]), indicators,
+                                      None if indicators is not None else NO_DATA))
+    return results
@@ -0,0 +1,279 @@
+import numpy as np
+import pandas as pd
+
+from stock_analyzer import STOP_LOSS_MULTIPLIER, TAKE_PROFIT_MULTIPLIER
+from technical_indicators import (
+    calculate_moving_average,
+    calculate_rsi,
+    calculate_macd,
+    calculate_bollinger_bands,
+    calculate_stochastic_oscillator,
+)
+
+# Initial number of bars scanned per exit search; doubled for trades still open.
+EXIT_SCAN_WIDTH = 16
+MAX_EXIT_SCAN_WIDTH = 4096
+
+
+def compute_signals(panel, ma_short=50, ma_long=200, rsi_window=14, rsi_lower=30, rsi_upper=70,
+                    macd_filter=False, macd_fast=12, macd_slow=26, macd_signal=9,
+                    bollinger_filter=False, bollinger_window=20, num_std_dev=2,
+                    stochastic_max=None, stochastic_window=14):
+    """
+    Evaluates the technical rules of StockAnalyzer.get_confidence_score() on
+    every bar of every ticker at once: the short MA is above the long MA and
+    the RSI lies strictly between its bounds. Optional confirmation filters
+    can additionally require the MACD above its signal line, the close below
+    the upper Bollinger Band, or the stochastic oscillator below a ceiling.
+
+    Args:
+        panel (pd.DataFrame): A wide panel with (field, ticker) MultiIndex columns,
+            or any mapping from field name to a (date x ticker) DataFrame.
+        ma_short (int): The short moving-average window.
+        ma_long (int): The long moving-average window.
+        rsi_window (int): The number of periods for the RSI.
+        rsi_lower (float): The exclusive lower RSI bound.
+        rsi_upper (float): The exclusive upper RSI bound.
+        macd_filter (bool): Require the MACD line above its signal line.
+        macd_fast, macd_slow, macd_signal (int): The MACD spans.
+        bollinger_filter (bool): Require the close below the upper Bollinger Band.
+        bollinger_window (int): The number of periods for the Bollinger Bands.
+        num_std_dev (float): The number of standard deviations for the bands.
+        stochastic_max (float): If set, require the stochastic oscillator below it.
+        stochastic_window (int): The number of periods for the stochastic oscillator.
+
+    Returns:
+        pd.DataFrame: A boolean (date x ticker) entry-signal frame.
+    """
+    short_ma = calculate_moving_average(panel, ma_short)
+    long_ma = calculate_moving_average(panel, ma_long)
+    rsi = calculate_rsi(panel, rsi_window)
+    signals = (short_ma > long_ma) & (rsi > rsi_lower) & (rsi < rsi_upper)
+    if macd_filter:
+        macd, signal_line, _ = calculate_macd(panel, slow=macd_slow, fast=macd_fast, signal=macd_signal)
+        signals &= macd > signal_line
+    if bollinger_filter:
+        upper_band, _, _ = calculate_bollinger_bands(panel, window=bollinger_window, num_std_dev=num_std_dev)
+        signals &= panel['Close'] < upper_band
+    if stochastic_max is not None:
+        signals &= calculate_stochastic_oscillator(panel, window=stochastic_window) < stochastic_max
+    return signals
+
+
+def _next_true_index(signals):
+    """For every (bar, column), the index of the next True at or after that bar, or T."""
+    bars = signals.shape[0]
+    index = np.where(signals, np.arange(bars)[:, None], bars)
+    following = np.minimum.accumulate(index[::-1], axis=0)[::-1]
+    return np.vstack([following, np.full((1, signals.shape[1]), bars)])
+
+
+def _find_exit_bars(low, high, entry_bars, columns, stop, target, max_holding):
+    """
+    Finds, for a batch of open trades, the first bar after entry whose range
+    touches the stop or the target. All trades are scanned together over
+    blocks of bars whose width doubles while trades remain open.
+
+    Returns:
+        tuple: The exit bar of each trade, and whether it was forced by the end
+        of data or by `max_holding` rather than by a price level.
+    """
+    bars = low.shape[0]
+    last_bar = np.full(len(entry_bars), bars - 1)
+    if max_holding is not None:
+        last_bar = np.minimum(last_bar, entry_bars + max_holding)
+
+    exit_bars = last_bar.copy()
+    forced = np.ones(len(entry_bars), dtype=bool)
+    position = entry_bars + 1
+    pending = np.flatnonzero(position <= last_bar)
+    width = EXIT_SCAN_WIDTH
+    while pending.size:
+        rows = position[pending, None] + np.arange(width)
+        in_range = rows <= last_bar[pending, None]
+        rows = np.minimum(rows, bars - 1)
+        cols = columns[pending, None]
+        with np.errstate(invalid="ignore"):
+            hit = in_range & ((low[rows, cols] <= stop[pending, None]) |
+                              (high[rows, cols] >= target[pending, None]))
+        found = hit.any(axis=1)
+        resolved = pending[found]
+        exit_bars[resolved] = position[resolved] + hit[found].argmax(axis=1)
+        forced[resolved] = False
+
+        still_open = ~found & in_range[:, -1]
+        pending = pending[still_open]
+        position[pending] += width
+        pending = pending[position[pending] <= last_bar[pending]]
+        width = min(width * 2, MAX_EXIT_SCAN_WIDTH)
+    return exit_bars, forced
+
+
+def _exit_prices(open_, low, high, close, exit_bars, columns, stop, target, forced, max_holding):
+    """Prices and reasons for each exit, honoring gaps through the stop or target at the open."""
+    o = open_[exit_bars, columns]
+    touched_stop = low[exit_bars, columns] <= stop
+    prices = np.where(forced, close[exit_bars, columns], 0.0)
+    reasons = np.where(forced, "end", "").astype(object)
+    if max_holding is not None:
+        reasons[forced & (exit_bars < open_.shape[0] - 1)] = "time"
+
+    # A gap past either level fills at the open; otherwise the stop is assumed
+    # to trigger first when a bar touches both levels.
+    gap_up = ~forced & (o >= target)
+    gap_down = ~forced & ~gap_up & (o <= stop)
+    stopped = ~forced & ~gap_up & ~gap_down & touched_stop
+    targeted = ~forced & ~gap_up & ~gap_down & ~touched_stop
+    prices[gap_up] = o[gap_up]
+    prices[gap_down] = o[gap_down]
+    prices[stopped] = stop[stopped]
+    prices[targeted] = target[targeted]
+    reasons[gap_up | targeted] = "target"
+    reasons[gap_down | stopped] = "stop"
+    return prices, reasons
+
+
+def simulate_trades(panel, signals, stop_loss=STOP_LOSS_MULTIPLIER, take_profit=TAKE_PROFIT_MULTIPLIER,
+                    max_holding=None):
+    """
+    Replays the entry signals with fixed stop-loss and take-profit exits.
+
+    Each ticker holds at most one position. A position is opened at the close
+    of a signal bar and closed at the first later bar that reaches the stop or
+    the target, after `max_holding` bars, or at the end of the data. The next
+    position can open from the bar after an exit. Trades are resolved for all
+    tickers together, one trade per ticker per round, using array operations.
+
+    Args:
+        panel (pd.DataFrame): A wide panel with (field, ticker) MultiIndex columns.
+        signals (pd.DataFrame): A boolean (date x ticker) entry-signal frame.
+        stop_loss (float): The stop price as a multiple of the entry price.
+        take_profit (float): The target price as a multiple of the entry price.
+        max_holding (int): The maximum number of bars a position is held.
+
+    Returns:
+        pd.DataFrame: One row per trade.
+    """
+    tickers = list(signals.columns)
+    fields = {field: panel[field].reindex(columns=tickers).to_numpy(dtype=float)
+              for field in ("Open", "High", "Low", "Close")}
+    open_, high, low, close = fields["Open"], fields["High"], fields["Low"], fields["Close"]
+    # Forced exits of tickers whose data stops early fill at their last close.
+    last_close = pd.DataFrame(close).ffill().to_numpy()
+    entry_allowed = signals.to_numpy(dtype=bool) & ~np.isnan(close)
+    next_signal = _next_true_index(entry_allowed)
+    bars = close.shape[0]
+
+    start = np.zeros(len(tickers), dtype=int)
+    active = np.arange(len(tickers))
+    rounds = []
+    while active.size:
+        entry_bars = next_signal[start[active], active]
+        tradable = entry_bars < bars - 1
+        active, entry_bars = active[tradable], entry_bars[tradable]
+        if not active.size:
+            break
+
+        entry_prices = close[entry_bars, active]
+        stop = entry_prices * stop_loss
+        target = entry_prices * take_profit
+        exit_bars, forced = _find_exit_bars(low, high, entry_bars, active, stop, target, max_holding)
+        exit_prices, reasons = _exit_prices(open_, low, high, last_close, exit_bars, active, stop, target,
+                                            forced, max_holding)
+        rounds.append((active, entry_bars, entry_prices, exit_bars, exit_prices, reasons))
+        start[active] = exit_bars + 1
+        active = active[start[active] < bars]
+
+    if not rounds:
+        return pd.DataFrame(columns=["ticker", "entry_date", "entry_price", "exit_date", "exit_price",
+                                     "exit_reason", "bars_held", "return"])
+
+    columns, entry_bars, entry_prices, exit_bars, exit_prices, reasons = (
+        np.concatenate(parts) for parts in zip(*rounds))
+    dates = signals.index
+    trades = pd.DataFrame({
+        "ticker": np.asarray(tickers, dtype=object)[columns],
+        "entry_date": dates[entry_bars],
+        "entry_price": entry_prices,
+        "exit_date": dates[exit_bars],
+        "exit_price": exit_prices,
+        "exit_reason": reasons,
+        "bars_held": exit_bars - entry_bars,
+        "return": exit_prices / entry_prices - 1,
+    })
+    return trades.sort_values(["ticker", "entry_date"], kind="stable").reset_index(drop=True)
+
+
+def summarize_trades(trades):
+    """
+    Computes aggregate statistics for a set of trades.
+
+    Returns:
+        dict: Trade count, win rate, mean/median return, profit factor,
+        compounded return, average holding period and exit reason counts.
+    """
+    returns = trades["return"].to_numpy(dtype=float)
+    if not len(returns):
+        return {"trades": 0}
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+    return {
+        "trades": len(returns),
+        "win_rate": float((returns > 0).mean()),
+        "mean_return": float(returns.mean()),
+        "median_return": float(np.median(returns)),
+        "best_return": float(returns.max()),
+        "worst_return": float(returns.min()),
+        "profit_factor": float(gains / losses) if losses else float("inf"),
+        "compounded_return": float(np.prod(1 + returns) - 1),
+        "mean_bars_held": float(trades["bars_held"].mean()),
+        "exit_reasons": trades["exit_reason"].value_counts().to_dict(),
+    }
+
+
+def run_backtest(panel, stop_loss=STOP_LOSS_MULTIPLIER, take_profit=TAKE_PROFIT_MULTIPLIER,
+                 max_holding=None, **signal_params):
+    """
+    Backtests the confidence-score technical rules with stop-loss and
+    take-profit exits over every ticker of a price panel.
+
+    The fundamental half of the confidence score is not replayed, since
+    yfinance only reports current fundamentals. Extra keyword arguments are
+    forwarded to compute_signals().
+
+    Returns:
+        dict: "trades" (one row per trade), "by_ticker" (per-ticker statistics)
+        and "summary" (aggregate statistics).
+    """
+    signals = compute_signals(panel, **signal_params)
+    trades = simulate_trades(panel, signals, stop_loss=stop_loss, take_profit=take_profit,
+                             max_holding=max_holding)
+    by_ticker = trades.groupby("ticker")["return"].agg(
+        trades="count",
+        win_rate=lambda r: (r > 0).mean(),
+        mean_return="mean",
+        compounded_return=lambda r: (1 + r).prod() - 1,
+    )
+    return {"trades": trades, "by_ticker": by_ticker, "summary": summarize_trades(trades)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from tabulate import tabulate
+
+    from batch_analyzer import download_panel
+
+    parser = argparse.ArgumentParser(description="Backtest the confidence-score strategy")
+    parser.add_argument("tickers", nargs="+", help="Ticker symbols to backtest")
+    parser.add_argument("--period", default="10y", help="History to replay (default: 10y)")
+    parser.add_argument("--stop-loss", type=float, default=STOP_LOSS_MULTIPLIER)
+    parser.add_argument("--take-profit", type=float, default=TAKE_PROFIT_MULTIPLIER)
+    parser.add_argument("--max-holding", type=int, default=None, help="Maximum bars per trade")
+    args = parser.parse_args()
+
+    results = run_backtest(download_panel(args.tickers, period=args.period), stop_loss=args.stop_loss,
+                           take_profit=args.take_profit, max_holding=args.max_holding)
+    print(tabulate(results["by_ticker"], headers="keys", tablefmt="grid", floatfmt=".3f"))
+    for key, value in results["summary"].items():
+        print(f"- {key}: {value}")
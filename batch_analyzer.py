@@ -0,0 +1,125 @@
+import pandas as pd
+import yfinance as yf
+
+from history_cache import get_default_cache
+from instrumentation import instrumented
+from analysis_records import AnalysisResult, FAILED, IndicatorValues, NO_DATA
+from stock_analyzer import confidence_score
+from technical_indicators import (
+    calculate_moving_average,
+    calculate_rsi,
+    calculate_macd,
+    calculate_bollinger_bands,
+    calculate_obv,
+    calculate_stochastic_oscillator,
+)
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+@instrumented("yfinance.download")
+def download_panel(tickers, period="1y", interval="1d"):
+    """
+    Downloads OHLCV history for all tickers in a single bulk request.
+
+    Returns:
+        pd.DataFrame: A wide panel with (field, ticker) MultiIndex columns.
+    """
+    data = yf.download(tickers=list(tickers), period=period, interval=interval,
+                       group_by="column", auto_adjust=True, progress=False, threads=True)
+    if not isinstance(data.columns, pd.MultiIndex):
+        data.columns = pd.MultiIndex.from_product([data.columns, [tickers[0]]])
+    return data
+
+
+def latest_indicator_values(panel):
+    """
+    Computes the indicator set for every ticker column of a (field, ticker)
+    panel in vectorized operations and returns the latest value of each.
+
+    Args:
+        panel (pd.DataFrame): A wide panel with (field, ticker) MultiIndex columns.
+
+    Returns:
+        pd.DataFrame: One row per ticker with the ma50, ma200, rsi, macd, signal,
+        bollinger_upper, bollinger_lower, obv and stochastic columns.
+    """
+    macd, signal_line, _ = calculate_macd(panel)
+    upper_band, _, lower_band = calculate_bollinger_bands(panel)
+    return pd.DataFrame({
+        "ma50": calculate_moving_average(panel, 50).iloc[-1],
+        "ma200": calculate_moving_average(panel, 200).iloc[-1],
+        "rsi": calculate_rsi(panel).iloc[-1],
+        "macd": macd.iloc[-1],
+        "signal": signal_line.iloc[-1],
+        "bollinger_upper": upper_band.iloc[-1],
+        "bollinger_lower": lower_band.iloc[-1],
+        "obv": calculate_obv(panel).iloc[-1],
+        "stochastic": calculate_stochastic_oscillator(panel).iloc[-1],
+    })
+
+
+def _ticker_history(panel, ticker):
+    hist = panel.xs(ticker, axis=1, level=1)[FIELDS]
+    return hist.dropna(subset=["Close"])
+
+
+def analyze_batch(tickers, period="1y", cache=None, panel_fetcher=None):
+    """
+    Analyzes a list of tickers from one bulk download, producing the same
+    per-ticker result dictionaries as trader.analyze_watchlist().
+    """
+    results = analyze_batch_records(tickers, period=period, cache=cache, panel_fetcher=panel_fetcher)
+    return {ticker: result.format() for ticker, result in results.items()}
+
+
+def analyze_batch_records(tickers, period="1y", cache=None, panel_fetcher=None):
+    """
+    Analyzes a list of tickers from one bulk download, returning an
+    AnalysisResult per ticker, matching StockAnalyzer.analyze().
+
+    Tickers whose closes have gaps inside the panel (e.g. a trading halt, or
+    a listing on a different calendar) are recomputed on their own history so
+    that the results match StockAnalyzer exactly. Each ticker's history is also
+    seeded into the cache, so later StockAnalyzer calls do not download again.
+    """
+    cache = cache if cache is not None else get_default_cache()
+    panel_fetcher = panel_fetcher or download_panel
+    panel = panel_fetcher(tickers, period=period)
+
+    close = panel["Close"].reindex(columns=tickers)
+    started = close.notna().cummax()
+    has_gaps = (close.isna() & started).any()
+    empty = ~close.notna().any()
+    aligned = [t for t in tickers if not has_gaps[t] and not empty[t]]
+
+    values = {}
+    if aligned:
+        sub_panel = panel.loc[:, pd.IndexSlice[FIELDS, aligned]].dropna(how="all")
+        values.update(latest_indicator_values(sub_panel).to_dict("index"))
+
+    results = {}
+    for ticker in tickers:
+        hist = _ticker_history(panel, ticker) if not empty[ticker] else pd.DataFrame(columns=FIELDS)
+        cache.history.set((ticker.upper(), period, "1d"), hist)
+        if ticker not in values and not hist.empty:
+            single = pd.concat({ticker: hist}, axis=1).swaplevel(axis=1)
+            values[ticker] = latest_indicator_values(single).iloc[0].to_dict()
+
+        try:
+            info = cache.get_info(ticker)
+        except Exception as e:
+            results[ticker] = AnalysisResult(ticker, error=f"{FAILED}: {e}")
+            print(f"  - Analysis for {ticker}: Error ({e})")
+            continue
+
+        if ticker in values:
+            indicators = IndicatorValues.from_mapping(values[ticker])
+            confidence = confidence_score(info, indicators.ma50, indicators.ma200, indicators.rsi)
+            results[ticker] = AnalysisResult(ticker, confidence, indicators)
+            print(f"  - Analysis for {ticker}: Success")
+        else:
+            results[ticker] = AnalysisResult(ticker, error=NO_DATA)
+            print(f"  - Analysis for {ticker}: Failed (Insufficient data)")
+
+    return results
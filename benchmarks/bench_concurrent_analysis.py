@@ -0,0 +1,88 @@
+"""
+Compares the sequential step-2 loop of trader.py against its analysis pipeline
+using a fake data provider with injected network latency.
+
+Usage:
+    python -m benchmarks.bench_concurrent_analysis [--tickers 25] [--latency 0.2] [--workers 8]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import history_cache
+from history_cache import HistoryCache
+from trader import analyze_candidate, build_analysis_pipeline, is_qualified_candidate
+
+INFO = {"trailingPE": 20, "forwardPE": 18, "dividendYield": 0.01}
+
+
+def make_fake_cache(latency, jitter, seed=0):
+    """Builds a HistoryCache whose fetchers sleep to simulate yfinance round-trips."""
+    rng = random.Random(seed)
+    dates = pd.date_range("2024-01-01", periods=260, freq="B")
+
+    def delay():
+        time.sleep(max(0.0, latency + rng.uniform(-jitter, jitter)))
+
+    def history_fetcher(ticker, period, interval):
+        delay()
+        walk = np.random.default_rng(zlib.crc32(ticker.encode())).normal(0.05, 1, len(dates))
+        close = 100 + np.cumsum(walk)
+        return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1,
+                             "Close": close, "Volume": 1_000_000.0}, index=dates)
+
+    def info_fetcher(ticker):
+        delay()
+        return INFO
+
+    return HistoryCache(history_fetcher=history_fetcher, info_fetcher=info_fetcher)
+
+
+def run_sequential(tickers):
+    found = 0
+    for ticker in tickers:
+        if found >= 5:
+            break
+        if is_qualified_candidate(analyze_candidate(ticker)):
+            found += 1
+    return found
+
+
+def run_concurrent(tickers, workers, rate):
+    # Live prices are not part of the sequential loop, so that stage is a no-op here.
+    pipeline = build_analysis_pipeline(tickers, max_stocks=5, workers=workers, rate=rate,
+                                       price_fetcher=lambda ticker: 0.0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = pipeline.run_sync()
+    return len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=None)
+    args = parser.parse_args()
+
+    tickers = [f"T{i:03d}" for i in range(args.tickers)]
+    timings = {}
+    for name, runner in (("sequential", lambda: run_sequential(tickers)),
+                         ("concurrent", lambda: run_concurrent(tickers, args.workers, args.rate))):
+        history_cache.set_default_cache(make_fake_cache(args.latency, args.jitter))
+        start = time.perf_counter()
+        found = runner()
+        timings[name] = time.perf_counter() - start
+        print(f"{name:>10}: {timings[name]:7.3f}s  ({found} qualifying tickers)")
+    print(f"   speedup: {timings['sequential'] / timings['concurrent']:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Measures CLI startup cost with `python -X importtime`.
+
+Each scenario runs in a fresh interpreter several times. The report gives
+the median wall time, the import time attributed to each top-level import
+(imports made by `site` at interpreter start are left out), the heaviest
+modules, and any heavy dependency a scenario should not have loaded.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5] [--top 10] [--max-ms 150]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("yfinance", "pandas", "numpy", "tabulate", "google.generativeai")
+
+# (name, python arguments, heavy modules the scenario may import)
+SCENARIOS = [
+    ("import trader", ["-c", "import trader"], ()),
+    ("import stock_analyzer", ["-c", "import stock_analyzer"], ()),
+    ("trader.py TICKER PRICE", ["trader.py", "AAPL", "150"], ()),
+    ("import batch_analyzer", ["-c", "import batch_analyzer"], ("yfinance", "pandas", "numpy")),
+]
+
+_LOADED_PROBE = "import atexit, sys; atexit.register(lambda: print('LOADED', *sorted(sys.modules), file=sys.stderr))"
+
+
+def parse_importtime(stderr):
+    """
+    Returns a list of (module, self_us, cumulative_us, depth) from
+    `-X importtime` output.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def top_level_import_us(rows):
+    """The import time, in microseconds, of the top-level imports made after interpreter startup."""
+    total = 0
+    seen_site = False
+    for name, _, cumulative, depth in rows:
+        if depth != 0:
+            continue
+        if name == "site":
+            seen_site = True
+            continue
+        if seen_site:
+            total += cumulative
+    return total
+
+
+def run_scenario(args, repeat):
+    walls, imports, rows = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                                capture_output=True, text=True)
+        walls.append(time.perf_counter() - start)
+        rows = parse_importtime(result.stderr)
+        imports.append(top_level_import_us(rows))
+
+    probe_args = ["-c", _LOADED_PROBE + "; " + args[1]] if args[0] == "-c" else \
+        ["-c", _LOADED_PROBE + f"; sys.argv = {args!r}; import runpy; runpy.run_path({args[0]!r}, run_name='__main__')"]
+    probe = subprocess.run([sys.executable, *probe_args], cwd=ROOT, capture_output=True, text=True)
+    loaded = set()
+    for line in probe.stderr.splitlines():
+        if line.startswith("LOADED "):
+            loaded = set(line.split()[1:])
+    return {
+        "wall_ms": statistics.median(walls) * 1e3,
+        "import_ms": statistics.median(imports) / 1e3,
+        "heaviest": sorted(rows, key=lambda row: row[1], reverse=True),
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in loaded],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CLI startup and import time.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario (the median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Number of heaviest modules listed per scenario")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Fail if a scenario that should stay light imports for longer than this")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, scenario_args, allowed in SCENARIOS:
+        result = run_scenario(scenario_args, args.repeat)
+        unexpected = [m for m in result["heavy_loaded"] if m not in allowed]
+        print(f"{name:<28} wall {result['wall_ms']:8.1f} ms   imports {result['import_ms']:8.1f} ms   "
+              f"heavy: {', '.join(result['heavy_loaded']) or '-'}")
+        for module, self_us, _, _ in result["heaviest"][:args.top]:
+            print(f"    {self_us / 1e3:8.2f} ms  {module}")
+        if unexpected:
+            print(f"  ! {name} unexpectedly imported {', '.join(unexpected)}")
+            failed = True
+        if args.max_ms is not None and not allowed and result["import_ms"] > args.max_ms:
+            print(f"  ! {name} spent {result['import_ms']:.1f} ms importing (limit {args.max_ms:.0f} ms)")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Offline benchmark suite for the indicator functions, StockAnalyzer, StockScreener
+and the GeminiClient response cache.
+
+Every case runs against seeded synthetic data and stubbed data sources, so no
+network access is needed and results are reproducible.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--quick] [--filter rsi]
+        [--output results.json] [--save-baseline baseline.json]
+        [--baseline baseline.json] [--threshold 0.2]
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import (
+    SIZES,
+    TICKER_COUNTS,
+    random_fundamentals,
+    random_walk_ohlcv,
+    random_walk_universe,
+    ticker_symbols,
+)
+from gemini_client import GeminiClient, ResponseCache, StubBackend
+from history_cache import HistoryCache
+from indicator_kernel import compute_indicators_from_frame
+from stock_analyzer import StockAnalyzer
+from stock_screener import StockScreener
+from technical_indicators import (
+    calculate_moving_average,
+    calculate_rsi,
+    calculate_macd,
+    calculate_bollinger_bands,
+    calculate_obv,
+    calculate_stochastic_oscillator,
+)
+
+QUICK_SIZES = ("1y_daily", "20y_daily", "1y_minute")
+QUICK_TICKER_COUNTS = (1, 10, 100)
+
+INDICATOR_FUNCTIONS = {
+    "moving_average_50": lambda data: calculate_moving_average(data, 50),
+    "moving_average_200": lambda data: calculate_moving_average(data, 200),
+    "rsi": calculate_rsi,
+    "macd": calculate_macd,
+    "bollinger_bands": calculate_bollinger_bands,
+    "obv": calculate_obv,
+    "stochastic_oscillator": calculate_stochastic_oscillator,
+    "kernel_full": lambda data: compute_indicators_from_frame(data, last_only=False),
+    "kernel_last_only": lambda data: compute_indicators_from_frame(data, last_only=True),
+}
+
+SCREEN_CRITERIA = {"market_cap": 10_000_000_000, "pe_ratio": 25, "dividend_yield": 0.01}
+
+
+def indicator_cases(size_names):
+    """Yields (name, unit, count, setup) for every indicator function and data size."""
+    for size_name in size_names:
+        bars = SIZES[size_name]
+        freq = "min" if "minute" in size_name else "B"
+        for func_name, func in INDICATOR_FUNCTIONS.items():
+            def setup(bars=bars, freq=freq, func=func):
+                data = random_walk_ohlcv(bars, seed=bars, freq=freq)
+                return lambda: func(data)
+            yield f"indicators.{func_name}[{size_name}]", "bars", bars, setup
+
+
+def _stub_cache(count):
+    histories = random_walk_universe(count, SIZES["1y_daily"])
+    return HistoryCache(history_fetcher=lambda ticker, period, interval: histories[ticker],
+                        info_fetcher=random_fundamentals, maxsize=2 * count)
+
+
+def analyzer_cases(ticker_counts):
+    """Yields StockAnalyzer cases over a warm cache, so only local work is timed."""
+    for count in ticker_counts:
+        for method in ("get_technical_indicators", "get_confidence_score"):
+            def setup(count=count, method=method):
+                cache = _stub_cache(count)
+                tickers = ticker_symbols(count)
+
+                def run():
+                    for ticker in tickers:
+                        getattr(StockAnalyzer(ticker, cache=cache), method)()
+                run()
+                return run
+            yield f"analyzer.{method}[{count}_tickers]", "tickers", count, setup
+
+
+def screener_cases(ticker_counts):
+    """Yields StockScreener.screen_stocks cases over stubbed fundamentals."""
+    for count in ticker_counts:
+        def setup(count=count):
+            cache = HistoryCache(info_fetcher=random_fundamentals, maxsize=2 * count)
+            screener = StockScreener(ticker_symbols(count), cache=cache)
+            screener.screen_stocks(SCREEN_CRITERIA)
+            return lambda: screener.screen_stocks(SCREEN_CRITERIA)
+        yield f"screener.screen_stocks[{count}_tickers]", "tickers", count, setup
+
+
+def gemini_cases():
+    """Yields GeminiClient cases over a stub backend: cached responses and uncached calls."""
+    prompts = [f"prompt {i}" for i in range(100)]
+    for cached in (True, False):
+        def setup(cached=cached):
+            directory = tempfile.TemporaryDirectory(prefix="bench_gemini_")
+            client = GeminiClient(backend=StubBackend(responses=str.upper),
+                                  cache=ResponseCache(directory.name, max_entries=len(prompts)))
+            client.directory = directory  # removed together with the client
+            return lambda: [client.generate(prompt, use_cache=cached) for prompt in prompts]
+        yield f"gemini.generate[{'cached' if cached else 'uncached'}]", "prompts", len(prompts), setup
+
+
+def measure(run, min_time=0.2, max_repeat=20):
+    """
+    Times `run` repeatedly until `min_time` seconds have been spent or
+    `max_repeat` runs have finished, and returns the fastest run in seconds.
+    """
+    timings = []
+    while len(timings) < max_repeat and sum(timings) < min_time:
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def peak_memory(run):
+    """Returns the peak traced allocation, in bytes, of a single run."""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(cases, name_filter=None, min_time=0.2):
+    results = {}
+    for name, unit, count, setup in cases:
+        if name_filter and name_filter not in name:
+            continue
+        run = setup()
+        seconds = measure(run, min_time=min_time)
+        peak = peak_memory(run)
+        results[name] = {
+            "seconds": seconds,
+            "throughput": count / seconds if seconds else float("inf"),
+            "unit": unit,
+            "peak_bytes": peak,
+        }
+        print(f"{name:<60} {seconds * 1e3:11.3f} ms {count / seconds:14,.0f} {unit}/s "
+              f"{peak / 2**20:9.1f} MiB", flush=True)
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """Returns (name, baseline_seconds, seconds) for every case slower than the baseline allows."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous and result["seconds"] > previous["seconds"] * (1 + threshold):
+            regressions.append((name, previous["seconds"], result["seconds"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for Trade_Analyzer.")
+    parser.add_argument("--quick", action="store_true", help="Skip the largest data sizes and ticker counts")
+    parser.add_argument("--filter", type=str, help="Only run cases whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds spent timing each case")
+    parser.add_argument("--output", type=str, help="Write the results to this JSON file")
+    parser.add_argument("--save-baseline", type=str, help="Write the results as a new baseline JSON file")
+    parser.add_argument("--baseline", type=str, help="Compare against a previously saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    size_names = QUICK_SIZES if args.quick else tuple(SIZES)
+    ticker_counts = QUICK_TICKER_COUNTS if args.quick else TICKER_COUNTS
+    cases = [*indicator_cases(size_names), *analyzer_cases(ticker_counts), *screener_cases(ticker_counts),
+             *gemini_cases()]
+
+    results = run_suite(cases, name_filter=args.filter, min_time=args.min_time)
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms "
+                  f"({after / before - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Seeded random-walk OHLCV and fundamentals generators for offline benchmarks
+and the tests.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_SESSION = 390
+SESSIONS_PER_YEAR = 252
+
+# Named bar counts, from one year of daily bars to twenty years of minute bars.
+SIZES = {
+    "1y_daily": SESSIONS_PER_YEAR,
+    "20y_daily": 20 * SESSIONS_PER_YEAR,
+    "1y_minute": SESSIONS_PER_YEAR * MINUTES_PER_SESSION,
+    "20y_minute": 20 * SESSIONS_PER_YEAR * MINUTES_PER_SESSION,
+}
+
+TICKER_COUNTS = (1, 10, 100, 1_000, 5_000)
+
+
+def random_walk_ohlcv(bars=None, seed=0, start_price=100.0, volatility=0.01, freq="B", start="2000-01-03",
+                      drift=0.0002, index=None):
+    """
+    Generates a geometric random walk with consistent OHLCV bars.
+
+    Args:
+        bars (int): The number of bars to generate.
+        seed (int): The random seed; the same seed always yields the same bars.
+        start_price (float): The first open.
+        volatility (float): The standard deviation of the per-bar log return.
+        freq (str): The pandas frequency of the DatetimeIndex ("B" or "min").
+        start (str): The first timestamp.
+        drift (float): The mean of the per-bar log return.
+        index (pd.DatetimeIndex): The timestamps of the bars, in place of `bars`,
+            `freq` and `start`.
+
+    Returns:
+        pd.DataFrame: A history()-shaped DataFrame.
+    """
+    if index is not None:
+        bars = len(index)
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(drift, volatility, bars)
+    close = start_price * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    wick = np.abs(rng.normal(0, volatility / 2, (2, bars)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(13, 0.5, bars).round()
+    if index is None:
+        index = pd.date_range(start, periods=bars, freq=freq)
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+                        index=index)
+
+
+def flat_stretch(frame, start, stop):
+    """
+    Returns a copy of a history()-shaped DataFrame whose bars `start` to `stop`
+    (positions) repeat the close of bar `start`, e.g. to exercise equal
+    closes and zero-loss RSI windows.
+    """
+    frame = frame.copy()
+    close = frame["Close"].iloc[start]
+    for field in ("Open", "High", "Low", "Close"):
+        frame.iloc[start:stop, frame.columns.get_loc(field)] = close
+    return frame
+
+
+def ticker_symbols(count):
+    """Returns `count` deterministic placeholder ticker symbols."""
+    return [f"SYN{i:04d}" for i in range(count)]
+
+
+def random_walk_universe(count, bars, seed=0, **kwargs):
+    """Generates one random walk per ticker, keyed by symbol; `kwargs` go to random_walk_ohlcv()."""
+    return {ticker: random_walk_ohlcv(bars, seed=seed + i, **kwargs)
+            for i, ticker in enumerate(ticker_symbols(count))}
+
+
+def random_walk_panel(count, bars, seed=0, **kwargs):
+    """Generates a (field, ticker) panel like the one batch_analyzer.download_panel() returns."""
+    universe = random_walk_universe(count, bars, seed=seed, **kwargs)
+    return universe_to_panel(universe)
+
+
+def universe_to_panel(universe):
+    """Combines {ticker: history} into a (field, ticker) panel."""
+    return pd.concat(universe, axis=1).swaplevel(axis=1).sort_index(axis=1)
+
+
+def random_fundamentals(ticker, seed=0):
+    """Generates a yfinance-style `info` dictionary for a ticker."""
+    rng = np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+    trailing_pe = float(rng.uniform(5, 60))
+    return {
+        "symbol": ticker,
+        "marketCap": float(rng.lognormal(23, 1.5)),
+        "trailingPE": trailing_pe,
+        "forwardPE": trailing_pe * float(rng.uniform(0.7, 1.2)),
+        "dividendYield": float(rng.choice([0.0, rng.uniform(0.005, 0.05)])),
+        "volume": float(rng.lognormal(14, 1)),
+        "averageVolume": float(rng.lognormal(14, 1)),
+        "beta": float(rng.uniform(0.3, 2.0)),
+    }
@@ -0,0 +1,38 @@
+"""
+Rate limiting for concurrent analysis.
+
+The thread-pool analysis runner that used to live here was replaced by the
+staged pipeline in trader.build_analysis_pipeline. What is left is the
+RateLimiter that pipeline uses to throttle its analysis stage across worker
+threads.
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket that allows `rate` acquisitions per second,
+    with bursts of up to `burst`.
+    """
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            self.sleep(wait_time)
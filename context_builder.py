@@ -0,0 +1,180 @@
+import math
+from datetime import datetime
+
+from analysis_records import AnalysisResult
+
+# Indicator keys as produced by StockAnalyzer.get_technical_indicators(), with
+# the column name used by the compact table and the decimals kept once values
+# are rounded to save tokens (None abbreviates large counts, e.g. "12.3M").
+INDICATOR_COLUMNS = [
+    ("50-Day MA", "MA50", 1),
+    ("200-Day MA", "MA200", 1),
+    ("RSI (14)", "RSI", 0),
+    ("MACD", "MACD", 1),
+    ("Signal Line", "Signal", 1),
+    ("Bollinger Upper", "BBUpper", 1),
+    ("Bollinger Lower", "BBLower", 1),
+    ("OBV", "OBV", None),
+    ("Stochastic Oscillator", "Stoch", 0),
+]
+
+# Indicators dropped, in this order, when the context exceeds its token budget.
+# The price, confidence score, moving averages and RSI are never dropped, as
+# the prompt's hard filters depend on them.
+DROP_ORDER = ["OBV", "Bollinger Lower", "Signal Line", "Stochastic Oscillator", "Bollinger Upper", "MACD"]
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimates the number of LLM tokens in a text, using the common rule of
+    thumb of about four characters per token for English and numbers.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _to_float(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").rstrip("%"))
+    except ValueError:
+        return None
+
+
+def _abbreviate(number):
+    for divisor, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(number) >= divisor:
+            return f"{number / divisor:.1f}{suffix}"
+    return f"{number:.0f}"
+
+
+def _format_value(value, decimals, rounded):
+    """Formats an indicator value, keeping pre-formatted strings unless rounding is requested."""
+    number = _to_float(value)
+    if number is None or (not rounded and isinstance(value, str)):
+        return str(value)
+    if decimals is None:
+        return _abbreviate(number) if rounded else f"{number:,.0f}"
+    return f"{number:.{decimals if rounded else 2}f}"
+
+
+def _analysis_fields(data):
+    """
+    Returns (confidence text, confidence number, indicators) for one ticker's
+    analysis, given either an AnalysisResult or a legacy display dictionary.
+    Indicators are a {label: value} dict, or the reason they are unavailable.
+    """
+    if isinstance(data, AnalysisResult):
+        confidence = None if math.isnan(data.confidence) else data.confidence
+        indicators = data.indicators.by_label() if data.indicators is not None else data.format()["Technical Indicators"]
+        return data.format_confidence(), confidence, indicators
+    text = data.get('Confidence Score', 'N/A')
+    return text, _to_float(text), data.get('Technical Indicators')
+
+
+class TradingContextBuilder:
+    """
+    Builds the context passed to the trade-plan prompt in a single pass.
+
+    The verbose format lists every indicator as "- key: value" lines, as
+    generate_trading_context() always has. The compact format emits one
+    pipe-separated row per ticker under a single header. With a token budget,
+    values are rounded and low-value indicators are dropped until the context
+    fits, and only then are tickers dropped from the end of the watchlist.
+    A RiskSummary (see risk.py) adds the portfolio's volatility, VaR and risk
+    contributions to the snapshot.
+    """
+    def __init__(self, compact=False, token_budget=None, nav=10000.00, cash=None, timestamp=None, risk=None):
+        self.compact = compact
+        self.token_budget = token_budget
+        self.nav = nav
+        self.cash = nav if cash is None else cash
+        self.risk = risk
+        self.timestamp = timestamp
+        self.estimated_tokens = 0
+        self.included = []
+
+    def _portfolio_lines(self, target_stocks, live_prices):
+        timestamp = self.timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if self.compact:
+            watchlist = ', '.join(target_stocks)
+        else:
+            watchlist = ', '.join(f"{ticker} (Current Price: ${live_prices.get(ticker, 0):.2f})"
+                                  for ticker in target_stocks)
+        cash_share = self.cash / self.nav * 100 if self.nav else 0
+        lines = [
+            f"PORTFOLIO SNAPSHOT (Timestamp: {timestamp} UTC)",
+            f"Net Asset Value (NAV): ${self.nav:,.2f}",
+            f"Cash: ${self.cash:,.2f} ({cash_share:.0f}%)",
+        ]
+        if self.risk is not None:
+            lines += self.risk.format_lines(self.nav)
+        lines.append(f"Watchlist: {watchlist}")
+        return lines
+
+    def _verbose_lines(self, target_stocks, analysis_data, columns, rounded):
+        lines = []
+        for ticker in target_stocks:
+            confidence, _, indicators = _analysis_fields(analysis_data.get(ticker, {}))
+            lines.append(f"--- Analysis for {ticker} ---")
+            lines.append(f"Confidence Score: {confidence}")
+            if isinstance(indicators, dict):
+                for key, value in indicators.items():
+                    if key in columns:
+                        lines.append(f"- {key}: {_format_value(value, columns[key][1], rounded)}")
+            else:
+                lines.append(f"- Technical Indicators: {indicators}")
+            lines.append("")
+        return lines
+
+    def _compact_lines(self, target_stocks, live_prices, analysis_data, columns, rounded):
+        lines = ["|".join(["Ticker", "Price", "Confidence"] + [label for label, _ in columns.values()])]
+        for ticker in target_stocks:
+            _, confidence, indicators = _analysis_fields(analysis_data.get(ticker, {}))
+            if not isinstance(indicators, dict):
+                indicators = {}
+            row = [
+                ticker,
+                f"{live_prices.get(ticker, 0):.2f}",
+                f"{confidence:.0f}%" if confidence is not None else "NA",
+            ]
+            row += [_format_value(indicators[key], decimals, rounded) if key in indicators else "NA"
+                    for key, (_, decimals) in columns.items()]
+            lines.append("|".join(row))
+        return lines
+
+    def _render(self, target_stocks, live_prices, analysis_data, dropped, rounded):
+        columns = {key: (label, decimals) for key, label, decimals in INDICATOR_COLUMNS if key not in dropped}
+        lines = self._portfolio_lines(target_stocks, live_prices)
+        lines += ["", "[START PROPRIETARY ANALYSIS DATA]"]
+        if self.compact:
+            lines += self._compact_lines(target_stocks, live_prices, analysis_data, columns, rounded)
+        else:
+            lines += self._verbose_lines(target_stocks, analysis_data, columns, rounded)
+        lines.append("[END PROPRIETARY ANALYSIS DATA]")
+        return "\n".join(lines) + "\n"
+
+    def build(self, target_stocks: list, live_prices: dict, analysis_data: dict) -> str:
+        """
+        Renders the context, degrading it as needed to fit the token budget.
+        `analysis_data` maps tickers to AnalysisResults or to the display
+        dictionaries returned by analyze_watchlist().
+        The estimate for the returned text is left in `estimated_tokens`, and
+        the tickers it covers in `included`.
+        """
+        target_stocks = list(target_stocks)
+        context = self._render(target_stocks, live_prices, analysis_data, dropped=(), rounded=False)
+        if self.token_budget is not None:
+            attempts = [(DROP_ORDER[:n], True) for n in range(len(DROP_ORDER) + 1)]
+            for dropped, rounded in attempts:
+                if estimate_tokens(context) <= self.token_budget:
+                    break
+                context = self._render(target_stocks, live_prices, analysis_data, dropped, rounded)
+            while estimate_tokens(context) > self.token_budget and len(target_stocks) > 1:
+                target_stocks.pop()
+                context = self._render(target_stocks, live_prices, analysis_data, DROP_ORDER, True)
+        self.estimated_tokens = estimate_tokens(context)
+        self.included = target_stocks
+        return context
@@ -0,0 +1,26 @@
+"""
+Test doubles shared by the unit tests.
+"""
+from gemini_client import StubBackend
+
+
+class FakeClock:
+    """A clock for injectable `clock` arguments; tests move it by setting `now`."""
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyBackend(StubBackend):
+    """A StubBackend whose first `failures` calls raise ConnectionError."""
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def generate(self, prompt):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("temporarily unavailable")
+        return super().generate(prompt)
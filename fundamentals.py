@@ -0,0 +1,180 @@
+import operator
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from history_cache import get_default_cache
+from instrumentation import instrumented
+
+# Numeric fields copied out of yfinance `info` into the snapshot table.
+FUNDAMENTAL_FIELDS = [
+    "marketCap",
+    "trailingPE",
+    "forwardPE",
+    "dividendYield",
+    "volume",
+    "averageVolume",
+    "beta",
+    "priceToBook",
+    "profitMargins",
+    "currentPrice",
+    "fiftyTwoWeekHigh",
+    "fiftyTwoWeekLow",
+]
+
+# The original screener keys, with the column they map to, the comparison a
+# ticker must pass, and the value used when the field is missing.
+LEGACY_CRITERIA = {
+    "market_cap": ("marketCap", ">=", 0.0),
+    "pe_ratio": ("trailingPE", "<=", np.inf),
+    "dividend_yield": ("dividendYield", ">=", 0.0),
+}
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class FundamentalsSnapshot:
+    """
+    A columnar table of fundamentals, one row per ticker, refreshed in bulk
+    for tickers whose rows are older than `ttl` seconds and optionally
+    persisted to disk between runs.
+    """
+    def __init__(self, path=None, ttl=86400.0, info_fetcher=None, max_workers=16, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.info_fetcher = info_fetcher or get_default_cache().get_info
+        self.max_workers = max_workers
+        self.clock = clock
+        self.table = pd.DataFrame(columns=FUNDAMENTAL_FIELDS + ["fetchedAt"], dtype=float)
+        if path and os.path.exists(path):
+            self.table = pd.read_pickle(path)
+
+    def save(self):
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            self.table.to_pickle(tmp_path)
+            os.replace(tmp_path, self.path)
+
+    def stale_tickers(self, tickers):
+        """Returns the tickers that are missing from the table or older than the TTL."""
+        fetched_at = self.table["fetchedAt"].reindex(tickers)
+        stale = fetched_at.isna() | (fetched_at <= self.clock() - self.ttl)
+        return list(fetched_at.index[stale.to_numpy()])
+
+    def _fetch_row(self, ticker):
+        try:
+            info = self.info_fetcher(ticker) or {}
+        except Exception as e:
+            print(f"  - Could not fetch fundamentals for {ticker}: {e}")
+            return None
+        return [info.get(field) for field in FUNDAMENTAL_FIELDS]
+
+    @instrumented("FundamentalsSnapshot.refresh")
+    def refresh(self, tickers, force=False):
+        """
+        Fetches fundamentals concurrently for every stale ticker and stores them.
+
+        Returns:
+            int: The number of tickers refreshed.
+        """
+        stale = list(dict.fromkeys(tickers)) if force else self.stale_tickers(list(dict.fromkeys(tickers)))
+        if not stale:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            rows = list(executor.map(self._fetch_row, stale))
+        fetched = {ticker: row for ticker, row in zip(stale, rows) if row is not None}
+        if not fetched:
+            return 0
+
+        update = pd.DataFrame.from_dict(fetched, orient="index", columns=FUNDAMENTAL_FIELDS)
+        update = update.apply(pd.to_numeric, errors="coerce").astype(float)
+        update["fetchedAt"] = self.clock()
+        self.table = pd.concat([self.table.drop(index=update.index, errors="ignore"), update])
+        self.save()
+        return len(update)
+
+    def get(self, tickers):
+        """Returns the table rows for the tickers, in order, refreshing stale rows first."""
+        self.refresh(tickers)
+        return self.table.reindex(list(tickers))
+
+
+def _operand(table, value):
+    """A literal, or a column of the table when the value names one."""
+    if isinstance(value, str):
+        return column(table, value)
+    return value
+
+
+def column(table, name):
+    """
+    Returns a column of the table as a float array. A name of the form "a/b"
+    evaluates the ratio of two columns, e.g. "forwardPE/trailingPE".
+    """
+    if "/" in name:
+        numerator, denominator = name.split("/", 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return column(table, numerator) / column(table, denominator)
+    if name not in table.columns:
+        raise KeyError(f"Unknown screening column: {name}")
+    return table[name].to_numpy(dtype=float)
+
+
+def criteria_mask(table, criteria):
+    """
+    Evaluates screening criteria as one boolean mask over the whole table.
+
+    Criteria map a key to a condition:
+        - The legacy keys "market_cap", "pe_ratio" and "dividend_yield" take a
+          bare threshold and behave as they always have.
+        - Any column name, or a ratio of two columns such as "forwardPE/trailingPE",
+          takes (op, value) with op one of >, >=, <, <=, ==, !=, or
+          ("between", low, high) for an inclusive range, or ("in", values).
+        - A string value refers to another column, e.g. {"ma50": (">", "ma200")}.
+
+    Rows with a missing value in any compared column fail that criterion.
+
+    Args:
+        table (pd.DataFrame): One row per ticker, with fundamental and optional technical columns.
+        criteria (dict): The screening criteria.
+
+    Returns:
+        np.ndarray: A boolean mask aligned with the table rows.
+    """
+    mask = np.ones(len(table), dtype=bool)
+    for key, condition in criteria.items():
+        if key in LEGACY_CRITERIA:
+            name, op, missing = LEGACY_CRITERIA[key]
+            values = np.nan_to_num(column(table, name), nan=missing, posinf=np.inf, neginf=-np.inf)
+            mask &= OPERATORS[op](values, condition)
+            continue
+
+        values = column(table, key)
+        op, *args = condition
+        operands = [_operand(table, arg) for arg in args] if op != "in" else []
+        with np.errstate(invalid="ignore"):
+            if op == "between":
+                low, high = operands
+                passed = (values >= low) & (values <= high)
+            elif op == "in":
+                passed = np.isin(values, list(args[0]))
+            elif op in OPERATORS:
+                passed = OPERATORS[op](values, operands[0])
+            else:
+                raise ValueError(f"Unsupported screening operator: {op}")
+        for operand in [values, *operands]:
+            passed &= ~np.isnan(operand)
+        mask &= passed
+    return mask
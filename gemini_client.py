@@ -1,6 +1,36 @@
+import hashlib
+import json
 import os
-import google.generativeai as genai
+import random
 import textwrap
+import time
+
+from instrumentation import count, instrumented, span
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "trade_analyzer", "gemini")
+DEFAULT_WATCHLIST = ['MSFT', 'KO', 'JPM', 'JNJ', 'BRK-B']
+
+SWING_STOCKS_PROMPT = textwrap.dedent("""
+You are a Senior Market Analyst. Your task is to identify 25 US-listed stocks that are strong candidates for a short-term swing trade (holding for 3-7 days).
+
+Selection Criteria:
+- High liquidity (Market Cap > $10B and high average daily volume).
+- Strong recent price momentum (e.g., trading above key moving averages).
+- High relative volume or a recent bullish technical pattern (like a flag or consolidation breakout).
+- Potential for a near-term catalyst (sector rotation, news, etc.).
+
+Provide your response as a single line of comma-separated ticker symbols, and nothing else.
+Example: AAPL,MSFT,NVDA,GOOG,JPM,AMZN,TSLA,META,BAC,WMT,XOM,CVX,PFE,MRK,LLY,UNH,V,MA,HD,COST,PEP,KO,DIS,NFLX,CRM
+""")
+
+def parse_watchlist(response_text) -> list:
+    """Returns the tickers in a comma-separated watchlist."""
+    return [ticker.strip() for ticker in response_text.strip().split(',') if ticker.strip()]
+
+def is_usable_watchlist(response_text) -> bool:
+    """Returns True if a watchlist response has at least 10 tickers."""
+    return len(parse_watchlist(response_text)) >= 10 # Just a sanity check
 
 def get_api_key():
     """Fetches the Gemini API key from environment variables."""
@@ -9,57 +39,295 @@ def get_api_key():
         raise ValueError("GEMINI_API_KEY environment variable not set. Please set it to your API key.")
     return api_key
 
-def get_swing_stocks() -> list:
+class GeminiBackend:
+    """Sends prompts to the Gemini API through one long-lived model handle."""
+    def __init__(self, model_name=DEFAULT_MODEL, api_key=None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key or get_api_key())
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        return self.model.generate_content(prompt).text
+
+    def generate_stream(self, prompt):
+        """Yields the response text in chunks as the model produces it."""
+        for chunk in self.model.generate_content(prompt, stream=True):
+            yield chunk.text
+
+class StubBackend:
     """
-    Sends an initial prompt to Gemini to get a list of 25 stocks suitable
-    for a short-term (3-7 day) swing trade.
+    An offline backend for tests and benchmarks. Responses come from a
+    callable or a {prompt: response} dict, after an optional simulated latency.
     """
+    def __init__(self, responses=None, default="", latency=0.0, model_name="stub", chunk_size=None):
+        self.responses = responses or {}
+        self.default = default
+        self.latency = latency
+        self.model_name = model_name
+        self.chunk_size = chunk_size
+        self.prompts = []
 
-    prompt = textwrap.dedent("""
-    You are a Senior Market Analyst. Your task is to identify 25 US-listed stocks that are strong candidates for a short-term swing trade (holding for 3-7 days).
+    def _respond(self, prompt):
+        self.prompts.append(prompt)
+        if callable(self.responses):
+            return self.responses(prompt)
+        return self.responses.get(prompt, self.default)
 
-    Selection Criteria:
-    - High liquidity (Market Cap > $10B and high average daily volume).
-    - Strong recent price momentum (e.g., trading above key moving averages).
-    - High relative volume or a recent bullish technical pattern (like a flag or consolidation breakout).
-    - Potential for a near-term catalyst (sector rotation, news, etc.).
+    def generate(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(prompt)
 
-    Provide your response as a single line of comma-separated ticker symbols, and nothing else.
-    Example: AAPL,MSFT,NVDA,GOOG,JPM,AMZN,TSLA,META,BAC,WMT,XOM,CVX,PFE,MRK,LLY,UNH,V,MA,HD,COST,PEP,KO,DIS,NFLX,CRM
-    """)
+    def generate_stream(self, prompt):
+        """Yields the response in `chunk_size` pieces, spreading the latency across them."""
+        text = self._respond(prompt)
+        size = self.chunk_size or max(len(text), 1)
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        for chunk in chunks:
+            if self.latency:
+                time.sleep(self.latency / len(chunks))
+            yield chunk
 
-    try:
-        api_key = get_api_key()
-        genai.configure(api_key=api_key)
+class ResponseCache:
+    """
+    An on-disk cache of model responses, one JSON file per entry keyed by a
+    hash of the model name and prompt. Entries expire after `ttl` seconds,
+    and the oldest entries are evicted beyond `max_entries`.
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=6 * 3600.0, max_entries=256, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
 
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
+    @staticmethod
+    def key(model_name, prompt):
+        return hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
 
-        # Parse the comma-separated list
-        tickers = [ticker.strip() for ticker in response.text.strip().split(',')]
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
 
-        if len(tickers) < 10: # Just a sanity check
-            raise ValueError("AI did not return a sufficient list of tickers.")
+    def get(self, model_name, prompt):
+        """Returns the cached response, or None if it is missing or expired."""
+        path = self._path(self.key(model_name, prompt))
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if self.clock() - entry["created"] >= self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["response"]
 
-        print(f"   > Received watchlist of {len(tickers)} stocks.\n")
-        return tickers
+    def set(self, model_name, prompt, response):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(self.key(model_name, prompt))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"created": self.clock(), "model": model_name, "response": response}, f)
+        os.replace(tmp_path, path)
+        self._evict()
 
-    except Exception as e:
-        print(f"Could not get stock list from Gemini: {e}")
-        # Return a default list if the API fails
-        return ['MSFT', 'KO', 'JPM', 'JNJ', 'BRK-B']
+    def _evict(self):
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                   if name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: os.stat(p).st_mtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
-def prompt_gemini_for_analysis(prompt: str):
-    """Sends the prompt to the Gemini API and prints the response."""
-    try:
-        api_key = get_api_key()
-        genai.configure(api_key=api_key)
+class GeminiClient:
+    """
+    A Gemini client with a lazily created, reusable backend, a response cache,
+    retries with exponential backoff and asyncio wrappers.
+    """
+    def __init__(self, backend=None, model_name=DEFAULT_MODEL, cache=None, max_retries=3, backoff=1.0,
+                 sleep=time.sleep):
+        self._backend = backend
+        self.model_name = backend.model_name if backend is not None else model_name
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = GeminiBackend(self.model_name)
+        return self._backend
+
+    @instrumented("gemini.generate")
+    def generate(self, prompt, use_cache=True, cacheable=None):
+        """
+        Returns the model's response text for the prompt, from the cache when
+        possible, retrying failed calls with exponential backoff and jitter.
+        A response the `cacheable` predicate rejects is returned uncached, so
+        the next call asks the model again.
+        """
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(self.model_name, prompt)
+            if cached is not None:
+                return cached
+
+        count("gemini.request_bytes", len(prompt.encode("utf-8")))
+        for attempt in range(self.max_retries + 1):
+            try:
+                with span("gemini.api", model=self.model_name, attempt=attempt):
+                    response = self.backend.generate(prompt)
+                break
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                count("gemini.retries")
+                self.sleep(self.backoff * (2 ** attempt) * (1 + random.random() / 2))
+        count("gemini.response_bytes", len(response.encode("utf-8")))
+
+        if use_cache and self.cache is not None and (cacheable is None or cacheable(response)):
+            self.cache.set(self.model_name, prompt, response)
+        return response
 
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
+    async def generate_async(self, prompt, use_cache=True):
+        """Runs generate() in a worker thread so other startup work can proceed."""
+        import asyncio
 
-        return response.text
+        return await asyncio.to_thread(self.generate, prompt, use_cache)
 
-    except Exception as e:
-        print(f"An error occurred while contacting the Gemini API: {e}")
-        return None
+    def generate_stream(self, prompt, use_cache=True, cacheable=None):
+        """
+        Yields the response text in chunks as it arrives. A cached response is
+        yielded whole, and a call that fails before its first chunk is retried
+        like generate(). `cacheable` is applied to the complete response as in
+        generate().
+        """
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(self.model_name, prompt)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks = []
+        count("gemini.request_bytes", len(prompt.encode("utf-8")))
+        for attempt in range(self.max_retries + 1):
+            try:
+                for chunk in self.backend.generate_stream(prompt):
+                    chunks.append(chunk)
+                    count("gemini.response_bytes", len(chunk.encode("utf-8")))
+                    yield chunk
+                break
+            except Exception:
+                if chunks or attempt == self.max_retries:
+                    raise
+                count("gemini.retries")
+                self.sleep(self.backoff * (2 ** attempt) * (1 + random.random() / 2))
+
+        response = "".join(chunks)
+        if use_cache and self.cache is not None and (cacheable is None or cacheable(response)):
+            self.cache.set(self.model_name, prompt, response)
+
+    def get_swing_stocks(self) -> list:
+        """
+        Asks the model for a list of 25 stocks suitable for a short-term
+        (3-7 day) swing trade, falling back to a default list on failure.
+        """
+        try:
+            response_text = self.generate(SWING_STOCKS_PROMPT, cacheable=is_usable_watchlist)
+            if not is_usable_watchlist(response_text):
+                raise ValueError("AI did not return a sufficient list of tickers.")
+
+            # Parse the comma-separated list
+            tickers = parse_watchlist(response_text)
+
+            print(f"   > Received watchlist of {len(tickers)} stocks.\n")
+            return tickers
+
+        except Exception as e:
+            print(f"Could not get stock list from Gemini: {e}")
+            # Return a default list if the API fails
+            return list(DEFAULT_WATCHLIST)
+
+    async def get_swing_stocks_async(self) -> list:
+        import asyncio
+
+        return await asyncio.to_thread(self.get_swing_stocks)
+
+    def iter_swing_stocks(self):
+        """
+        Yields the swing-trade watchlist one ticker at a time while the model's
+        response streams in, so analysis can start on the first ticker. If the
+        call fails or returns fewer than 10 tickers, the default watchlist is
+        yielded after (without repeating) whatever tickers did arrive.
+        """
+        seen = []
+        buffer = ""
+        try:
+            for chunk in self.generate_stream(SWING_STOCKS_PROMPT, cacheable=is_usable_watchlist):
+                buffer += chunk
+                *complete, buffer = buffer.split(',')
+                for ticker in (t.strip() for t in complete):
+                    if ticker:
+                        seen.append(ticker)
+                        yield ticker
+            if buffer.strip():
+                seen.append(buffer.strip())
+                yield buffer.strip()
+            if len(seen) < 10: # Just a sanity check
+                raise ValueError("AI did not return a sufficient list of tickers.")
+            print(f"   > Received watchlist of {len(seen)} stocks.\n")
+        except Exception as e:
+            print(f"Could not get stock list from Gemini: {e}")
+            for ticker in DEFAULT_WATCHLIST:
+                if ticker not in seen:
+                    yield ticker
+
+    def prompt_for_analysis(self, prompt: str):
+        """Sends the prompt to the model and returns the response text, or None on failure."""
+        try:
+            return self.generate(prompt)
+        except Exception as e:
+            print(f"An error occurred while contacting the Gemini API: {e}")
+            return None
+
+    async def prompt_for_analysis_async(self, prompt: str):
+        import asyncio
+
+        return await asyncio.to_thread(self.prompt_for_analysis, prompt)
+
+_default_client = None
+
+def get_default_client():
+    """Returns the process-wide GeminiClient, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        _default_client = GeminiClient(cache=ResponseCache())
+    return _default_client
+
+def set_default_client(client):
+    """Replaces the process-wide GeminiClient (e.g. with one using a StubBackend)."""
+    global _default_client
+    _default_client = client
+
+def get_swing_stocks() -> list:
+    """
+    Sends an initial prompt to Gemini to get a list of 25 stocks suitable
+    for a short-term (3-7 day) swing trade.
+    """
+    return get_default_client().get_swing_stocks()
+
+def prompt_gemini_for_analysis(prompt: str):
+    """Sends the prompt to the Gemini API and returns the response text."""
+    return get_default_client().prompt_for_analysis(prompt)
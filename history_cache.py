@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from instrumentation import count, instrumented
+
+
+@instrumented("yfinance.history")
+def _fetch_yfinance_history(ticker, period, interval):
+    import yfinance as yf
+
+    history = yf.Ticker(ticker).history(period=period, interval=interval)
+    count("yfinance.history.bytes", int(history.memory_usage(index=True).sum()))
+    return history
+
+
+@instrumented("yfinance.info")
+def _fetch_yfinance_info(ticker):
+    import yfinance as yf
+
+    return yf.Ticker(ticker).info
+
+
+class TTLCache:
+    """
+    A thread-safe in-memory cache with a per-entry time-to-live and
+    least-recently-used eviction once `maxsize` entries are held.
+    """
+    def __init__(self, maxsize=256, ttl=900.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for `key`, or `default` if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Stores `value` under `key`, evicting the least recently used entries if needed.
+        """
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached value for `key`, calling `loader()` and caching its
+        result on a miss. Exceptions raised by the loader are not cached.
+
+        Concurrent misses on the same key call the loader once: the other
+        callers wait for its result (or its exception).
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                # Loaded by another caller since the miss above.
+                return entry[1]
+            pending = self._loading.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._loading[key] = Future()
+        if not leader:
+            return pending.result()
+
+        try:
+            value = loader()
+            self.set(key, value)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(value)
+        finally:
+            with self._lock:
+                del self._loading[key]
+        return value
+
+    def snapshot(self, include_expired=False):
+        """
+        Returns a list of the cached (key, value) pairs, without counting hits
+        or refreshing recency. Expired entries not yet evicted are included on request.
+        """
+        with self._lock:
+            now = self.clock()
+            return [(key, value) for key, (expires_at, value) in self._entries.items()
+                    if include_expired or expires_at > now]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HistoryCache:
+    """
+    Memoizes price history and fundamentals so that every StockAnalyzer in the
+    process shares one download per (ticker, period, interval).
+    """
+    def __init__(self, history_fetcher=None, info_fetcher=None, maxsize=256, ttl=900.0,
+                 clock=time.monotonic):
+        self.history_fetcher = history_fetcher or _fetch_yfinance_history
+        self.info_fetcher = info_fetcher or _fetch_yfinance_info
+        self.history = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self.info = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+
+    def get_history(self, ticker, period="1y", interval="1d"):
+        """
+        Returns the OHLCV history DataFrame for the ticker. The returned frame is
+        shared between callers and must not be modified in place.
+        """
+        key = (ticker.upper(), period, interval)
+        return self.history.get_or_load(key, lambda: self.history_fetcher(ticker, period, interval))
+
+    def get_info(self, ticker):
+        """
+        Returns the fundamentals dictionary (yfinance `info`) for the ticker.
+        """
+        return self.info.get_or_load(ticker.upper(), lambda: self.info_fetcher(ticker))
+
+    def latest_close(self, ticker):
+        """
+        Returns the close of the most recent bar cached for the ticker across
+        every period and interval, or None if nothing is cached. Nothing is
+        fetched, and expired entries still count: a stale price is a better
+        fallback than none.
+        """
+        ticker = ticker.upper()
+        latest = None
+        for (cached_ticker, _, _), history in self.history.snapshot(include_expired=True):
+            if cached_ticker != ticker or history is None or len(history) == 0 or 'Close' not in history:
+                continue
+            closes = history['Close'].dropna()
+            if not len(closes):
+                continue
+            when = closes.index[-1]
+            if getattr(when, 'tzinfo', None) is not None:
+                when = when.tz_localize(None)  # compare exchange wall-clock times
+            if latest is None or when > latest[0]:
+                latest = (when, float(closes.iloc[-1]))
+        return None if latest is None else latest[1]
+
+    def clear(self):
+        self.history.clear()
+        self.info.clear()
+
+
+_default_cache = HistoryCache()
+
+
+def get_default_cache():
+    """Returns the process-wide HistoryCache shared by StockAnalyzer instances."""
+    return _default_cache
+
+
+def set_default_cache(cache):
+    """Replaces the process-wide HistoryCache (e.g. with one backed by a local store)."""
+    global _default_cache
+    _default_cache = cache
@@ -0,0 +1,152 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+BAR_DTYPE = np.dtype([("date", "i8")] + [(field, "f8") for field in FIELDS])
+
+_PERIOD_OFFSETS = {
+    "d": lambda n: pd.DateOffset(days=n),
+    "wk": lambda n: pd.DateOffset(weeks=n),
+    "mo": lambda n: pd.DateOffset(months=n),
+    "y": lambda n: pd.DateOffset(years=n),
+}
+
+
+def fetch_yfinance_bars(ticker, start=None, interval="1d", initial_period="max"):
+    """
+    Downloads OHLCV bars from yfinance, either the full `initial_period` or
+    every bar from `start` onwards.
+    """
+    import yfinance as yf
+
+    stock = yf.Ticker(ticker)
+    if start is None:
+        return stock.history(period=initial_period, interval=interval)
+    return stock.history(start=start, interval=interval)
+
+
+def period_start(period, now=None):
+    """
+    Converts a yfinance-style period string ("5d", "6mo", "1y", "ytd", "max")
+    into the earliest timestamp it covers, or None for "max".
+    """
+    now = pd.Timestamp.now().normalize() if now is None else pd.Timestamp(now)
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    for suffix in ("wk", "mo", "d", "y"):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return now - _PERIOD_OFFSETS[suffix](int(period[:-len(suffix)]))
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def bars_to_frame(bars):
+    """Converts a BAR_DTYPE record array into a history()-shaped DataFrame."""
+    index = pd.DatetimeIndex(bars["date"].astype("datetime64[ns]"), name="Date")
+    return pd.DataFrame({field: bars[field] for field in FIELDS}, index=index)
+
+
+def frame_to_bars(frame):
+    """Converts a history()-shaped DataFrame into a BAR_DTYPE record array."""
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    bars["date"] = index.as_unit("ns").asi8
+    for field in FIELDS:
+        bars[field] = frame[field].to_numpy(dtype="f8")
+    return bars
+
+
+class HistoryStore:
+    """
+    A local per-ticker OHLCV store. Bars are kept as one NumPy record file per
+    ticker and interval, and each refresh only downloads the bars after the
+    last stored date.
+
+    Dates are stored tz-naive in exchange-local time, matching the wall-clock
+    dates yfinance reports.
+    """
+    def __init__(self, root, fetcher=None, refresh_interval=900.0, initial_period="max",
+                 clock=time.time):
+        self.root = root
+        self.fetcher = fetcher or fetch_yfinance_bars
+        self.refresh_interval = refresh_interval
+        self.initial_period = initial_period
+        self.clock = clock
+        self._last_refresh = {}
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.root, interval, f"{ticker.upper()}.npy")
+
+    def load(self, ticker, interval="1d"):
+        """
+        Returns the stored bars as a read-only memory-mapped record array, or
+        an empty array if nothing has been stored yet.
+        """
+        path = self._path(ticker, interval)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    def _save(self, ticker, interval, bars):
+        path = self._path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, bars)
+        os.replace(tmp_path, path)
+
+    def refresh(self, ticker, interval="1d"):
+        """
+        Fetches the bars after the last stored date and merges them in. The
+        last stored bar is re-fetched too, since it may have been partial.
+
+        Returns:
+            int: The number of bars received from the fetcher.
+        """
+        stored = self.load(ticker, interval)
+        start = pd.Timestamp(stored["date"][-1]).normalize() if len(stored) else None
+        new = self.fetcher(ticker, start=start, interval=interval, initial_period=self.initial_period)
+
+        self._last_refresh[(ticker.upper(), interval)] = self.clock()
+        if new is None or new.empty:
+            return 0
+
+        new_bars = frame_to_bars(new)
+        if start is not None:
+            keep = np.asarray(stored["date"] < new_bars["date"][0])
+            merged = np.concatenate([np.asarray(stored[keep]), new_bars])
+        else:
+            merged = new_bars
+        self._save(ticker, interval, merged)
+        return len(new_bars)
+
+    def bars(self, ticker, period="1y", interval="1d", refresh=True):
+        """
+        Returns the stored bars covering `period` as a read-only record array,
+        refreshing the store first if it has not been synced within
+        `refresh_interval`. With refresh=False, only stored bars are read.
+        """
+        if refresh:
+            last = self._last_refresh.get((ticker.upper(), interval))
+            if last is None or self.clock() - last >= self.refresh_interval:
+                self.refresh(ticker, interval)
+
+        bars = self.load(ticker, interval)
+        start = period_start(period)
+        if start is not None and len(bars):
+            first = np.searchsorted(bars["date"], start.value, side="left")
+            bars = bars[first:]
+        return bars
+
+    def history(self, ticker, period="1y", interval="1d"):
+        """
+        Returns a history()-shaped DataFrame for the ticker, refreshing the
+        store first if it has not been synced within `refresh_interval`.
+        """
+        return bars_to_frame(self.bars(ticker, period, interval))
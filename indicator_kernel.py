@@ -0,0 +1,298 @@
+import numpy as np
+
+from instrumentation import instrumented
+
+# Maximum chunk length for the closed-form EMA. Short spans use shorter chunks
+# so that (1 - alpha) ** -chunk stays far below the float64 overflow point.
+EMA_CHUNK = 8192
+
+
+def _as_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _rolling_sum(cumsum, window):
+    """Rolling window sums from a cumulative sum, NaN-padded to the input length."""
+    out = np.full(len(cumsum), np.nan)
+    if len(cumsum) >= window:
+        out[window - 1:] = cumsum[window - 1:]
+        out[window:] -= cumsum[:-window]
+    return out
+
+
+def _rolling_mean(cumsum, window, missing_cumsum=None):
+    """
+    Rolling means from a cumulative sum in which NaN values counted as zero.
+    As in pandas, a window containing a NaN (counted by `missing_cumsum`) has
+    no mean, and the windows after it are unaffected.
+    """
+    out = _rolling_sum(cumsum, window) / window
+    if missing_cumsum is not None:
+        out[_rolling_sum(missing_cumsum, window) > 0] = np.nan
+    return out
+
+
+def _rolling_extreme(x, window, ufunc):
+    """
+    Rolling minimum (ufunc=np.minimum) or maximum (ufunc=np.maximum) in O(n)
+    with the van Herk/Gil-Werman scheme: prefix and suffix extremes within
+    fixed blocks of `window` values combine into the extreme of any window.
+    The result is NaN-padded to the input length.
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    blocks = -(-n // window)
+    padded = np.empty(blocks * window)
+    padded[:n] = x
+    padded[n:] = x[-1]
+    grid = padded.reshape(blocks, window)
+    prefix = ufunc.accumulate(grid, axis=1).ravel()
+    suffix = ufunc.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(n - window + 1)
+    out[window - 1:] = ufunc(suffix[starts], prefix[starts + window - 1])
+    return out
+
+
+def _rolling_std(x, mean, window):
+    """Rolling sample standard deviation around precomputed rolling means."""
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    length = n - window + 1
+    centre = mean[window - 1:]
+    squares = np.zeros(length)
+    deviation = np.empty(length)
+    for offset in range(window):
+        np.subtract(x[offset:offset + length], centre, out=deviation)
+        squares += deviation * deviation
+    out[window - 1:] = np.sqrt(squares / (window - 1))
+    return out
+
+
+def _ema_run(x, prev, alpha, decay, chunk_len, out):
+    """Continues y[t] = decay * y[t-1] + alpha * x[t] from `prev` over x, writing into out."""
+    for start in range(0, len(x), chunk_len):
+        chunk = x[start:start + chunk_len]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        out[start:start + len(chunk)] = powers * (prev + np.cumsum(alpha * chunk / powers))
+        prev = out[start + len(chunk) - 1]
+
+
+def _ema(x, span):
+    """
+    Exponential moving average with adjust=False semantics. Each chunk is
+    solved in closed form, y[t] = d**t * (y[-1] + sum(alpha * x[k] / d**k)),
+    so the recursion runs as a handful of array operations.
+
+    NaN values are handled as pandas does: the average is NaN until the first
+    value, is carried over missing values, and the first value after a gap of
+    g bars is averaged with the one before the gap in the ratio alpha : d**g.
+    """
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    if decay <= 0 or len(x) == 0:
+        return x.copy()
+    chunk_len = max(1, min(EMA_CHUNK, int(600 / -np.log(decay))))
+    out = np.full(len(x), np.nan)
+    observed = np.flatnonzero(~np.isnan(x))
+    if not len(observed):
+        return out
+
+    # Runs of consecutive values; each one after the first follows a gap.
+    starts = np.r_[0, np.flatnonzero(np.diff(observed) > 1) + 1]
+    ends = np.r_[starts[1:], len(observed)]
+    prev = None
+    for start, end in zip(observed[starts], observed[ends - 1] + 1):
+        if prev is None:
+            out[start] = x[start]
+        else:
+            weight = decay ** (start - previous_end + 1)
+            out[start] = (weight * prev + alpha * x[start]) / (weight + alpha)
+        _ema_run(x[start + 1:end], out[start], alpha, decay, chunk_len, out[start + 1:end])
+        prev, previous_end = out[end - 1], end
+    if len(starts) > 1 or observed[-1] != len(x) - 1:
+        # Carry the average over the gaps.
+        last_seen = np.maximum.accumulate(np.where(np.isnan(x), 0, np.arange(len(x))))
+        out[observed[0]:] = out[last_seen[observed[0]:]]
+    return out
+
+
+def _ema_memory(span):
+    """The number of bars after which a value's weight in the EMA drops below float64 precision."""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    return int(np.ceil(53 * np.log(2) / -np.log(decay))) if decay > 0 else 1
+
+
+def _rsi_from_sums(gain, loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + gain / loss))
+
+
+@instrumented("indicators.compute_indicators")
+def compute_indicators(close, high=None, low=None, volume=None, last_only=False,
+                       ma_windows=(50, 200), rsi_window=14, macd_spans=(12, 26, 9),
+                       bollinger_window=20, num_std_dev=2, stochastic_window=14):
+    """
+    Computes the full indicator set from contiguous float64 arrays in a single
+    pass, sharing the cumulative sums of the closes between the moving averages
+    and Bollinger Bands.
+
+    The results match the functions in technical_indicators.py, including their
+    handling of NaN bars. Indicators that need high/low or volume are skipped
+    when those arrays are not given.
+
+    Args:
+        close (array-like): Closing prices.
+        high (array-like): High prices, needed for the stochastic oscillator.
+        low (array-like): Low prices, needed for the stochastic oscillator.
+        volume (array-like): Volumes, needed for OBV.
+        last_only (bool): Return only the latest value of each indicator. Only
+            the trailing window of each indicator is read, except for OBV, which
+            sums every bar, and the EMAs, which run over the bars still carrying
+            weight at float64 precision (about 500 for the default spans).
+        ma_windows (tuple): Windows of the simple moving averages, reported as "ma<window>".
+        rsi_window (int): The number of periods for the RSI.
+        macd_spans (tuple): The fast, slow and signal spans of the MACD.
+        bollinger_window (int): The number of periods for the Bollinger Bands.
+        num_std_dev (int): The number of standard deviations for the Bollinger Bands.
+        stochastic_window (int): The number of periods for the stochastic oscillator.
+
+    Returns:
+        dict: Maps indicator names (ma<window>, rsi, macd, signal, histogram,
+        bollinger_upper, bollinger_middle, bollinger_lower, obv, stochastic) to
+        float values when last_only is True, or to float64 arrays otherwise.
+    """
+    close = _as_array(close)
+    n = len(close)
+    result = {}
+
+    # Moving averages
+    if not last_only:
+        # Shared by the moving averages and Bollinger Bands. NaN closes count as
+        # zero in the sum, and the windows that contain them are blanked.
+        missing = np.isnan(close)
+        close_cumsum = np.cumsum(np.where(missing, 0.0, close))
+        missing_cumsum = np.cumsum(missing) if missing.any() else None
+    for window in ma_windows:
+        if last_only:
+            result[f"ma{window}"] = close[-window:].mean() if n >= window else np.nan
+        else:
+            result[f"ma{window}"] = _rolling_mean(close_cumsum, window, missing_cumsum)
+
+    # RSI over simple rolling means of gains and losses. A difference involving
+    # a NaN close counts as neither a gain nor a loss, as in pandas.
+    if last_only:
+        if n >= rsi_window:
+            delta = np.diff(close[-(rsi_window + 1):])
+            gain = delta[delta > 0].sum()
+            loss = -delta[delta < 0].sum()
+            result["rsi"] = float(_rsi_from_sums(gain, loss))
+        else:
+            result["rsi"] = np.nan
+    else:
+        delta = np.empty(n)
+        if n:
+            delta[0] = np.nan
+            np.subtract(close[1:], close[:-1], out=delta[1:])
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+        gain_sum = _rolling_sum(np.cumsum(gains), rsi_window)
+        loss_sum = _rolling_sum(np.cumsum(losses), rsi_window)
+        # Cumulative sums leave round-off residue in windows that are all zeros.
+        gain_sum[_rolling_sum(np.cumsum(gains > 0), rsi_window) == 0] = 0.0
+        loss_sum[_rolling_sum(np.cumsum(losses > 0), rsi_window) == 0] = 0.0
+        result["rsi"] = _rsi_from_sums(gain_sum, loss_sum)
+
+    # MACD
+    fast, slow, signal = macd_spans
+    if last_only:
+        # Bars further back than the EMAs' memory weigh less than float64
+        # precision in the latest values, so only the tail is averaged.
+        tail = close[-(_ema_memory(max(fast, slow)) + _ema_memory(signal)):]
+        macd = _ema(tail, fast) - _ema(tail, slow)
+        signal_line = _ema(macd, signal)
+        result["macd"] = macd[-1] if n else np.nan
+        result["signal"] = signal_line[-1] if n else np.nan
+        result["histogram"] = result["macd"] - result["signal"]
+    else:
+        macd = _ema(close, fast) - _ema(close, slow)
+        signal_line = _ema(macd, signal)
+        result["macd"] = macd
+        result["signal"] = signal_line
+        result["histogram"] = macd - signal_line
+
+    # Bollinger Bands
+    if last_only:
+        if n >= bollinger_window:
+            tail = close[-bollinger_window:]
+            middle, std_dev = tail.mean(), tail.std(ddof=1)
+        else:
+            middle = std_dev = np.nan
+    else:
+        middle = _rolling_mean(close_cumsum, bollinger_window, missing_cumsum)
+        std_dev = _rolling_std(close, middle, bollinger_window)
+    result["bollinger_upper"] = middle + std_dev * num_std_dev
+    result["bollinger_middle"] = middle
+    result["bollinger_lower"] = middle - std_dev * num_std_dev
+
+    # OBV: the first bar and every rising close add volume, everything else
+    # subtracts it. A comparison with a NaN close counts as rising, and a NaN
+    # volume is skipped by the running total (and leaves its own bar NaN).
+    if volume is not None:
+        volume = _as_array(volume)
+        falling = np.zeros(n, dtype=bool)
+        if n:
+            np.less_equal(close[1:], close[:-1], out=falling[1:])
+        if last_only:
+            if n and not np.isnan(volume[-1]):
+                result["obv"] = float(np.nansum(volume) - 2 * np.nansum(volume[falling]))
+            else:
+                result["obv"] = np.nan
+        else:
+            flow = np.where(falling, -volume, volume)
+            missing_volume = np.isnan(flow)
+            result["obv"] = np.cumsum(np.where(missing_volume, 0.0, flow))
+            result["obv"][missing_volume] = np.nan
+
+    # Stochastic Oscillator
+    if high is not None and low is not None:
+        high, low = _as_array(high), _as_array(low)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if last_only:
+                if n >= stochastic_window:
+                    low_min = low[-stochastic_window:].min()
+                    high_max = high[-stochastic_window:].max()
+                    result["stochastic"] = float(100 * ((close[-1] - low_min) / (high_max - low_min)))
+                else:
+                    result["stochastic"] = np.nan
+            else:
+                low_min = _rolling_extreme(low, stochastic_window, np.minimum)
+                high_max = _rolling_extreme(high, stochastic_window, np.maximum)
+                result["stochastic"] = 100 * ((close - low_min) / (high_max - low_min))
+
+    return result
+
+
+def compute_indicators_from_frame(data, last_only=True, **params):
+    """
+    Runs compute_indicators() on a history()-shaped DataFrame.
+
+    Args:
+        data (pd.DataFrame): A DataFrame containing the stock's historical data.
+        last_only (bool): Return only the latest value of each indicator.
+        **params: Window parameters forwarded to compute_indicators().
+
+    Returns:
+        dict: See compute_indicators().
+    """
+    return compute_indicators(
+        data['Close'].to_numpy(dtype=np.float64),
+        high=data['High'].to_numpy(dtype=np.float64),
+        low=data['Low'].to_numpy(dtype=np.float64),
+        volume=data['Volume'].to_numpy(dtype=np.float64),
+        last_only=last_only,
+        **params,
+    )
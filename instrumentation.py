@@ -0,0 +1,200 @@
+"""
+Run-level instrumentation: timed spans, counters, latency histograms and
+cache hit rates, exported as a summary table and a Chrome trace.
+
+Nothing is recorded until enable() is called. While disabled, an
+instrumented function costs one global lookup per call, and span() returns
+a shared no-op context manager.
+
+Usage:
+    from instrumentation import instrumented, span, count
+
+    @instrumented("yfinance.history")
+    def fetch(...): ...
+
+    with span("context"):
+        ...
+    count("gemini.retries")
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+_recorder = None
+
+
+class Recorder:
+    """
+    Collects spans, counters and latency histograms for one run.
+
+    Latencies are bucketed by powers of two of microseconds. Spans are kept
+    as Chrome trace events, up to `max_events` of them; later spans still
+    update the counters and histograms.
+    """
+    def __init__(self, max_events=500_000, clock=time.perf_counter):
+        self.max_events = max_events
+        self.clock = clock
+        self.origin = clock()
+        self.events = []
+        self.dropped_events = 0
+        self.counters = {}
+        self.latencies = {}
+        self.caches = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, start, end, args=None):
+        duration = end - start
+        bucket = max(0, int(duration * 1e6)).bit_length()
+        with self._lock:
+            stats = self.latencies.get(name)
+            if stats is None:
+                stats = self.latencies[name] = {"calls": 0, "total": 0.0, "max": 0.0, "buckets": {}}
+            stats["calls"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+            stats["buckets"][bucket] = stats["buckets"].get(bucket, 0) + 1
+            if len(self.events) < self.max_events:
+                event = {"name": name, "ph": "X", "ts": (start - self.origin) * 1e6, "dur": duration * 1e6,
+                         "pid": os.getpid(), "tid": threading.get_ident()}
+                if args:
+                    event["args"] = args
+                self.events.append(event)
+            else:
+                self.dropped_events += 1
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def register_cache(self, name, cache):
+        """Reports the hit rate of any object with `hits` and `misses` attributes."""
+        self.caches[name] = cache
+
+    def cache_stats(self):
+        stats = {}
+        for name, cache in self.caches.items():
+            hits, misses = cache.hits, cache.misses
+            stats[name] = {"hits": hits, "misses": misses,
+                           "hit_rate": hits / (hits + misses) if hits + misses else None}
+        return stats
+
+    def summary(self):
+        """Returns the counters, latency statistics and cache hit rates as one dictionary."""
+        latencies = {}
+        for name, stats in self.latencies.items():
+            latencies[name] = {
+                "calls": stats["calls"],
+                "total_s": stats["total"],
+                "mean_ms": stats["total"] / stats["calls"] * 1e3,
+                "max_ms": stats["max"] * 1e3,
+                # Bucket b counts calls that took [2**(b-1), 2**b) microseconds.
+                "histogram_us": {str(2 ** b): n for b, n in sorted(stats["buckets"].items())},
+            }
+        return {"counters": dict(self.counters), "latencies": latencies, "caches": self.cache_stats(),
+                "dropped_events": self.dropped_events}
+
+    def write_trace(self, path):
+        """Writes the spans as a Chrome trace (chrome://tracing, Perfetto), with the summary as metadata."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms", "otherData": self.summary()}, f)
+
+    def report(self):
+        """Formats the summary as the table printed at the end of a profiled run."""
+        lines = [f"{'Span':<44} {'Calls':>7} {'Total (s)':>10} {'Mean (ms)':>10} {'Max (ms)':>10}"]
+        for name, stats in sorted(self.latencies.items(), key=lambda item: -item[1]["total"]):
+            lines.append(f"{name:<44} {stats['calls']:>7} {stats['total']:>10.3f} "
+                         f"{stats['total'] / stats['calls'] * 1e3:>10.2f} {stats['max'] * 1e3:>10.2f}")
+        if self.counters:
+            lines.append("")
+            lines += [f"{name:<44} {value:>12,}" for name, value in sorted(self.counters.items())]
+        for name, stats in self.cache_stats().items():
+            rate = "n/a" if stats["hit_rate"] is None else f"{stats['hit_rate']:.0%}"
+            lines.append(f"{name + ' hit rate':<44} {rate:>12} ({stats['hits']} hits, {stats['misses']} misses)")
+        return "\n".join(lines)
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "args", "start")
+
+    def __init__(self, recorder, name, args):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = self.recorder.clock()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.recorder.count(f"{self.name}.errors")
+        self.recorder.add_span(self.name, self.start, self.recorder.clock(), self.args)
+        return False
+
+
+def enable(recorder=None):
+    """Starts recording into `recorder` (a new Recorder by default) and returns it."""
+    global _recorder
+    _recorder = recorder or Recorder()
+    return _recorder
+
+
+def disable():
+    """Stops recording and returns the recorder that was active, if any."""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder
+
+
+def get_recorder():
+    return _recorder
+
+
+def span(name, **args):
+    """A context manager timing a block as a span while recording is enabled."""
+    recorder = _recorder
+    if recorder is None:
+        return _NO_SPAN
+    return _Span(recorder, name, args or None)
+
+
+def count(name, value=1):
+    """Adds `value` to a counter while recording is enabled."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.count(name, value)
+
+
+def instrumented(name=None):
+    """Decorates a function so each call is recorded as a span named `name` (its qualified name by default)."""
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            start = recorder.clock()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                recorder.count(f"{span_name}.errors")
+                raise
+            finally:
+                recorder.add_span(span_name, start, recorder.clock())
+        return wrapper
+    return decorator
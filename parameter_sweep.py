@@ -0,0 +1,229 @@
+import itertools
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import run_backtest
+
+PRICE_FIELDS = ("Open", "High", "Low", "Close")
+
+# Summary statistics kept for every parameter combination.
+METRICS = ("trades", "win_rate", "mean_return", "median_return", "profit_factor",
+           "compounded_return", "mean_bars_held")
+
+# The strategy's hard-coded defaults, each with a few neighbours to compare against.
+DEFAULT_GRID = {
+    "ma_short": [20, 50],
+    "ma_long": [100, 200],
+    "rsi_window": [10, 14, 21],
+    "rsi_upper": [65, 70, 75],
+    "macd_filter": [False, True],
+    "bollinger_filter": [False, True],
+    "stochastic_max": [None, 80],
+    "stop_loss": [0.9, 0.95],
+    "take_profit": [1.1, 1.2],
+}
+
+_worker_prices = None
+_worker_memory = None
+
+
+def expand_grid(grid):
+    """Expands a {parameter: [values]} grid into a list of parameter dictionaries."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def params_key(params):
+    """A canonical string identifying a parameter combination in checkpoints."""
+    return json.dumps(params, sort_keys=True)
+
+
+def _attach(name):
+    # Workers share the parent's resource tracker, so the parent alone unlinks the block.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(name, shape, dates, tickers):
+    """Maps the shared price block into per-field DataFrames without copying it."""
+    global _worker_prices, _worker_memory
+    _worker_memory = _attach(name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=_worker_memory.buf)
+    block.flags.writeable = False
+    index = pd.DatetimeIndex(dates)
+    _worker_prices = {field: pd.DataFrame(block[i], index=index, columns=tickers, copy=False)
+                      for i, field in enumerate(PRICE_FIELDS)}
+
+
+def evaluate(prices, params):
+    """Backtests one parameter combination and returns its summary metrics."""
+    summary = run_backtest(prices, **params)["summary"]
+    return {metric: float(summary.get(metric, np.nan)) for metric in METRICS}
+
+
+def _evaluate_chunk(chunk):
+    return [(params, evaluate(_worker_prices, params)) for params in chunk]
+
+
+def load_checkpoint(path):
+    """Returns {params_key: row} for every combination recorded in a checkpoint file."""
+    done = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write can leave a truncated last line.
+                    continue
+                done[params_key(row["params"])] = row
+    return done
+
+
+def _open_checkpoint(path):
+    """Opens a checkpoint for appending, starting a fresh line after a truncated one."""
+    log = open(path, "a+")
+    if log.tell():
+        log.seek(log.tell() - 1)
+        if log.read(1) != "\n":
+            log.write("\n")
+    return log
+
+
+def _columns(rows):
+    """Flattens checkpoint rows into one NumPy array per parameter and metric."""
+    frame = pd.DataFrame([{**row["params"], **row["metrics"]} for row in rows])
+    columns = {}
+    for name in frame.columns:
+        values = frame[name]
+        if values.dtype == object:
+            numeric = pd.to_numeric(values, errors="coerce")
+            values = numeric if numeric.notna().sum() == values.notna().sum() else values.astype(str)
+        columns[name] = values.to_numpy()
+    return columns
+
+
+def save_results(path, rows):
+    """Writes sweep results to a compressed columnar .npz file."""
+    np.savez_compressed(path, **_columns(rows))
+
+
+def load_results(path):
+    """Reads a results file written by save_results() into a DataFrame."""
+    with np.load(path) as data:
+        return pd.DataFrame({name: data[name] for name in data.files})
+
+
+def run_sweep(panel, grid, workers=None, checkpoint=None, output=None, chunk_size=8,
+              max_pending=None, progress=True):
+    """
+    Evaluates every combination of the grid against the panel on a process pool.
+
+    The OHLC prices are copied once into a shared-memory block that each
+    worker maps as read-only DataFrames, so tasks carry only parameters.
+    Every finished combination is appended to the checkpoint file, and a rerun
+    with the same checkpoint skips the combinations already recorded there.
+
+    Args:
+        panel (pd.DataFrame): A wide panel with (field, ticker) MultiIndex columns.
+        grid (dict): Maps backtest parameters to the list of values to try.
+        workers (int): The number of worker processes (defaults to all cores).
+        checkpoint (str): A JSON-lines file of finished combinations.
+        output (str): A .npz file to write the full results to.
+        chunk_size (int): Combinations evaluated per task.
+        max_pending (int): The maximum number of tasks in flight.
+        progress (bool): Print progress as chunks finish.
+
+    Returns:
+        pd.DataFrame: One row per combination, with parameter and metric columns.
+    """
+    combos = expand_grid(grid)
+    done = load_checkpoint(checkpoint)
+    todo = [params for params in combos if params_key(params) not in done]
+    if progress and done:
+        print(f"  - Resuming sweep: {len(combos) - len(todo)} of {len(combos)} combinations already done.")
+
+    if todo:
+        tickers = list(panel["Close"].columns)
+        block_shape = (len(PRICE_FIELDS), len(panel.index), len(tickers))
+        memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(block_shape)) * 8))
+        try:
+            block = np.ndarray(block_shape, dtype=np.float64, buffer=memory.buf)
+            for i, field in enumerate(PRICE_FIELDS):
+                block[i] = panel[field].reindex(columns=tickers).to_numpy(dtype=np.float64)
+            del block
+
+            workers = workers or os.cpu_count()
+            max_pending = max_pending or 4 * workers
+            chunks = iter([todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)])
+            log = _open_checkpoint(checkpoint) if checkpoint else None
+            finished = len(combos) - len(todo)
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(memory.name, block_shape, panel.index.to_numpy(), tickers)
+                                         ) as executor:
+                    pending = set()
+                    for chunk in itertools.islice(chunks, max_pending):
+                        pending.add(executor.submit(_evaluate_chunk, chunk))
+                    while pending:
+                        completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in completed:
+                            for params, metrics in future.result():
+                                row = {"params": params, "metrics": metrics}
+                                done[params_key(params)] = row
+                                if log:
+                                    log.write(json.dumps(row) + "\n")
+                                finished += 1
+                            next_chunk = next(chunks, None)
+                            if next_chunk is not None:
+                                pending.add(executor.submit(_evaluate_chunk, next_chunk))
+                        if log:
+                            log.flush()
+                        if progress:
+                            print(f"  - {finished}/{len(combos)} combinations evaluated", flush=True)
+            finally:
+                if log:
+                    log.close()
+        finally:
+            memory.close()
+            memory.unlink()
+
+    rows = [done[params_key(params)] for params in combos]
+    if output:
+        save_results(output, rows)
+    return pd.DataFrame([{**row["params"], **row["metrics"]} for row in rows])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from batch_analyzer import download_panel
+
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over a ticker universe")
+    parser.add_argument("tickers", nargs="+", help="Ticker symbols to backtest")
+    parser.add_argument("--period", default="10y", help="History to replay (default: 10y)")
+    parser.add_argument("--grid", type=str, help="JSON file mapping parameters to lists of values")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--checkpoint", type=str, default="sweep_checkpoint.jsonl",
+                        help="Checkpoint file used to resume interrupted sweeps")
+    parser.add_argument("--output", type=str, default="sweep_results.npz", help="Columnar results file")
+    args = parser.parse_args()
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+
+    results = run_sweep(download_panel(args.tickers, period=args.period), grid, workers=args.workers,
+                        checkpoint=args.checkpoint, output=args.output)
+    print(results.sort_values("compounded_return", ascending=False).head(20).to_string(index=False))
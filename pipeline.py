@@ -0,0 +1,250 @@
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+_DONE = object()
+
+
+class StageStats:
+    """Timing counters for one pipeline stage (or one sequential step)."""
+    def __init__(self, name):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.max_latency = 0.0
+        self.started = None
+        self.finished = None
+
+    def record(self, start, end):
+        self.busy += end - start
+        self.max_latency = max(self.max_latency, end - start)
+        self.started = start if self.started is None else min(self.started, start)
+        self.finished = end if self.finished is None else max(self.finished, end)
+
+    @property
+    def span(self):
+        """Seconds from the stage's first item starting to its last item finishing."""
+        return 0.0 if self.started is None else self.finished - self.started
+
+
+class Stage:
+    """
+    One step of a Pipeline.
+
+    Args:
+        name (str): The name shown in the timing breakdown.
+        func (callable): Takes an item and returns the item passed downstream,
+            or None to drop it. Plain functions run on the pipeline's thread
+            pool; coroutine functions run on the event loop.
+        workers (int): The number of items processed concurrently.
+        queue_size (int): The capacity of the stage's input queue. A full queue
+            blocks the stage upstream of it (backpressure).
+        ordered (bool): Emit results in the order items arrived, rather than as
+            they finish.
+        limit (int): Stop the stage, and cancel everything upstream of it, once
+            this many items have been emitted.
+        timeout (float): Seconds an item may take before it is abandoned.
+        on_error (callable): Called with (item, exception) when an item fails or
+            times out. Failed items are dropped.
+    """
+    def __init__(self, name, func, workers=1, queue_size=16, ordered=False, limit=None, timeout=None,
+                 on_error=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size
+        self.ordered = ordered
+        self.limit = limit
+        self.timeout = timeout
+        self.on_error = on_error
+
+
+class Pipeline:
+    """
+    Streams items from a source through a chain of stages connected by
+    bounded asyncio queues, so every stage starts on the first item to reach
+    it rather than once the previous stage has finished.
+
+    Args:
+        source (iterable): Yields the pipeline's input items. A blocking
+            iterator (e.g. a streamed API response) is advanced on the thread pool.
+        stages (list): The Stage objects, in order.
+        clock (callable): Returns the current time in seconds.
+    """
+    def __init__(self, source, stages, clock=time.perf_counter):
+        self.source = source
+        self.stages = list(stages)
+        self.clock = clock
+        self.stats = [StageStats("source")] + [StageStats(stage.name) for stage in self.stages]
+        self.results = []
+        self.cancelled = False
+        self.finished = False
+        self.source_error = None
+        self._tasks = []
+        self._source_task = None
+        self._worker_tasks = [[] for _ in self.stages]
+        self._stopped = [False] * len(self.stages)
+
+    async def _call(self, stage, item):
+        if inspect.iscoroutinefunction(stage.func):
+            call = stage.func(item)
+        else:
+            call = asyncio.get_running_loop().run_in_executor(self._executor, stage.func, item)
+        if stage.timeout is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, stage.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{stage.name} exceeded {stage.timeout}s for {item!r}") from None
+
+    async def _put(self, stats, queue, entry):
+        start = self.clock()
+        await queue.put(entry)
+        stats.blocked += self.clock() - start
+
+    async def _run_source(self, outbox):
+        stats = self.stats[0]
+        loop = asyncio.get_running_loop()
+        try:
+            iterator = iter(self.source)
+            while True:
+                start = self.clock()
+                item = await loop.run_in_executor(self._executor, next, iterator, _DONE)
+                if item is _DONE:
+                    break
+                stats.record(start, self.clock())
+                await self._put(stats, outbox, item)
+                stats.items_out += 1
+        except Exception as e:
+            # The stages still drain whatever the source produced before failing.
+            stats.errors += 1
+            self.source_error = e
+        await outbox.put(_DONE)
+
+    def _stop_upstream(self, index):
+        """Cancels the source and every stage before `index` once a stage has reached its limit."""
+        self._source_task.cancel()
+        for i in range(index + 1):
+            self._stopped[i] = True
+            for task in self._worker_tasks[i]:
+                if task is not asyncio.current_task():
+                    task.cancel()
+
+    async def _run_stage(self, index, inbox, outbox):
+        stage = self.stages[index]
+        stats = self.stats[index + 1]
+        # Ordered stages park finished items here until every earlier item is done.
+        finished = {}
+        state = {"received": 0, "next": 0}
+
+        async def emit(result):
+            if result is not None and not (stage.limit is not None and stats.items_out >= stage.limit):
+                await self._put(stats, outbox, result)
+                stats.items_out += 1
+                if stage.limit is not None and stats.items_out >= stage.limit:
+                    self._stop_upstream(index)
+
+        async def work():
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    await inbox.put(_DONE)  # so sibling workers see it too
+                    return
+                sequence = state["received"]
+                state["received"] += 1
+                stats.items_in += 1
+                start = self.clock()
+                try:
+                    result = await self._call(stage, item)
+                except Exception as e:
+                    stats.errors += 1
+                    result = None
+                    if stage.on_error is not None:
+                        stage.on_error(item, e)
+                stats.record(start, self.clock())
+
+                if not stage.ordered:
+                    await emit(result)
+                else:
+                    finished[sequence] = result
+                    while state["next"] in finished and not self._stopped[index]:
+                        await emit(finished.pop(state["next"]))
+                        state["next"] += 1
+                if self._stopped[index]:
+                    return
+
+        self._worker_tasks[index] = [asyncio.create_task(work()) for _ in range(stage.workers)]
+        await asyncio.gather(*self._worker_tasks[index], return_exceptions=True)
+        if not self._stopped[index] or (stage.limit is not None and stats.items_out >= stage.limit):
+            await outbox.put(_DONE)
+
+    async def _collect(self, inbox):
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            self.results.append(item)
+
+    async def run(self):
+        """Runs the pipeline to completion and returns the items emitted by the last stage."""
+        self._executor = ThreadPoolExecutor(max_workers=sum(stage.workers for stage in self.stages) + 1)
+        try:
+            queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+            queues.append(asyncio.Queue())
+            self._source_task = asyncio.create_task(self._run_source(queues[0]))
+            self._tasks = [self._source_task]
+            self._tasks += [asyncio.create_task(self._run_stage(i, queues[i], queues[i + 1]))
+                            for i in range(len(self.stages))]
+            self._tasks.append(asyncio.create_task(self._collect(queues[-1])))
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            # Abandoned (timed-out or cancelled) calls are left to finish in the
+            # background, and can check `finished` to tell that no one is waiting.
+            self.finished = True
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        return self.results
+
+    def run_sync(self):
+        return asyncio.run(self.run())
+
+    def cancel(self):
+        """Stops the pipeline; run() returns the results collected so far."""
+        self.cancelled = True
+        for task in self._tasks:
+            task.cancel()
+        for tasks in self._worker_tasks:
+            for task in tasks:
+                task.cancel()
+
+
+@contextmanager
+def timed_step(stats_list, name, clock=time.perf_counter):
+    """Times a sequential step, appending its StageStats to `stats_list`."""
+    stats = StageStats(name)
+    start = clock()
+    try:
+        yield stats
+    finally:
+        stats.items_in = stats.items_in or 1
+        stats.items_out = stats.items_out or 1
+        stats.record(start, clock())
+        stats_list.append(stats)
+
+
+def format_stage_report(stats_list, wall_time):
+    """Formats the per-stage latency breakdown printed at the end of a run."""
+    from tabulate import tabulate
+
+    rows = [[s.name, s.items_in if s.name != "source" else "-", s.items_out, s.errors,
+             f"{s.busy:.2f}", f"{s.busy / max(s.items_in if s.name != 'source' else s.items_out, 1):.3f}",
+             f"{s.max_latency:.3f}", f"{s.blocked:.2f}", f"{s.span:.2f}"]
+            for s in stats_list]
+    headers = ["Stage", "In", "Out", "Errors", "Busy (s)", "Mean (s)", "Max (s)", "Blocked (s)", "Span (s)"]
+    total_span = sum(s.span for s in stats_list)
+    return (tabulate(rows, headers=headers, tablefmt="simple") +
+            f"\nWall time: {wall_time:.2f}s (sum of stage spans: {total_span:.2f}s)")
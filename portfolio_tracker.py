@@ -1,45 +1,299 @@
-import yfinance as yf
+import csv
+from collections import deque
+
+import numpy as np
+
+from instrumentation import instrumented
+from quote_service import get_default_quote_service
+
+LOT_METHODS = ("fifo", "average")
+
+
+def _grow(array, size):
+    """Returns `array` with capacity for at least `size` entries, doubling as needed."""
+    if size <= len(array):
+        return array
+    grown = np.full(max(size, 2 * len(array)), np.nan if array.dtype.kind == 'f' else 0, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
 
 class PortfolioTracker:
-    def __init__(self):
-        self.portfolio = {}
+    """
+    Tracks positions as tax lots held in NumPy arrays.
+
+    Every purchase opens a lot. Sales close lots first-in-first-out, or, with
+    method="average", reduce every open lot of the symbol in proportion, so
+    that the average cost is unchanged. Per-symbol shares, open cost and
+    realized P&L are kept up to date as trades happen. The market value is
+    revalued incrementally whenever a symbol's price changes, so an update
+    costs O(1) regardless of the number of lots.
+
+    Args:
+        quote_service (QuoteService): Prices positions in get_portfolio_performance().
+            Defaults to the process-wide service.
+        method (str): "fifo" or "average".
+        cash (float): The starting cash balance. Purchases draw on it and sales
+            add to it. Without one, cash is not tracked and nav is the market value.
+    """
+    def __init__(self, quote_service=None, method="fifo", cash=None):
+        if method not in LOT_METHODS:
+            raise ValueError(f"Unknown lot method {method!r}; expected one of {LOT_METHODS}")
+        self.quote_service = quote_service
+        self.method = method
+        self.cash = None if cash is None else float(cash)
+
+        self.tickers = []
+        self._index = {}
+        self._shares = np.zeros(0)
+        self._cost = np.zeros(0)
+        self._realized = np.zeros(0)
+        self._prices = np.zeros(0)
+
+        self.lot_count = 0
+        self._lot_symbol = np.zeros(0, dtype=np.int64)
+        self._lot_shares = np.zeros(0)
+        self._lot_price = np.zeros(0)
+        self._open_lots = []
+
+        self._market_value = 0.0
+
+    @classmethod
+    def from_csv(cls, path, **kwargs):
+        """
+        Creates a tracker from a CSV file of open positions with ticker,
+        shares and purchase_price columns, one lot per row.
+        """
+        tracker = cls(**kwargs)
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                tracker.add_position(row["ticker"], float(row["shares"]), float(row["purchase_price"]))
+        return tracker
+
+    def _symbol(self, ticker):
+        index = self._index.get(ticker)
+        if index is None:
+            index = len(self.tickers)
+            self._index[ticker] = index
+            self.tickers.append(ticker)
+            self._shares = _grow(self._shares, index + 1)
+            self._cost = _grow(self._cost, index + 1)
+            self._realized = _grow(self._realized, index + 1)
+            self._prices = _grow(self._prices, index + 1)
+            self._shares[index] = self._cost[index] = self._realized[index] = 0.0
+            self._prices[index] = np.nan
+            self._open_lots.append(deque())
+        return index
+
+    def _add_market_value(self, index, shares):
+        price = self._prices[index]
+        if not np.isnan(price):
+            self._market_value += shares * price
 
     def add_position(self, ticker, shares, purchase_price):
         """
-        Adds a new position to the portfolio.
+        Adds a new position to the portfolio, or adds to an existing one as a new lot.
+        A symbol without a quote yet has no market value until update_price() is called.
+
+        Returns:
+            int: The id of the new lot, as reported by lot_pnl() and taken by close_lot().
+        """
+        index = self._symbol(ticker)
+        lot = self.lot_count
+        self._lot_symbol = _grow(self._lot_symbol, lot + 1)
+        self._lot_shares = _grow(self._lot_shares, lot + 1)
+        self._lot_price = _grow(self._lot_price, lot + 1)
+        self._lot_symbol[lot] = index
+        self._lot_shares[lot] = shares
+        self._lot_price[lot] = purchase_price
+        self.lot_count += 1
+        self._open_lots[index].append(lot)
+
+        self._shares[index] += shares
+        self._cost[index] += shares * purchase_price
+        if self.cash is not None:
+            self.cash -= shares * purchase_price
+        self._add_market_value(index, shares)
+        return lot
+
+    def remove_position(self, ticker, shares, sale_price=None):
+        """
+        Removes shares of a position from the portfolio, closing lots and
+        booking the realized P&L at `sale_price` (the last known price by
+        default, or the lots' purchase price, booking no P&L, if the symbol
+        has no quote yet). Removing more shares than are held closes the position.
+        """
+        index = self._index.get(ticker)
+        if index is None or self._shares[index] <= 0:
+            return
+        sale_price = self._sale_price(index, sale_price)
+        shares = min(shares, self._shares[index])
+        lots = self._open_lots[index]
+
+        if self.method == "fifo":
+            remaining = shares
+            cost = 0.0
+            while remaining > 0 and lots:
+                lot = lots[0]
+                taken = min(remaining, self._lot_shares[lot])
+                cost += taken * self._lot_price[lot]
+                self._lot_shares[lot] -= taken
+                remaining -= taken
+                if self._lot_shares[lot] <= 0:
+                    lots.popleft()
+        else:
+            ids = np.fromiter(lots, dtype=np.int64, count=len(lots))
+            cost = self._cost[index] * shares / self._shares[index]
+            self._lot_shares[ids] *= 1 - shares / self._shares[index]
+
+        self._book_sale(index, shares, cost, sale_price)
+
+    def close_lot(self, lot, sale_price=None):
+        """
+        Sells what is left of one lot (an id from add_position() or lot_pnl()),
+        rather than the lot the method would close first, e.g. the lot whose
+        stop-loss fired. Under method="average" the sale is still booked at
+        the average cost. The sale price defaults as in remove_position().
         """
-        if ticker in self.portfolio:
-            self.portfolio[ticker]['shares'] += shares
+        if not 0 <= lot < self.lot_count or self._lot_shares[lot] <= 0:
+            return
+        index = int(self._lot_symbol[lot])
+        sale_price = self._sale_price(index, sale_price)
+        shares = float(self._lot_shares[lot])
+        if self.method == "fifo":
+            cost = shares * self._lot_price[lot]
         else:
-            self.portfolio[ticker] = {'shares': shares, 'purchase_price': purchase_price}
+            cost = self._cost[index] * shares / self._shares[index]
+        self._lot_shares[lot] = 0.0
+        self._open_lots[index].remove(lot)
+        self._book_sale(index, shares, cost, sale_price)
+
+    def _sale_price(self, index, sale_price):
+        """Returns the price to sell at, or None to sell at cost if the symbol has no quote yet."""
+        if sale_price is None:
+            sale_price = self._prices[index]
+            if np.isnan(sale_price):
+                return None
+        return sale_price
 
-    def remove_position(self, ticker, shares):
+    def _book_sale(self, index, shares, cost, sale_price):
+        """Books the sale of `shares` with a cost basis of `cost` once their lots are reduced."""
+        lots = self._open_lots[index]
+        proceeds = cost if sale_price is None else shares * sale_price
+        self._realized[index] += proceeds - cost
+        self._cost[index] -= cost
+        self._shares[index] -= shares
+        if self.cash is not None:
+            self.cash += proceeds
+        self._add_market_value(index, -shares)
+        if self._shares[index] <= 1e-12:
+            self._shares[index] = self._cost[index] = 0.0
+            self._lot_shares[list(lots)] = 0.0
+            lots.clear()
+
+    def update_price(self, ticker, price):
         """
-        Removes a position from the portfolio.
+        Records a new price for a symbol and revalues the portfolio incrementally.
         """
-        if ticker in self.portfolio:
-            self.portfolio[ticker]['shares'] -= shares
-            if self.portfolio[ticker]['shares'] <= 0:
-                del self.portfolio[ticker]
+        index = self._symbol(ticker)
+        previous = self._prices[index]
+        self._prices[index] = price
+        if np.isnan(previous):
+            self._market_value += self._shares[index] * price
+        else:
+            self._market_value += self._shares[index] * (price - previous)
 
-    def get_portfolio_performance(self):
+    def update_prices(self, prices):
+        """Records a batch of {ticker: price} updates."""
+        for ticker, price in prices.items():
+            self.update_price(ticker, price)
+
+    def revalue(self):
+        """Recomputes the market value from scratch, discarding accumulated rounding error."""
+        count = len(self.tickers)
+        self._market_value = float(np.nansum(self._shares[:count] * self._prices[:count]))
+        return self._market_value
+
+    @property
+    def market_value(self):
+        return self._market_value
+
+    @property
+    def nav(self):
+        """The net asset value: cash plus the market value of every position."""
+        return (self.cash or 0.0) + self._market_value
+
+    @property
+    def portfolio(self):
         """
-        Calculates the overall performance of the portfolio.
+        Returns {ticker: {'shares', 'purchase_price'}} for every open position,
+        where the purchase price is the average cost of the open lots.
         """
-        total_value = 0
-        total_cost = 0
+        return {ticker: {'shares': float(self._shares[i]), 'purchase_price': float(self._cost[i] / self._shares[i])}
+                for i, ticker in enumerate(self.tickers) if self._shares[i] > 0}
+
+    def exposures(self):
+        """Returns {ticker: market value} for every open position with a known price."""
+        count = len(self.tickers)
+        value = self._shares[:count] * self._prices[:count]
+        held = (self._shares[:count] > 0) & ~np.isnan(value)
+        return {self.tickers[i]: float(value[i]) for i in np.flatnonzero(held)}
 
-        for ticker, data in self.portfolio.items():
-            stock = yf.Ticker(ticker)
-            current_price = stock.history(period="1d")['Close'].iloc[-1]
+    def unrealized_pnl(self):
+        """Returns {ticker: unrealized P&L} for every open position with a known price."""
+        count = len(self.tickers)
+        pnl = self._shares[:count] * self._prices[:count] - self._cost[:count]
+        held = self._shares[:count] > 0
+        return {self.tickers[i]: float(pnl[i]) for i in np.flatnonzero(held & ~np.isnan(pnl))}
 
-            total_value += data['shares'] * current_price
-            total_cost += data['shares'] * data['purchase_price']
+    def realized_pnl(self):
+        """Returns {ticker: realized P&L} for every symbol that has been sold."""
+        count = len(self.tickers)
+        return {self.tickers[i]: float(self._realized[i]) for i in np.flatnonzero(self._realized[:count])}
+
+    def lot_pnl(self):
+        """
+        Returns the open lots as a dict of arrays: lot id, ticker, shares,
+        purchase price and unrealized P&L at the last known price.
+        """
+        count = self.lot_count
+        open_lots = np.flatnonzero(self._lot_shares[:count] > 0)
+        symbols = self._lot_symbol[open_lots]
+        shares = self._lot_shares[open_lots]
+        prices = self._lot_price[open_lots]
+        return {
+            "lot": open_lots,
+            "ticker": np.array(self.tickers, dtype=object)[symbols] if len(open_lots) else np.array([], dtype=object),
+            "shares": shares,
+            "purchase_price": prices,
+            "unrealized_pnl": shares * (self._prices[symbols] - prices),
+        }
+
+    def _quote_service(self):
+        return self.quote_service or get_default_quote_service()
+
+    @instrumented("PortfolioTracker.get_portfolio_performance")
+    def get_portfolio_performance(self):
+        """
+        Calculates the overall performance of the portfolio, pricing every
+        position with one batched quote lookup.
+        """
+        held = list(self.portfolio)
+        prices = self._quote_service().get_quotes(held)
+        unpriced = [ticker for ticker in held if ticker not in prices]
+        if unpriced:
+            return f"Could not get a price for: {', '.join(unpriced)}"
+        self.update_prices(prices)
 
+        count = len(self.tickers)
+        total_cost = float(self._cost[:count].sum())
         if total_cost > 0:
+            total_value = self.market_value
             total_return = ((total_value - total_cost) / total_cost) * 100
             return {
                 "Total Portfolio Value": f"${total_value:,.2f}",
-                "Total Return": f"{total_return:.2f}%"
+                "Total Return": f"{total_return:.2f}%",
+                "Unrealized P&L": f"${total_value - total_cost:,.2f}",
+                "Realized P&L": f"${self._realized[:count].sum():,.2f}",
             }
         return "No positions in the portfolio."
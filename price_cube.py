@@ -0,0 +1,219 @@
+"""
+An aligned (field x ticker x date) price cube stored as memory-mapped arrays.
+
+A cube is a directory holding the OHLCV values of many tickers on one shared
+calendar, with NaN wherever a ticker has no bar (before it listed, after it
+delisted, or during a halt):
+
+    meta.json   tickers, fields and value dtype
+    dates.npy   the calendar, as datetime64[ns] (tz-naive exchange dates)
+    data.npy    the values, shape (len(fields), len(tickers), len(dates))
+
+Opening a cube maps the files without reading them, so it takes milliseconds
+whatever the size, and only the pages that are actually touched become
+resident. Each ticker's series for a field is contiguous, and the accessors
+return views of the mapping, so a DataFrame built over one ticker, a range
+of tickers or a range of dates costs no copy. Cubes can be stored as float32
+to halve their size; float32 keeps about seven significant digits, which is
+ample for prices, and volumes above 16.7M are rounded to that precision.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from history_store import FIELDS, frame_to_bars, period_start
+
+DTYPES = ("float64", "float32")
+
+
+class PriceCube:
+    """
+    A read-only price cube. Use PriceCube.build() or PriceCube.from_store()
+    to write one, and PriceCube.open() to map an existing one.
+    """
+    def __init__(self, path, data, dates, tickers, fields):
+        self.path = path
+        self.data = data
+        self.dates = dates
+        self.tickers = tickers
+        self.fields = fields
+        self._ticker_index = {ticker: i for i, ticker in enumerate(tickers)}
+        self._field_index = {field: i for i, field in enumerate(fields)}
+
+    @classmethod
+    def open(cls, path):
+        """Maps the cube stored at `path` read-only."""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        data = np.load(os.path.join(path, "data.npy"), mmap_mode="r")
+        dates = pd.DatetimeIndex(np.load(os.path.join(path, "dates.npy")), name="Date")
+        return cls(path, data, dates, meta["tickers"], meta["fields"])
+
+    @classmethod
+    def build(cls, path, histories, dtype="float64", calendar=None):
+        """
+        Writes a cube from per-ticker histories and returns it opened.
+
+        Args:
+            path (str): The cube directory. An existing cube there is replaced.
+            histories (dict): Maps tickers to history()-shaped DataFrames or to
+                HistoryStore record arrays.
+            dtype (str): "float64" or "float32".
+            calendar (pd.DatetimeIndex): The dates of the cube. Defaults to every date
+                on which any ticker has a bar. Bars on other dates are left out.
+
+        Returns:
+            PriceCube: The new cube.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported cube dtype {dtype!r}; expected one of {DTYPES}")
+        bars = {ticker.upper(): frame_to_bars(history) if isinstance(history, pd.DataFrame) else history
+                for ticker, history in histories.items()}
+        if calendar is None:
+            dates = np.unique(np.concatenate([np.asarray(b["date"]) for b in bars.values()] or [np.zeros(0, "i8")]))
+        else:
+            calendar = pd.DatetimeIndex(calendar)
+            if calendar.tz is not None:
+                calendar = calendar.tz_localize(None)
+            dates = np.unique(calendar.as_unit("ns").asi8)
+        tickers = list(bars)
+
+        tmp_path = path.rstrip(os.sep) + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        data = np.lib.format.open_memmap(os.path.join(tmp_path, "data.npy"), mode="w+", dtype=dtype,
+                                         shape=(len(FIELDS), len(tickers), len(dates)))
+        data[:] = np.nan
+        for t, ticker in enumerate(tickers):
+            ticker_bars = bars[ticker]
+            positions = np.searchsorted(dates, ticker_bars["date"])
+            found = positions < len(dates)
+            found[found] = dates[positions[found]] == np.asarray(ticker_bars["date"])[found]
+            for f, field in enumerate(FIELDS):
+                data[f, t, positions[found]] = np.asarray(ticker_bars[field])[found]
+        data.flush()
+        del data
+        np.save(os.path.join(tmp_path, "dates.npy"), dates.astype("datetime64[ns]"))
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump({"tickers": tickers, "fields": FIELDS, "dtype": dtype}, f)
+
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+        return cls.open(path)
+
+    @classmethod
+    def from_store(cls, path, store, tickers, interval="1d", period="max", **kwargs):
+        """Writes a cube from the bars held in a HistoryStore, without refreshing them."""
+        histories = {ticker: store.bars(ticker, period=period, interval=interval, refresh=False)
+                     for ticker in tickers}
+        return cls.build(path, {ticker: bars for ticker, bars in histories.items() if len(bars)}, **kwargs)
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    @property
+    def shape(self):
+        """(fields, tickers, dates)"""
+        return self.data.shape
+
+    def _tickers(self, tickers):
+        """Converts a ticker selection into an index into the ticker axis: a slice where possible."""
+        if tickers is None:
+            return slice(None)
+        positions = [self._ticker_index[ticker.upper()] for ticker in tickers]
+        if positions and positions == list(range(positions[0], positions[-1] + 1)):
+            return slice(positions[0], positions[-1] + 1)
+        return positions
+
+    def _dates(self, start, end):
+        first = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side="left")
+        last = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        return slice(first, last)
+
+    def values(self, field, tickers=None, start=None, end=None):
+        """
+        Returns one field as a (ticker, date) array, between `start` and `end`
+        inclusive. The array is a view of the mapping unless `tickers` picks
+        tickers that are not adjacent in the cube.
+        """
+        return self.data[self._field_index[field], self._tickers(tickers), self._dates(start, end)]
+
+    def panel(self, tickers=None, start=None, end=None):
+        """
+        Returns a wide DataFrame with (field, ticker) MultiIndex columns, in the
+        layout produced by batch_analyzer.download_panel(), so it can be passed
+        straight to the technical_indicators functions. Each field's columns are
+        a view of the mapping unless `tickers` picks tickers that are not adjacent.
+        """
+        selection = self._tickers(tickers)
+        dates = self._dates(start, end)
+        names = self.tickers[selection] if isinstance(selection, slice) else [self.tickers[i] for i in selection]
+        index = self.dates[dates]
+        # One frame per field: a (ticker, date) slice of the cube is a view, but
+        # flattening the field and ticker axes of a ticker subset would copy it.
+        frames = [pd.DataFrame(self.data[f, selection, dates].T, index=index, columns=names, copy=False)
+                  for f in range(len(self.fields))]
+        return pd.concat(frames, axis=1, keys=self.fields)
+
+    def history(self, ticker, start=None, end=None, dropna=False):
+        """
+        Returns a history()-shaped DataFrame for one ticker, as a view of the
+        mapping. Dates without a bar hold NaN; with dropna=True the dates before
+        the first bar and after the last are trimmed, and any gaps in between
+        are dropped, which copies the frame only if there are such gaps.
+        """
+        dates = self._dates(start, end)
+        series = self.data[:, self._ticker_index[ticker.upper()], dates]
+        index = self.dates[dates]
+        if dropna:
+            valid = np.flatnonzero(~np.isnan(series[self._field_index["Close"]]))
+            first, last = (valid[0], valid[-1] + 1) if len(valid) else (0, 0)
+            series, index = series[:, first:last], index[first:last]
+        frame = pd.DataFrame(series.T, index=index, columns=self.fields, copy=False)
+        if dropna and len(valid) != len(frame):
+            frame = frame[~np.isnan(series[self._field_index["Close"]])]
+        return frame
+
+    def history_fetcher(self, ticker, period="1y", interval="1d"):
+        """
+        Serves daily history from the cube in the signature HistoryCache expects,
+        e.g. HistoryCache(history_fetcher=cube.history_fetcher). Periods count
+        back from the cube's last date.
+        """
+        if interval != "1d":
+            raise ValueError(f"The price cube holds daily bars, not {interval!r} bars")
+        end = self.dates[-1] if len(self.dates) else None
+        start = period_start(period, now=end) if end is not None else None
+        return self.history(ticker, start=start, dropna=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from history_store import HistoryStore
+
+    parser = argparse.ArgumentParser(description="Build a memory-mapped price cube from a local OHLCV store")
+    parser.add_argument("history_dir", help="Directory of the HistoryStore to read bars from")
+    parser.add_argument("output", help="Directory to write the cube to")
+    parser.add_argument("--tickers", type=str, help="File of ticker symbols (default: every stored daily ticker)")
+    parser.add_argument("--float32", action="store_true", help="Store values as float32 to halve the cube's size")
+    args = parser.parse_args()
+
+    if args.tickers:
+        from universe_scan import read_ticker_list
+
+        symbols = read_ticker_list(args.tickers)
+    else:
+        symbols = sorted(name[:-len(".npy")] for name in os.listdir(os.path.join(args.history_dir, "1d"))
+                         if name.endswith(".npy"))
+    started = time.perf_counter()
+    cube = PriceCube.from_store(args.output, HistoryStore(args.history_dir), symbols,
+                                dtype="float32" if args.float32 else "float64")
+    print(f"Wrote {len(cube.tickers):,} tickers x {len(cube.dates):,} dates ({cube.data.nbytes / 1e6:,.1f} MB) "
+          f"to {args.output} in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,179 @@
+import csv
+import json
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+from stock_analyzer import STOP_LOSS_MULTIPLIER, TAKE_PROFIT_MULTIPLIER
+
+
+class _Levels:
+    """The stop and target levels of one ticker, each a sorted list of (price, position) pairs."""
+    __slots__ = ("stops", "targets")
+
+    def __init__(self):
+        self.stops = []
+        self.targets = []
+
+
+def _discard(levels, entry):
+    index = bisect_left(levels, entry)
+    if index < len(levels) and levels[index] == entry:
+        del levels[index]
+
+
+class PriceMonitor:
+    """
+    Watches stop-loss and take-profit levels against a stream of price ticks.
+
+    Each ticker's levels are kept in sorted lists, so a tick bisects straight
+    to the levels it crosses: a stop fires when the price falls to or below
+    it, a target when the price rises to or above it. Once either level of a
+    position fires, both are removed, and an event is sent to every sink.
+
+    Args:
+        sinks (list): Callables that receive each event dictionary.
+        tracker (PortfolioTracker): If given, every tick is passed to its
+            update_price(), and when a position loaded from it fires, its lot
+            is closed in it at the tick price.
+    """
+    def __init__(self, sinks=(), tracker=None):
+        self.sinks = list(sinks)
+        self.tracker = tracker
+        self.positions = {}
+        self.ticks = 0
+        self.busy = 0.0
+        self.max_latency = 0.0
+        self._levels = {}
+        self._ids = {}
+        self._next_seq = 0
+
+    def add_position(self, position_id, ticker, shares, stop_loss, take_profit, lot=None):
+        """
+        Starts watching a position's stop-loss and take-profit levels. A position
+        with a tracker `lot` id has that lot closed in the tracker when it fires.
+        """
+        if position_id in self._ids:
+            self.remove_position(position_id)
+        seq = self._next_seq
+        self._next_seq += 1
+        self.positions[seq] = {
+            "id": position_id, "ticker": ticker, "shares": shares,
+            "stop_loss": stop_loss, "take_profit": take_profit, "lot": lot,
+        }
+        self._ids[position_id] = seq
+        levels = self._levels.setdefault(ticker, _Levels())
+        insort(levels.stops, (stop_loss, seq))
+        insort(levels.targets, (take_profit, seq))
+
+    def remove_position(self, position_id):
+        seq = self._ids.pop(position_id)
+        position = self.positions.pop(seq)
+        levels = self._levels[position["ticker"]]
+        _discard(levels.stops, (position["stop_loss"], seq))
+        _discard(levels.targets, (position["take_profit"], seq))
+
+    def load_tracker(self, tracker, stop_multiplier=STOP_LOSS_MULTIPLIER,
+                     take_profit_multiplier=TAKE_PROFIT_MULTIPLIER):
+        """
+        Watches every open lot of a PortfolioTracker, with levels set from the
+        lot's purchase price as StockAnalyzer.get_sell_prices() sets them.
+        """
+        self.tracker = tracker
+        lots = tracker.lot_pnl()
+        counts = {}
+        for lot, ticker, shares, price in zip(lots["lot"], lots["ticker"], lots["shares"], lots["purchase_price"]):
+            counts[ticker] = counts.get(ticker, 0) + 1
+            self.add_position(f"{ticker}#{counts[ticker]}", ticker, float(shares),
+                              float(price) * stop_multiplier, float(price) * take_profit_multiplier,
+                              lot=int(lot))
+
+    def on_tick(self, ticker, price, timestamp=None):
+        """Processes one price tick and returns the list of events it triggered."""
+        start = time.perf_counter()
+        events = []
+        levels = self._levels.get(ticker)
+        if levels is not None and (levels.stops or levels.targets):
+            stops = levels.stops[bisect_left(levels.stops, (price,)):]
+            targets = levels.targets[:bisect_right(levels.targets, (price, float("inf")))]
+            for kind, crossed in (("stop_loss", stops), ("take_profit", targets)):
+                for level, seq in crossed:
+                    position = self.positions.get(seq)
+                    if position is None:  # already closed by its other level on this tick
+                        continue
+                    self.remove_position(position["id"])
+                    events.append({
+                        "time": timestamp if timestamp is not None else datetime.now().isoformat(timespec="seconds"),
+                        "event": kind,
+                        "position": position["id"],
+                        "ticker": ticker,
+                        "shares": position["shares"],
+                        "level": level,
+                        "price": price,
+                    })
+                    if self.tracker is not None and position["lot"] is not None:
+                        self.tracker.close_lot(position["lot"], sale_price=price)
+        if self.tracker is not None:
+            self.tracker.update_price(ticker, price)
+
+        elapsed = time.perf_counter() - start
+        self.ticks += 1
+        self.busy += elapsed
+        self.max_latency = max(self.max_latency, elapsed)
+        for event in events:
+            for sink in self.sinks:
+                sink(event)
+        return events
+
+    def run(self, feed, stop_when_flat=True):
+        """
+        Processes (timestamp, ticker, price) ticks from a feed until it ends,
+        or, with stop_when_flat, until no positions are left to watch.
+        """
+        for timestamp, ticker, price in feed:
+            self.on_tick(ticker, price, timestamp)
+            if stop_when_flat and not self.positions:
+                break
+
+    def latency_report(self):
+        mean = self.busy / self.ticks if self.ticks else 0.0
+        return (f"{self.ticks} ticks, mean {mean * 1e6:.1f}us, max {self.max_latency * 1e6:.1f}us per tick, "
+                f"{len(self.positions)} positions still watched")
+
+
+class JsonLinesSink:
+    """Appends each event to a local JSON-lines file, flushed so other processes can tail it."""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a")
+
+    def __call__(self, event):
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def print_sink(event):
+    """Prints each event as a one-line alert."""
+    label = "STOP LOSS" if event["event"] == "stop_loss" else "TAKE PROFIT"
+    print(f"  ! {label} {event['ticker']} ({event['position']}): {event['price']:.2f} crossed "
+          f"{event['level']:.2f} at {event['time']}", flush=True)
+
+
+def replay_feed(path):
+    """Yields (timestamp, ticker, price) ticks from a CSV file with those three columns."""
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield row["timestamp"], row["ticker"], float(row["price"])
+
+
+def poll_quote_feed(quote_service, tickers, interval=15.0, sleep=time.sleep):
+    """Yields ticks by polling a QuoteService for every ticker every `interval` seconds, indefinitely."""
+    tickers = list(tickers)
+    while True:
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        for ticker, price in quote_service.get_quotes(tickers).items():
+            yield timestamp, ticker, price
+        sleep(interval)
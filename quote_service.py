@@ -0,0 +1,132 @@
+import math
+import time
+
+from history_cache import TTLCache, get_default_cache
+from instrumentation import count, instrumented
+
+
+@instrumented("yfinance.quotes")
+def fetch_yfinance_quotes(tickers):
+    """
+    Returns {ticker: last price} for a batch of tickers from a single request
+    for a few daily bars each. During market hours the last daily bar carries
+    the current price, so this replaces two days of 1-minute bars per ticker.
+    """
+    import pandas as pd
+    import yfinance as yf
+
+    data = yf.download(tickers=list(tickers), period="5d", interval="1d", group_by="column",
+                       auto_adjust=True, progress=False, threads=True)
+    if data is None or data.empty:
+        return {}
+    closes = data["Close"]
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(tickers[0])
+    last = closes.ffill().iloc[-1]
+    return {ticker: float(price) for ticker, price in last.items() if pd.notna(price)}
+
+
+class QuoteService:
+    """
+    Serves last prices for tickers, batching lookups to the source and caching
+    quotes for `ttl` seconds.
+
+    A ticker the source cannot price is served, in order of preference, from
+    its last (expired) quote or from the close of the latest bar in the
+    history cache, so a price refresh degrades instead of failing.
+
+    Args:
+        source (callable): Takes a list of tickers and returns {ticker: price},
+            omitting any it has no price for. Defaults to yfinance.
+        ttl (float): Seconds a quote is served from the cache.
+        history_cache (HistoryCache): Where to look for a fallback bar. Defaults
+            to the process-wide cache.
+        batch_size (int): The maximum number of tickers per source call.
+        maxsize (int): The maximum number of quotes cached.
+        clock (callable): Returns the current time in seconds.
+    """
+    def __init__(self, source=None, ttl=15.0, history_cache=None, batch_size=200, maxsize=4096,
+                 clock=time.monotonic):
+        self.source = source or fetch_yfinance_quotes
+        self.history_cache = history_cache
+        self.batch_size = batch_size
+        self.quotes = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._last_known = {}
+        self.requests = 0
+        self.fallbacks = 0
+        self.last_error = None
+
+    def _fetch(self, tickers):
+        prices = {}
+        for i in range(0, len(tickers), self.batch_size):
+            batch = tickers[i:i + self.batch_size]
+            self.requests += 1
+            try:
+                fetched = self.source(batch)
+            except Exception as e:
+                self.last_error = e
+                continue
+            prices.update((ticker.upper(), float(price)) for ticker, price in fetched.items()
+                          if price is not None and not math.isnan(price))
+        return prices
+
+    def _fallback(self, ticker):
+        stale = self._last_known.get(ticker)
+        if stale is not None:
+            return stale
+        return (self.history_cache or get_default_cache()).latest_close(ticker)
+
+    def get_quotes(self, tickers):
+        """
+        Returns {ticker: last price} for the tickers, fetching every ticker
+        without a fresh cached quote in as few source calls as possible.
+        Tickers with no price from any source are left out.
+        """
+        quotes = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            price = self.quotes.get(ticker.upper())
+            if price is None:
+                missing.append(ticker)
+            else:
+                quotes[ticker] = price
+
+        if missing:
+            fetched = self._fetch([ticker.upper() for ticker in missing])
+            for ticker in missing:
+                key = ticker.upper()
+                if key in fetched:
+                    self.quotes.set(key, fetched[key])
+                    self._last_known[key] = fetched[key]
+                    quotes[ticker] = fetched[key]
+                    continue
+                price = self._fallback(key)
+                if price is not None:
+                    self.fallbacks += 1
+                    count("quotes.fallbacks")
+                    quotes[ticker] = price
+        return quotes
+
+    def get_quote(self, ticker):
+        """Returns the last price of one ticker, raising KeyError if none is available."""
+        quotes = self.get_quotes([ticker])
+        if ticker not in quotes:
+            raise KeyError(f"No quote available for {ticker}")
+        return quotes[ticker]
+
+
+_default_service = None
+
+
+def get_default_quote_service():
+    """Returns the process-wide QuoteService, creating it on first use."""
+    global _default_service
+    if _default_service is None:
+        _default_service = QuoteService()
+    return _default_service
+
+
+def set_default_quote_service(service):
+    """Replaces the process-wide QuoteService (e.g. with one reading a local fake source)."""
+    global _default_service
+    _default_service = service
@@ -0,0 +1,201 @@
+"""
+Multi-timeframe bars derived from cached bars.
+
+Intraday timeframes (5m, 15m, 1h, ...) are built from 1-minute bars, and
+weekly and monthly bars from daily bars, so any timeframe is available from
+the two series a HistoryStore already keeps, without further downloads.
+Each output bar takes the first open, highest high, lowest low, last close
+and total volume of the bars inside it, and is labelled with the start of
+its period: intraday bars are aligned to the session open (09:30 by
+default, as yfinance aligns hourly bars), weekly bars start on Monday and
+monthly bars on the first of the month.
+
+IncrementalResampler keeps a resampled series up to date as new bars
+arrive, re-aggregating only the bar still forming.
+"""
+import numpy as np
+import pandas as pd
+
+from history_store import FIELDS, bars_to_frame, period_start
+
+MINUTE = 60 * 10**9
+DAY = 24 * 60 * MINUTE
+
+# Intraday timeframes, in minutes.
+INTRADAY = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "1h": 60, "60m": 60, "90m": 90}
+CALENDAR = ("1d", "1wk", "1mo")
+TIMEFRAMES = tuple(INTRADAY) + CALENDAR
+
+
+def bin_starts(index, timeframe, session_open="09:30"):
+    """
+    Returns, for each timestamp, the start of the `timeframe` bar it falls in.
+    Bins are computed on wall-clock time, so tz-aware indexes keep exchange hours.
+    """
+    index = pd.DatetimeIndex(index)
+    wall = index.tz_localize(None) if index.tz is not None else index
+    ns = wall.as_unit("ns").asi8
+    days = ns - ns % DAY
+    if timeframe in INTRADAY:
+        width = INTRADAY[timeframe] * MINUTE
+        offset = pd.Timedelta(f"{session_open}:00").value
+        starts = days + offset + (ns - days - offset) // width * width
+    elif timeframe == "1d":
+        starts = days
+    elif timeframe == "1wk":
+        starts = days - wall.dayofweek.to_numpy().astype(np.int64) * DAY
+    elif timeframe == "1mo":
+        starts = days - (wall.day.to_numpy().astype(np.int64) - 1) * DAY
+    else:
+        raise ValueError(f"Unsupported timeframe {timeframe!r}; expected one of {TIMEFRAMES}")
+    result = pd.DatetimeIndex(starts.astype("datetime64[ns]"), name=index.name)
+    return result.tz_localize(index.tz) if index.tz is not None else result
+
+
+def resample(frame, timeframe, session_open="09:30"):
+    """
+    Aggregates a history()-shaped DataFrame into `timeframe` bars. Bars without
+    a close are ignored, and periods without any bars are left out.
+    """
+    if not frame.index.is_monotonic_increasing:
+        frame = frame.sort_index()
+    if frame["Close"].isna().any():
+        frame = frame[frame["Close"].notna()]
+    if frame.empty:
+        return pd.DataFrame(columns=FIELDS, index=frame.index[:0], dtype=float)
+
+    starts = bin_starts(frame.index, timeframe, session_open)
+    keys = starts.asi8
+    first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    last = np.r_[first[1:] - 1, len(keys) - 1]
+    values = {field: frame[field].to_numpy(dtype=np.float64) for field in FIELDS}
+    return pd.DataFrame({
+        "Open": values["Open"][first],
+        "High": np.fmax.reduceat(values["High"], first),
+        "Low": np.fmin.reduceat(values["Low"], first),
+        "Close": values["Close"][last],
+        "Volume": np.add.reduceat(np.nan_to_num(values["Volume"]), first),
+    }, index=starts[first])
+
+
+class IncrementalResampler:
+    """
+    Maintains `timeframe` bars from a stream of finer bars.
+
+    The source bars of the bar still forming are kept, so that an update only
+    re-aggregates that bar and the new ones. Source bars may be re-sent with
+    revised values (a store re-fetches its last, partial bar) as long as they
+    belong to the forming bar; older source bars are ignored.
+    """
+    def __init__(self, timeframe, session_open="09:30"):
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unsupported timeframe {timeframe!r}; expected one of {TIMEFRAMES}")
+        self.timeframe = timeframe
+        self.session_open = session_open
+        self._chunks = []
+        self._forming = None
+        self._pending = None
+
+    def update(self, bars):
+        """
+        Feeds new source bars (a history()-shaped DataFrame in time order).
+
+        Returns:
+            int: The number of bars completed by this update.
+        """
+        if bars.empty:
+            return 0
+        if self._pending is not None:
+            bars = bars[bars.index >= self._forming.index[0]]
+            combined = pd.concat([self._pending, bars[FIELDS]])
+            combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+        else:
+            combined = bars[FIELDS]
+
+        resampled = resample(combined, self.timeframe, self.session_open)
+        if resampled.empty:
+            return 0
+        completed = resampled.iloc[:-1]
+        if len(completed):
+            self._chunks.append(completed)
+        self._forming = resampled.iloc[-1:]
+        self._pending = combined[bin_starts(combined.index, self.timeframe, self.session_open) >= self._forming.index[0]]
+        return len(completed)
+
+    @property
+    def completed(self):
+        """The bars whose period has ended, as a DataFrame."""
+        if len(self._chunks) > 1:
+            self._chunks = [pd.concat(self._chunks)]
+        if self._chunks:
+            return self._chunks[0]
+        return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([]), dtype=float)
+
+    @property
+    def bars(self):
+        """Every bar so far, including the one still forming."""
+        if self._forming is None:
+            return self.completed
+        if not self._chunks:
+            return self._forming
+        return pd.concat([self.completed, self._forming])
+
+
+class MultiTimeframeHistory:
+    """
+    Serves history for any timeframe from a HistoryStore: intraday timeframes
+    are resampled from `intraday_source` bars and weekly and monthly ones from
+    `daily_source` bars, while the source intervals themselves are served as
+    stored. Resampled series are kept per ticker and timeframe and updated
+    with only the source bars that arrived since the last call.
+
+    history() has the signature HistoryCache expects of a history fetcher,
+    e.g. HistoryCache(history_fetcher=MultiTimeframeHistory(store).history).
+    """
+    def __init__(self, store, intraday_source="1m", daily_source="1d", session_open="09:30"):
+        self.store = store
+        self.intraday_source = intraday_source
+        self.daily_source = daily_source
+        self.session_open = session_open
+        self._resamplers = {}
+        self._fed_until = {}
+
+    def source_interval(self, interval):
+        """Returns the stored interval that `interval` is served from."""
+        if interval in (self.intraday_source, self.daily_source):
+            return interval
+        if interval in INTRADAY:
+            if INTRADAY[interval] % INTRADAY[self.intraday_source]:
+                raise ValueError(f"{interval!r} bars cannot be built from {self.intraday_source!r} bars")
+            return self.intraday_source
+        if interval in CALENDAR:
+            return self.daily_source
+        raise ValueError(f"Unsupported timeframe {interval!r}; expected one of {TIMEFRAMES}")
+
+    def bars(self, ticker, interval):
+        """Returns every `interval` bar derivable from the store, updating the resampled series first."""
+        source = self.source_interval(interval)
+        if source == interval:
+            return bars_to_frame(self.store.bars(ticker, period="max", interval=interval))
+
+        key = (ticker.upper(), interval)
+        resampler = self._resamplers.get(key)
+        if resampler is None:
+            resampler = self._resamplers[key] = IncrementalResampler(interval, self.session_open)
+        stored = self.store.bars(ticker, period="max", interval=source)
+        fed_until = self._fed_until.get(key)
+        if fed_until is not None and len(stored):
+            # The last bar fed is sent again, as the store may have revised it.
+            stored = stored[np.searchsorted(stored["date"], fed_until):]
+        if len(stored):
+            resampler.update(bars_to_frame(stored))
+            self._fed_until[key] = int(stored["date"][-1])
+        return resampler.bars
+
+    def history(self, ticker, period="1y", interval="1d"):
+        """Returns a history()-shaped DataFrame of `interval` bars covering `period`."""
+        bars = self.bars(ticker, interval)
+        start = period_start(period)
+        if start is not None:
+            bars = bars[bars.index >= start]
+        return bars
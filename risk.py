@@ -0,0 +1,270 @@
+"""
+Portfolio risk from an exponentially weighted return covariance.
+
+RiskModel keeps the covariance of returns across every symbol it has seen,
+updated with each new bar as
+
+    C = decay * C + (1 - decay) * r r'
+
+(the RiskMetrics estimator, with returns assumed to have zero mean), so a
+refresh costs one rank-1 update of the matrix rather than a recompute over
+the whole window. A symbol with no return on a bar (no price yet, or a
+halt) contributes nothing to it, and each symbol's entries are corrected for
+the weight of the bars it has actually seen. The last `window` bars of
+returns are also kept, for historical VaR.
+
+Risk figures are computed for dollar exposures, e.g. the market values from
+PortfolioTracker.exposures(): volatility and VaR are in dollars over
+`horizon` bars (scaled by the square root of the horizon), and each
+position's contribution is its share of the portfolio volatility.
+"""
+import math
+from dataclasses import dataclass, field
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(slots=True)
+class RiskSummary:
+    """Risk figures for a portfolio, in dollars over `horizon` bars."""
+    confidence: float
+    horizon: int
+    volatility: float
+    parametric_var: float
+    historical_var: float
+    contributions: dict = field(default_factory=dict)
+    correlations: dict = field(default_factory=dict)
+    unmodelled: list = field(default_factory=list)
+
+    def format_lines(self, nav, top=5):
+        """Formats the summary as lines of the trading context's portfolio snapshot."""
+        share = (lambda value: f" ({value / nav * 100:.1f}% of NAV)") if nav else (lambda value: "")
+        level = f"{self.horizon}-day, {self.confidence:.0%}"
+        lines = [
+            f"Portfolio Volatility ({self.horizon}-day): ${self.volatility:,.2f}{share(self.volatility)}",
+            f"Value at Risk ({level}): parametric ${self.parametric_var:,.2f}{share(self.parametric_var)}, "
+            f"historical ${self.historical_var:,.2f}{share(self.historical_var)}",
+        ]
+        if self.contributions and self.volatility > 0:
+            largest = sorted(self.contributions.items(), key=lambda item: -abs(item[1]))[:top]
+            lines.append("Risk Contributions: " + ", ".join(
+                f"{ticker} {value / self.volatility:.0%}" for ticker, value in largest))
+        if self.correlations:
+            lines.append("Correlation with Portfolio: " + ", ".join(
+                f"{ticker} {value:.2f}" for ticker, value in self.correlations.items() if not math.isnan(value)))
+        if self.unmodelled:
+            lines.append(f"Excluded from risk (no price or return history): {', '.join(self.unmodelled)}")
+        return lines
+
+
+class RiskModel:
+    """
+    An exponentially weighted covariance of returns across symbols, updated
+    incrementally bar by bar.
+
+    Args:
+        decay (float): The weight kept by the previous estimate on each bar (0.94
+            is the RiskMetrics daily value, a half-life of about 11 bars).
+        window (int): Bars of returns kept for historical VaR.
+    """
+    def __init__(self, decay=0.94, window=250):
+        if not 0 < decay < 1:
+            raise ValueError("decay must be between 0 and 1")
+        self.decay = decay
+        self.window = window
+        self.tickers = []
+        self._index = {}
+        self._cov = np.zeros((0, 0))
+        self._weight = np.zeros(0)
+        self._last_prices = np.zeros(0)
+        self._returns = np.zeros((window, 0))
+        self.bars = 0
+
+    @classmethod
+    def from_prices(cls, closes, **kwargs):
+        """
+        Creates a model from a DataFrame of closes, one column per ticker and
+        one row per bar, as returned by load_closes().
+        """
+        model = cls(**kwargs)
+        model.update_prices_batch(closes)
+        return model
+
+    def _symbols(self, tickers):
+        """Returns the indexes of the tickers, adding rows and columns for new ones."""
+        new = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self._index]
+        if new:
+            old, size = len(self.tickers), len(self.tickers) + len(new)
+            for ticker in new:
+                self._index[ticker] = len(self.tickers)
+                self.tickers.append(ticker)
+            cov = np.zeros((size, size))
+            cov[:old, :old] = self._cov
+            self._cov = cov
+            self._weight = np.r_[self._weight, np.zeros(len(new))]
+            self._last_prices = np.r_[self._last_prices, np.full(len(new), np.nan)]
+            self._returns = np.hstack([self._returns, np.zeros((self.window, len(new)))])
+        return np.array([self._index[ticker] for ticker in tickers], dtype=np.int64)
+
+    def update_returns(self, returns):
+        """
+        Folds bars of returns into the model.
+
+        Args:
+            returns (pd.DataFrame): One row per bar and one column per ticker, in
+                time order. NaN marks a ticker without a return on that bar.
+        """
+        if returns.empty:
+            return
+        self._update(self._symbols(list(returns.columns)), returns.to_numpy(dtype=np.float64))
+
+    def _update(self, index, returns):
+        """Folds in a (bar, ticker) array of returns for the symbols at `index`."""
+        values = np.zeros((len(returns), len(self.tickers)))
+        values[:, index] = returns
+        observed = ~np.isnan(values)
+        observed[:, np.setdiff1d(np.arange(len(self.tickers)), index)] = False
+        values[~observed] = 0.0
+
+        # The bars' weights, most recent last: (1 - decay) * decay ** age.
+        bars = len(values)
+        weights = (1 - self.decay) * self.decay ** np.arange(bars - 1, -1, -1)
+        self._cov *= self.decay ** bars
+        self._cov += (values * weights[:, None]).T @ values
+        self._weight = self._weight * self.decay ** bars + weights @ observed
+
+        rows = (self.bars + np.arange(bars)) % self.window
+        keep = rows[-self.window:]
+        self._returns[keep] = values[-self.window:]
+        self.bars += bars
+
+    def update_prices(self, prices):
+        """
+        Folds in one new bar of {ticker: price}, as a rank-1 update. A ticker's
+        first price only sets the base for its next return.
+        """
+        index = self._symbols(list(prices))
+        current = np.array(list(prices.values()), dtype=np.float64)
+        previous = self._last_prices[index]
+        self._last_prices[index] = current
+        self._update(index, (current / previous - 1)[None, :])
+
+    def update_prices_batch(self, closes):
+        """Folds in consecutive bars of closes (a DataFrame with one column per ticker)."""
+        if closes.empty:
+            return
+        index = self._symbols(list(closes.columns))
+        values = closes.to_numpy(dtype=np.float64)
+        # Carry prices over gaps so that the return after a gap spans it.
+        filled = pd.DataFrame(np.vstack([self._last_prices[index], values])).ffill().to_numpy()
+        returns = filled[1:] / filled[:-1] - 1
+        returns[np.isnan(values)] = np.nan
+        self._last_prices[index] = filled[-1]
+        self._update(index, returns)
+
+    def _corrected(self):
+        scale = np.sqrt(np.where(self._weight > 0, self._weight, np.inf))
+        return self._cov / np.outer(scale, scale)
+
+    def covariance(self, tickers=None):
+        """Returns the covariance of one-bar returns as a DataFrame."""
+        tickers = self.tickers if tickers is None else list(tickers)
+        index = np.array([self._index[ticker] for ticker in tickers], dtype=np.int64)
+        return pd.DataFrame(self._corrected()[np.ix_(index, index)], index=tickers, columns=tickers)
+
+    def correlation(self, tickers=None):
+        """Returns the correlation of one-bar returns as a DataFrame."""
+        cov = self.covariance(tickers)
+        scale = np.sqrt(np.diag(cov.to_numpy()))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return cov / np.outer(scale, scale)
+
+    def _exposures(self, exposures):
+        vector = np.zeros(len(self.tickers))
+        for ticker, value in exposures.items():
+            index = self._index.get(ticker)
+            if index is not None:
+                vector[index] = value
+        return vector
+
+    def volatility(self, exposures, horizon=1):
+        """Returns the standard deviation of the portfolio's P&L in dollars."""
+        w = self._exposures(exposures)
+        return float(math.sqrt(max(w @ self._corrected() @ w, 0.0) * horizon))
+
+    def parametric_var(self, exposures, confidence=0.95, horizon=1):
+        """Returns the normal (variance-covariance) VaR in dollars, as a positive loss."""
+        return NormalDist().inv_cdf(confidence) * self.volatility(exposures, horizon)
+
+    def historical_var(self, exposures, confidence=0.95, horizon=1):
+        """Returns the VaR in dollars over the stored window of returns, as a positive loss."""
+        bars = min(self.bars, self.window)
+        if not bars:
+            return math.nan
+        pnl = self._returns[:bars] @ self._exposures(exposures)
+        return float(max(-np.quantile(pnl, 1 - confidence), 0.0) * math.sqrt(horizon))
+
+    def contributions(self, exposures, horizon=1):
+        """
+        Returns {ticker: contribution to the portfolio volatility in dollars}.
+        The contributions add up to the volatility.
+        """
+        w = self._exposures(exposures)
+        sigma = self.volatility(exposures, horizon)
+        if sigma == 0:
+            return {ticker: 0.0 for ticker in exposures if ticker in self._index}
+        marginal = self._corrected() @ w * horizon / sigma
+        return {ticker: float(w[self._index[ticker]] * marginal[self._index[ticker]])
+                for ticker in exposures if ticker in self._index}
+
+    def portfolio_correlations(self, exposures, tickers):
+        """Returns {ticker: correlation of the ticker's returns with the portfolio's P&L}."""
+        w = self._exposures(exposures)
+        cov = self._corrected()
+        sigma = math.sqrt(max(w @ cov @ w, 0.0))
+        result = {}
+        for ticker in tickers:
+            index = self._index.get(ticker)
+            variance = cov[index, index] if index is not None else 0.0
+            result[ticker] = float(cov[index] @ w / math.sqrt(variance) / sigma) if variance > 0 and sigma > 0 \
+                else math.nan
+        return result
+
+    def summary(self, exposures, confidence=0.95, horizon=1, watchlist=(), positions=()):
+        """
+        Computes every risk figure for the exposures as a RiskSummary. Held
+        `positions` without an exposure (no price yet) are reported as
+        unmodelled along with the exposures the model has no returns for.
+        """
+        held = list(dict.fromkeys([*positions, *exposures]))
+        return RiskSummary(
+            confidence=confidence,
+            horizon=horizon,
+            volatility=self.volatility(exposures, horizon),
+            parametric_var=self.parametric_var(exposures, confidence, horizon),
+            historical_var=self.historical_var(exposures, confidence, horizon),
+            contributions=self.contributions(exposures, horizon),
+            correlations=self.portfolio_correlations(exposures, [t for t in watchlist if t not in held]),
+            unmodelled=[ticker for ticker in held if ticker not in exposures or ticker not in self._index
+                        or self._weight[self._index[ticker]] == 0],
+        )
+
+
+def load_closes(tickers, cache=None, period="1y"):
+    """
+    Returns a DataFrame of daily closes, one column per ticker, from the
+    HistoryCache (so tickers analyzed earlier in the run are not downloaded
+    again). Tickers without history are left out.
+    """
+    from history_cache import get_default_cache
+
+    cache = cache if cache is not None else get_default_cache()
+    closes = {}
+    for ticker in dict.fromkeys(tickers):
+        history = cache.get_history(ticker, period=period)
+        if not history.empty:
+            index = history.index.tz_localize(None) if history.index.tz is not None else history.index
+            closes[ticker] = pd.Series(history["Close"].to_numpy(), index=index.normalize())
+    return pd.DataFrame(closes).sort_index()
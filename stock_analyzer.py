@@ -1,28 +1,72 @@
-import yfinance as yf
+from analysis_records import AnalysisResult, FAILED, IndicatorValues, NO_DATA, SellPrices
+from history_cache import get_default_cache
+from instrumentation import instrumented
 
-from technical_indicators import (
-    calculate_moving_average,
-    calculate_rsi,
-    calculate_macd,
-    calculate_bollinger_bands,
-    calculate_obv,
-    calculate_stochastic_oscillator,
-)
+STOP_LOSS_MULTIPLIER = 0.9
+TAKE_PROFIT_MULTIPLIER = 1.2
+
+# The history loaded for each bar interval: enough bars for the 200-bar
+# moving average where the interval allows, and within yfinance's limits
+# on intraday history otherwise.
+HISTORY_PERIODS = {"1d": "1y", "1wk": "5y", "1mo": "max"}
+INTRADAY_PERIOD = "5d"
+
+def confidence_score(info, ma50=None, ma200=None, rsi=None):
+    """
+    Scores a stock from 0 to 100 (percent) on two technical and three
+    fundamental rules. The technical rules are skipped when no price history
+    was available.
+    """
+    score = 0
+
+    # Technical factors
+    if ma50 is not None:
+        if ma50 > ma200:
+            score += 1
+        if rsi < 70 and rsi > 30:
+            score += 1
+
+    # Fundamental factors
+    if info.get("trailingPE", float('inf')) < 25:
+        score += 1
+    if info.get("forwardPE", float('inf')) < info.get("trailingPE", float('inf')):
+        score += 1
+    if info.get("dividendYield", 0) > 0:
+        score += 1
+
+    return (score / 5) * 100
+
+def calculate_confidence_score(info, ma50=None, ma200=None, rsi=None):
+    """
+    Formats confidence_score() as a percentage string, e.g. "80.00%".
+    """
+    return f"{confidence_score(info, ma50, ma200, rsi):.2f}%"
 
 class StockAnalyzer:
-    def __init__(self, ticker):
+    def __init__(self, ticker, cache=None):
         self.ticker = ticker
-        self.stock = yf.Ticker(ticker)
+        self._stock = None
+        self.cache = cache if cache is not None else get_default_cache()
+
+    @property
+    def stock(self):
+        """The yfinance Ticker, created on first use so that yfinance is only imported when needed."""
+        if self._stock is None:
+            import yfinance as yf
+
+            self._stock = yf.Ticker(self.ticker)
+        return self._stock
 
     def get_all_info(self):
         """
         Retrieves all available information for the stock for debugging purposes.
         """
-        info = self.stock.info
+        info = self.cache.get_info(self.ticker)
         print("Available information from yfinance:")
         for key, value in info.items():
             print(f"- {key}: {value}")
 
+    @instrumented("StockAnalyzer.get_financial_metrics")
     def get_financial_metrics(self):
         """
         Retrieves key financial metrics for the stock.
@@ -32,33 +76,31 @@ class StockAnalyzer:
             return financials
         return "Financial data not available."
 
+    @instrumented("StockAnalyzer.technical_indicator_values")
+    def technical_indicator_values(self, interval="1d"):
+        """
+        Calculates the latest value of each technical indicator on `interval`
+        bars (e.g. "1wk" for weekly confirmation), or returns None if no price
+        history is available.
+        """
+        from indicator_kernel import compute_indicators_from_frame
+
+        period = HISTORY_PERIODS.get(interval, INTRADAY_PERIOD)
+        hist = self.cache.get_history(self.ticker, period=period, interval=interval)
+        if hist.empty:
+            return None
+        return IndicatorValues.from_mapping(compute_indicators_from_frame(hist, last_only=True))
+
     def get_technical_indicators(self):
         """
-        Calculates key technical indicators for the stock.
-        """
-        hist = self.stock.history(period="1y")
-        if not hist.empty:
-            ma50 = calculate_moving_average(hist, 50).iloc[-1]
-            ma200 = calculate_moving_average(hist, 200).iloc[-1]
-            rsi = calculate_rsi(hist).iloc[-1]
-            macd, signal_line, _ = calculate_macd(hist)
-            upper_band, _, lower_band = calculate_bollinger_bands(hist)
-            obv = calculate_obv(hist).iloc[-1]
-            stochastic = calculate_stochastic_oscillator(hist).iloc[-1]
-
-            return {
-                "50-Day MA": f"{ma50:.2f}",
-                "200-Day MA": f"{ma200:.2f}",
-                "RSI (14)": f"{rsi:.2f}",
-                "MACD": f"{macd.iloc[-1]:.2f}",
-                "Signal Line": f"{signal_line.iloc[-1]:.2f}",
-                "Bollinger Upper": f"{upper_band.iloc[-1]:.2f}",
-                "Bollinger Lower": f"{lower_band.iloc[-1]:.2f}",
-                "OBV": f"{obv:,.0f}",
-                "Stochastic Oscillator": f"{stochastic:.2f}",
-            }
+        Calculates key technical indicators for the stock, formatted for display.
+        """
+        values = self.technical_indicator_values()
+        if values is not None:
+            return values.format()
         return "Technical data not available."
 
+    @instrumented("StockAnalyzer.get_market_sentiment")
     def get_market_sentiment(self):
         """
         Retrieves news and sentiment analysis for the stock.
@@ -68,43 +110,48 @@ class StockAnalyzer:
             return news
         return "Market sentiment data not available."
 
-    def get_confidence_score(self):
+    def _confidence(self, values):
+        info = self.cache.get_info(self.ticker)
+        if values is None:
+            return confidence_score(info)
+        return confidence_score(info, values.ma50, values.ma200, values.rsi)
+
+    @instrumented("StockAnalyzer.confidence")
+    def confidence(self):
         """
-        Calculates a confidence score for the stock based on a combination of
-        technical and fundamental factors.
+        Calculates a confidence score (0 to 100) for the stock based on a
+        combination of technical and fundamental factors.
         """
-        score = 0
+        return self._confidence(self.technical_indicator_values())
 
-        # Technical factors
-        hist = self.stock.history(period="1y")
-        if not hist.empty:
-            ma50 = calculate_moving_average(hist, 50).iloc[-1]
-            ma200 = calculate_moving_average(hist, 200).iloc[-1]
-            rsi = calculate_rsi(hist).iloc[-1]
-
-            if ma50 > ma200:
-                score += 1
-            if rsi < 70 and rsi > 30:
-                score += 1
+    def get_confidence_score(self):
+        """
+        Calculates the confidence score, formatted as a percentage string.
+        """
+        return f"{self.confidence():.2f}%"
 
-        # Fundamental factors
-        info = self.stock.info
-        if info.get("trailingPE", float('inf')) < 25:
-            score += 1
-        if info.get("forwardPE", float('inf')) < info.get("trailingPE", float('inf')):
-            score += 1
-        if info.get("dividendYield", 0) > 0:
-            score += 1
+    @instrumented("StockAnalyzer.analyze")
+    def analyze(self):
+        """
+        Computes the indicators and the confidence score in one pass and
+        returns them as an AnalysisResult. Failures are reported in the
+        result's `error` rather than raised.
+        """
+        try:
+            values = self.technical_indicator_values()
+            confidence = self._confidence(values)
+        except Exception as e:
+            return AnalysisResult(self.ticker, error=f"{FAILED}: {e}")
+        return AnalysisResult(self.ticker, confidence, values, None if values is not None else NO_DATA)
 
-        return f"{(score / 5) * 100:.2f}%"
+    def sell_prices(self, purchase_price):
+        """
+        Calculates the stop loss and take profit prices for the stock.
+        """
+        return SellPrices(purchase_price * STOP_LOSS_MULTIPLIER, purchase_price * TAKE_PROFIT_MULTIPLIER)
 
     def get_sell_prices(self, purchase_price):
         """
-        Calculates the stop loss and take profit prices for the stock.
+        Calculates the stop loss and take profit prices, formatted for display.
         """
-        stop_loss = purchase_price * 0.9
-        take_profit = purchase_price * 1.2
-        return {
-            "stop_loss": f"{stop_loss:.2f}",
-            "take_profit": f"{take_profit:.2f}",
-        }
+        return self.sell_prices(purchase_price).format()
@@ -1,34 +1,29 @@
-import yfinance as yf
+from fundamentals import FundamentalsSnapshot, criteria_mask
+from history_cache import get_default_cache
+from instrumentation import instrumented
 
 class StockScreener:
-    def __init__(self, tickers):
+    def __init__(self, tickers, cache=None, snapshot=None):
         self.tickers = tickers
+        self.cache = cache if cache is not None else get_default_cache()
+        self.snapshot = snapshot if snapshot is not None else FundamentalsSnapshot(info_fetcher=self.cache.get_info)
 
-    def screen_stocks(self, criteria):
+    @instrumented("StockScreener.screen_stocks")
+    def screen_stocks(self, criteria, technicals=None):
         """
-        Screens stocks based on a given set of criteria.
-        """
-        screened_stocks = []
-        for ticker in self.tickers:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-
-            passes_criteria = True
-            for key, value in criteria.items():
-                if key == "market_cap":
-                    if info.get("marketCap", 0) < value:
-                        passes_criteria = False
-                        break
-                elif key == "pe_ratio":
-                    if info.get("trailingPE", float('inf')) > value:
-                        passes_criteria = False
-                        break
-                elif key == "dividend_yield":
-                    if info.get("dividendYield", 0) < value:
-                        passes_criteria = False
-                        break
+        Screens stocks based on a given set of criteria, evaluated as vectorized
+        masks over the fundamentals snapshot (see fundamentals.criteria_mask).
 
-            if passes_criteria:
-                screened_stocks.append(ticker)
+        Args:
+            criteria (dict): The screening criteria.
+            technicals (pd.DataFrame): Optional per-ticker technical columns (e.g. from
+                batch_analyzer.latest_indicator_values) that criteria may refer to.
 
-        return screened_stocks
+        Returns:
+            list: The tickers that pass every criterion, in their original order.
+        """
+        table = self.snapshot.get(self.tickers)
+        if technicals is not None:
+            table = table.join(technicals, how="left")
+        mask = criteria_mask(table, criteria)
+        return [ticker for ticker, passed in zip(self.tickers, mask) if passed]
@@ -0,0 +1,284 @@
+import math
+from collections import deque
+
+NAN = float("nan")
+
+
+class RollingSum:
+    """
+    A fixed-window running sum with Kahan compensation. Once every value in
+    the window is zero the sum is reset to exactly zero, so ratios such as RSI
+    do not pick up round-off residue.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self._compensation = 0.0
+        self._nonzero = 0
+
+    def _add(self, x):
+        y = x - self._compensation
+        t = self.total + y
+        self._compensation = (t - self.total) - y
+        self.total = t
+
+    def update(self, x):
+        self.values.append(x)
+        self._add(x)
+        if x != 0:
+            self._nonzero += 1
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            self._add(-old)
+            if old != 0:
+                self._nonzero -= 1
+        if self._nonzero == 0:
+            self.total = 0.0
+            self._compensation = 0.0
+
+    @property
+    def full(self):
+        return len(self.values) == self.window
+
+
+class StreamingSMA:
+    """Simple moving average, matching calculate_moving_average()."""
+    def __init__(self, window):
+        self._sum = RollingSum(window)
+        self.value = NAN
+
+    def update(self, close):
+        self._sum.update(close)
+        self.value = self._sum.total / self._sum.window if self._sum.full else NAN
+        return self.value
+
+
+class StreamingEMA:
+    """Exponential moving average with adjust=False semantics, as used by calculate_macd()."""
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+
+    def update(self, x):
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1.0 - self.alpha) * self.value
+        return self.value
+
+
+class StreamingRSI:
+    """Relative Strength Index over simple rolling means, matching calculate_rsi()."""
+    def __init__(self, window=14):
+        self._gains = RollingSum(window)
+        self._losses = RollingSum(window)
+        self._prev_close = None
+        self.value = NAN
+
+    def update(self, close):
+        # The first bar has no change; calculate_rsi() counts it as a zero gain and loss.
+        delta = 0.0 if self._prev_close is None else close - self._prev_close
+        self._prev_close = close
+        self._gains.update(delta if delta > 0 else 0.0)
+        self._losses.update(-delta if delta < 0 else 0.0)
+        if not self._gains.full:
+            self.value = NAN
+            return self.value
+
+        gain, loss = self._gains.total, self._losses.total
+        if loss == 0:
+            self.value = 100.0 if gain > 0 else NAN
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + gain / loss)
+        return self.value
+
+
+class StreamingMACD:
+    """MACD line, signal line and histogram, matching calculate_macd()."""
+    def __init__(self, slow=26, fast=12, signal=9):
+        self._fast = StreamingEMA(fast)
+        self._slow = StreamingEMA(slow)
+        self._signal = StreamingEMA(signal)
+        self.macd = self.signal = self.histogram = NAN
+
+    def update(self, close):
+        self.macd = self._fast.update(close) - self._slow.update(close)
+        self.signal = self._signal.update(self.macd)
+        self.histogram = self.macd - self.signal
+        return self.macd, self.signal, self.histogram
+
+
+class StreamingBollingerBands:
+    """
+    Bollinger Bands with a sliding-window Welford update of the mean and
+    sample variance, matching calculate_bollinger_bands().
+    """
+    def __init__(self, window=20, num_std_dev=2):
+        self.window = window
+        self.num_std_dev = num_std_dev
+        self.values = deque()
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.upper = self.middle = self.lower = NAN
+
+    def update(self, close):
+        self.values.append(close)
+        if len(self.values) <= self.window:
+            n = len(self.values)
+            delta = close - self.mean
+            self.mean += delta / n
+            self._m2 += delta * (close - self.mean)
+        else:
+            old = self.values.popleft()
+            old_mean = self.mean
+            self.mean += (close - old) / self.window
+            self._m2 += (close - old) * (close - self.mean + old - old_mean)
+            self._m2 = max(self._m2, 0.0)
+
+        if len(self.values) < self.window:
+            self.upper = self.middle = self.lower = NAN
+        else:
+            std_dev = math.sqrt(self._m2 / (self.window - 1))
+            self.middle = self.mean
+            self.upper = self.mean + std_dev * self.num_std_dev
+            self.lower = self.mean - std_dev * self.num_std_dev
+        return self.upper, self.middle, self.lower
+
+
+class StreamingOBV:
+    """On-Balance Volume, matching calculate_obv() (unchanged closes count as down bars)."""
+    def __init__(self):
+        self._prev_close = None
+        self.value = 0.0
+
+    def update(self, close, volume):
+        if self._prev_close is None or close > self._prev_close:
+            self.value += volume
+        else:
+            self.value -= volume
+        self._prev_close = close
+        return self.value
+
+
+class StreamingStochastic:
+    """
+    Stochastic Oscillator with monotonic deques tracking the window's lowest
+    low and highest high, matching calculate_stochastic_oscillator().
+    """
+    def __init__(self, window=14):
+        self.window = window
+        self._count = 0
+        self._lows = deque()
+        self._highs = deque()
+        self.value = NAN
+
+    def update(self, high, low, close):
+        i = self._count
+        self._count += 1
+        while self._lows and self._lows[-1][1] >= low:
+            self._lows.pop()
+        self._lows.append((i, low))
+        while self._highs and self._highs[-1][1] <= high:
+            self._highs.pop()
+        self._highs.append((i, high))
+        if self._lows[0][0] <= i - self.window:
+            self._lows.popleft()
+        if self._highs[0][0] <= i - self.window:
+            self._highs.popleft()
+
+        if self._count < self.window:
+            self.value = NAN
+            return self.value
+
+        low_min, high_max = self._lows[0][1], self._highs[0][1]
+        span = high_max - low_min
+        if span == 0:
+            self.value = NAN if close == low_min else math.copysign(math.inf, close - low_min)
+        else:
+            self.value = 100.0 * (close - low_min) / span
+        return self.value
+
+
+class StreamingIndicatorSet:
+    """
+    The full indicator set used by StockAnalyzer.get_technical_indicators(),
+    updated one bar at a time in O(1) amortized work per bar.
+    """
+    def __init__(self):
+        self.ma50 = StreamingSMA(50)
+        self.ma200 = StreamingSMA(200)
+        self.rsi = StreamingRSI(14)
+        self.macd = StreamingMACD(26, 12, 9)
+        self.bollinger = StreamingBollingerBands(20, 2)
+        self.obv = StreamingOBV()
+        self.stochastic = StreamingStochastic(14)
+        self.bars = 0
+
+    @classmethod
+    def from_history(cls, data):
+        """
+        Creates an indicator set seeded from a history()-shaped DataFrame.
+
+        Args:
+            data (pd.DataFrame): A DataFrame containing the stock's historical data.
+
+        Returns:
+            StreamingIndicatorSet: The seeded indicator set.
+        """
+        indicators = cls()
+        columns = zip(data['High'].to_numpy(dtype=float), data['Low'].to_numpy(dtype=float),
+                      data['Close'].to_numpy(dtype=float), data['Volume'].to_numpy(dtype=float))
+        for high, low, close, volume in columns:
+            indicators.update(high, low, close, volume)
+        return indicators
+
+    def update(self, high, low, close, volume):
+        """Adds one bar and returns the latest indicator values."""
+        self.ma50.update(close)
+        self.ma200.update(close)
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.obv.update(close, volume)
+        self.stochastic.update(high, low, close)
+        self.bars += 1
+        return self.latest()
+
+    def latest(self):
+        """
+        Returns the latest values keyed like the input of
+        IndicatorValues.from_mapping().
+        """
+        return {
+            "ma50": self.ma50.value,
+            "ma200": self.ma200.value,
+            "rsi": self.rsi.value,
+            "macd": self.macd.macd,
+            "signal": self.macd.signal,
+            "bollinger_upper": self.bollinger.upper,
+            "bollinger_lower": self.bollinger.lower,
+            "obv": self.obv.value,
+            "stochastic": self.stochastic.value,
+        }
+
+
+class IndicatorStreams:
+    """Keeps one StreamingIndicatorSet per ticker for intraday tracking of many symbols."""
+    def __init__(self):
+        self.streams = {}
+
+    def seed(self, ticker, data):
+        """Seeds the ticker's indicators from its historical bars."""
+        self.streams[ticker] = StreamingIndicatorSet.from_history(data)
+        return self.streams[ticker]
+
+    def update(self, ticker, high, low, close, volume):
+        """Adds one bar for the ticker, creating its indicator set on first use."""
+        stream = self.streams.get(ticker)
+        if stream is None:
+            stream = self.streams[ticker] = StreamingIndicatorSet()
+        return stream.update(high, low, close, volume)
+
+    def latest(self, ticker):
+        return self.streams[ticker].latest()
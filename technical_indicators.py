@@ -1,5 +1,8 @@
 import pandas as pd
 
+from instrumentation import instrumented
+
+@instrumented("indicators.calculate_moving_average")
 def calculate_moving_average(data, window):
     """
     Calculates the moving average of a stock's closing prices.
@@ -13,6 +16,7 @@ def calculate_moving_average(data, window):
     """
     return data['Close'].rolling(window=window).mean()
 
+@instrumented("indicators.calculate_rsi")
 def calculate_rsi(data, window=14):
     """
     Calculates the Relative Strength Index (RSI) of a stock.
@@ -30,6 +34,7 @@ def calculate_rsi(data, window=14):
     rs = gain / loss
     return 100 - (100 / (1 + rs))
 
+@instrumented("indicators.calculate_macd")
 def calculate_macd(data, slow=26, fast=12, signal=9):
     """
     Calculates the Moving Average Convergence Divergence (MACD) of a stock.
@@ -50,6 +55,7 @@ def calculate_macd(data, slow=26, fast=12, signal=9):
     histogram = macd - signal_line
     return macd, signal_line, histogram
 
+@instrumented("indicators.calculate_bollinger_bands")
 def calculate_bollinger_bands(data, window=20, num_std_dev=2):
     """
     Calculates the Bollinger Bands of a stock.
@@ -68,6 +74,7 @@ def calculate_bollinger_bands(data, window=20, num_std_dev=2):
     lower_band = ma - (std_dev * num_std_dev)
     return upper_band, ma, lower_band
 
+@instrumented("indicators.calculate_obv")
 def calculate_obv(data):
     """
     Calculates the On-Balance Volume (OBV) of a stock.
@@ -81,6 +88,7 @@ def calculate_obv(data):
     obv = (data['Volume'] * (~data['Close'].diff().le(0) * 2 - 1)).cumsum()
     return obv
 
+@instrumented("indicators.calculate_stochastic_oscillator")
 def calculate_stochastic_oscillator(data, window=14):
     """
     Calculates the Stochastic Oscillator of a stock.
@@ -0,0 +1,74 @@
+import math
+import unittest
+
+import numpy as np
+
+from analysis_records import AnalysisResult, IndicatorValues, NO_DATA, SellPrices, from_array, to_array
+from context_builder import TradingContextBuilder
+from stock_analyzer import calculate_confidence_score, confidence_score
+
+VALUES = {"ma50": 101.234, "ma200": 95.5, "rsi": 55.125, "macd": -1.2345, "signal": 0.98,
+          "bollinger_upper": 110.0, "bollinger_lower": 92.456, "obv": 12345678.4, "stochastic": 64.5}
+
+
+class TestIndicatorValues(unittest.TestCase):
+    def test_format_matches_legacy_strings(self):
+        formatted = IndicatorValues.from_mapping(VALUES).format()
+        self.assertEqual(formatted["50-Day MA"], "101.23")
+        self.assertEqual(formatted["MACD"], "-1.23")
+        self.assertEqual(formatted["OBV"], "12,345,678")
+        self.assertEqual(list(formatted), ["50-Day MA", "200-Day MA", "RSI (14)", "MACD", "Signal Line",
+                                           "Bollinger Upper", "Bollinger Lower", "OBV", "Stochastic Oscillator"])
+
+    def test_confidence_score_is_numeric(self):
+        info = {"trailingPE": 20, "forwardPE": 18, "dividendYield": 0.01}
+        self.assertEqual(confidence_score(info, 101.0, 95.0, 55.0), 100.0)
+        self.assertEqual(confidence_score(info), 60.0)
+        self.assertEqual(calculate_confidence_score(info), "60.00%")
+
+
+class TestAnalysisResult(unittest.TestCase):
+    def test_format(self):
+        result = AnalysisResult("AAA", 80.0, IndicatorValues.from_mapping(VALUES))
+        self.assertTrue(result.ok)
+        self.assertEqual(result.format()["Confidence Score"], "80.00%")
+
+        missing = AnalysisResult("BBB", error=NO_DATA)
+        self.assertFalse(missing.ok)
+        self.assertEqual(missing.format(), {"Technical Indicators": NO_DATA, "Confidence Score": "N/A"})
+
+    def test_array_round_trip(self):
+        results = [
+            AnalysisResult("AAA", 60.0, IndicatorValues.from_mapping(VALUES)),
+            AnalysisResult("BBB", error=NO_DATA),
+            AnalysisResult("CCC", 100.0, IndicatorValues.from_mapping({**VALUES, "macd": math.nan})),
+        ]
+        array = to_array(results)
+        self.assertEqual(list(np.sort(array, order="confidence")["ticker"]), ["AAA", "CCC", "BBB"])
+        self.assertEqual(list(array["ticker"][array["confidence"] >= 60]), ["AAA", "CCC"])
+
+        restored = from_array(array)
+        self.assertEqual(restored[0], results[0])
+        self.assertEqual(restored[1].error, NO_DATA)
+        self.assertIsNone(restored[1].indicators)
+        self.assertIsNotNone(restored[2].indicators)
+        self.assertTrue(math.isnan(restored[2].indicators.macd))
+
+    def test_sell_prices(self):
+        self.assertEqual(SellPrices(95.0, 110.0).format(), {"stop_loss": "95.00", "take_profit": "110.00"})
+
+
+class TestContextFromRecords(unittest.TestCase):
+    def test_records_render_like_display_dicts(self):
+        records = {"AAA": AnalysisResult("AAA", 80.0, IndicatorValues.from_mapping(VALUES)),
+                   "BBB": AnalysisResult("BBB", error=NO_DATA)}
+        display = {ticker: result.format() for ticker, result in records.items()}
+        prices = {"AAA": 101.0, "BBB": 50.0}
+        for compact in (False, True):
+            builder = TradingContextBuilder(compact=compact, timestamp="2024-01-02 15:30:00")
+            self.assertEqual(builder.build(["AAA", "BBB"], prices, records),
+                             builder.build(["AAA", "BBB"], prices, display))
+
+
+if __name__ == '__main__':
+    unittest.main()
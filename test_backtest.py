@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backtest import compute_signals, run_backtest, simulate_trades
+from benchmarks.synthetic import random_walk_universe, universe_to_panel
+
+
+def make_panel(tickers=4, bars=600, seed=0):
+    universe = random_walk_universe(tickers, bars, seed=seed, volatility=0.02, start="2015-01-01")
+    next(iter(universe.values())).iloc[:100] = np.nan  # listed later than the others
+    return universe_to_panel(universe)
+
+
+def reference_trades(panel, signals, stop_loss, take_profit, max_holding):
+    """A plain per-bar loop implementing the same rules as simulate_trades()."""
+    trades = []
+    for ticker in signals.columns:
+        o, h, l, c = (panel[f][ticker].to_numpy() for f in ("Open", "High", "Low", "Close"))
+        sig = signals[ticker].to_numpy()
+        t, bars = 0, len(c)
+        while t < bars - 1:
+            if not sig[t] or np.isnan(c[t]):
+                t += 1
+                continue
+            entry = c[t]
+            stop, target = entry * stop_loss, entry * take_profit
+            last = bars - 1 if max_holding is None else min(bars - 1, t + max_holding)
+            k, price, reason = last, c[last], "end" if last == bars - 1 else "time"
+            for j in range(t + 1, last + 1):
+                if o[j] >= target and (l[j] <= stop or h[j] >= target):
+                    k, price, reason = j, o[j], "target"
+                elif o[j] <= stop and (l[j] <= stop or h[j] >= target):
+                    k, price, reason = j, o[j], "stop"
+                elif l[j] <= stop:
+                    k, price, reason = j, stop, "stop"
+                elif h[j] >= target:
+                    k, price, reason = j, target, "target"
+                else:
+                    continue
+                break
+            trades.append((ticker, t, k, price, reason))
+            t = k + 1
+    return trades
+
+
+class TestBacktest(unittest.TestCase):
+    def test_matches_per_bar_reference(self):
+        panel = make_panel()
+        signals = compute_signals(panel)
+        for stop_loss, take_profit, max_holding in ((0.9, 1.2, None), (0.95, 1.05, None), (0.9, 1.2, 20)):
+            trades = simulate_trades(panel, signals, stop_loss, take_profit, max_holding)
+            expected = reference_trades(panel, signals, stop_loss, take_profit, max_holding)
+            dates = signals.index
+            actual = [(r.ticker, dates.get_loc(r.entry_date), dates.get_loc(r.exit_date), r.exit_price,
+                       r.exit_reason) for r in trades.itertuples()]
+            self.assertEqual(len(actual), len(expected))
+            for got, want in zip(actual, expected):
+                self.assertEqual(got[:3] + got[4:], want[:3] + want[4:])
+                self.assertAlmostEqual(got[3], want[3])
+
+    def test_run_backtest_reports_stats(self):
+        results = run_backtest(make_panel(seed=3))
+        summary = results["summary"]
+        self.assertEqual(summary["trades"], len(results["trades"]))
+        self.assertEqual(results["by_ticker"]["trades"].sum(), summary["trades"])
+        self.assertGreater(summary["trades"], 0)
+        targets = results["trades"][results["trades"]["exit_reason"] == "target"]
+        self.assertTrue((targets["return"] >= 0.2 - 1e-9).all())
+
+    def test_no_signals_means_no_trades(self):
+        panel = make_panel(tickers=2, bars=100)
+        results = run_backtest(panel)
+        self.assertEqual(results["summary"], {"trades": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
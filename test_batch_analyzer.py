@@ -0,0 +1,44 @@
+import unittest
+
+import pandas as pd
+
+from batch_analyzer import analyze_batch
+from benchmarks.synthetic import random_walk_ohlcv
+from history_cache import HistoryCache
+from stock_analyzer import StockAnalyzer
+
+INFO = {"trailingPE": 20, "forwardPE": 18, "dividendYield": 0.01}
+
+
+class TestAnalyzeBatch(unittest.TestCase):
+    def test_matches_per_ticker_analysis(self):
+        dates = pd.date_range("2024-01-01", periods=260, freq="B")
+        histories = {
+            "AAA": random_walk_ohlcv(seed=1, index=dates),
+            "BBB": random_walk_ohlcv(seed=2, index=dates[40:]),            # shorter history
+            "CCC": random_walk_ohlcv(seed=3, index=dates.delete([100, 101])),  # gap inside the panel
+        }
+        panel = pd.concat(histories, axis=1).swaplevel(axis=1).sort_index(axis=1)
+
+        batch_cache = HistoryCache(history_fetcher=None, info_fetcher=lambda t: INFO)
+        results = analyze_batch(list(histories), cache=batch_cache,
+                                panel_fetcher=lambda tickers, period: panel)
+
+        single_cache = HistoryCache(history_fetcher=lambda t, p, i: histories[t],
+                                    info_fetcher=lambda t: INFO)
+        for ticker in histories:
+            analyzer = StockAnalyzer(ticker, cache=single_cache)
+            self.assertEqual(results[ticker]["Technical Indicators"], analyzer.get_technical_indicators())
+            self.assertEqual(results[ticker]["Confidence Score"], analyzer.get_confidence_score())
+
+    def test_missing_ticker_reports_insufficient_data(self):
+        dates = pd.date_range("2024-01-01", periods=60, freq="B")
+        panel = pd.concat({"AAA": random_walk_ohlcv(seed=1, index=dates)}, axis=1).swaplevel(axis=1)
+        cache = HistoryCache(info_fetcher=lambda t: INFO)
+        results = analyze_batch(["AAA", "ZZZ"], cache=cache, panel_fetcher=lambda tickers, period: panel)
+        self.assertEqual(results["ZZZ"]["Technical Indicators"], "Data not available")
+        self.assertIsInstance(results["AAA"]["Technical Indicators"], dict)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from concurrent_analysis import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_waits_between_tokens(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(rate=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertAlmostEqual(now[0], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
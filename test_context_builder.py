@@ -0,0 +1,119 @@
+import unittest
+
+from context_builder import DROP_ORDER, TradingContextBuilder, estimate_tokens
+
+TIMESTAMP = "2024-01-02 15:30:00"
+
+
+def indicators(i):
+    return {
+        "50-Day MA": f"{100 + i:.2f}",
+        "200-Day MA": f"{90 + i:.2f}",
+        "RSI (14)": "55.12",
+        "MACD": "1.23",
+        "Signal Line": "0.98",
+        "Bollinger Upper": f"{110 + i:.2f}",
+        "Bollinger Lower": f"{95 + i:.2f}",
+        "OBV": "12,345,678",
+        "Stochastic Oscillator": "64.50",
+    }
+
+
+def watchlist(count):
+    tickers = [f"T{i:03d}" for i in range(count)]
+    prices = {ticker: 100.0 + i for i, ticker in enumerate(tickers)}
+    analysis = {ticker: {"Technical Indicators": indicators(i), "Confidence Score": "90.00%"}
+                for i, ticker in enumerate(tickers)}
+    return tickers, prices, analysis
+
+
+def legacy_context(target_stocks, live_prices, analysis_data, timestamp):
+    # The concatenation-based implementation the builder replaced.
+    nav = 10000.00
+    watchlist_with_prices = [f"{ticker} (Current Price: ${live_prices.get(ticker, 0):.2f})" for ticker in target_stocks]
+    portfolio_string = (
+        f"PORTFOLIO SNAPSHOT (Timestamp: {timestamp} UTC)\n"
+        f"Net Asset Value (NAV): ${nav:,.2f}\n"
+        f"Cash: ${nav:,.2f} (100%)\n"
+        f"Watchlist: {', '.join(watchlist_with_prices)}"
+    )
+    analysis_string = "\n\n[START PROPRIETARY ANALYSIS DATA]\n"
+    for ticker in target_stocks:
+        analysis_string += f"--- Analysis for {ticker} ---\n"
+        data = analysis_data.get(ticker, {})
+        analysis_string += f"Confidence Score: {data.get('Confidence Score', 'N/A')}\n"
+        indicators = data.get('Technical Indicators')
+        if isinstance(indicators, dict):
+            for key, value in indicators.items():
+                analysis_string += f"- {key}: {value}\n"
+        else:
+            analysis_string += f"- Technical Indicators: {indicators}\n"
+        analysis_string += "\n"
+    analysis_string += "[END PROPRIETARY ANALYSIS DATA]\n"
+    return portfolio_string + analysis_string
+
+
+class TestTradingContextBuilder(unittest.TestCase):
+    def test_verbose_matches_legacy_output(self):
+        tickers, prices, analysis = watchlist(3)
+        analysis["T001"] = {"Technical Indicators": "Data not available", "Confidence Score": "N/A"}
+        context = TradingContextBuilder(timestamp=TIMESTAMP).build(tickers + ["MISSING"], prices, analysis)
+        self.assertEqual(context, legacy_context(tickers + ["MISSING"], prices, analysis, TIMESTAMP))
+
+    def test_compact_has_one_row_per_ticker(self):
+        tickers, prices, analysis = watchlist(3)
+        analysis["T002"] = {"Technical Indicators": "Data not available", "Confidence Score": "N/A"}
+        context = TradingContextBuilder(compact=True, timestamp=TIMESTAMP).build(tickers, prices, analysis)
+        lines = context.splitlines()
+        header = lines.index("[START PROPRIETARY ANALYSIS DATA]") + 1
+        self.assertEqual(lines[header].split("|")[:4], ["Ticker", "Price", "Confidence", "MA50"])
+        self.assertEqual(lines[header + 1].split("|")[:4], ["T000", "100.00", "90%", "100.00"])
+        self.assertEqual(lines[header + 3], "|".join(["T002", "102.00", "NA"] + ["NA"] * 9))
+        self.assertEqual(lines[header + 4], "[END PROPRIETARY ANALYSIS DATA]")
+
+    def test_compact_is_much_smaller(self):
+        tickers, prices, analysis = watchlist(50)
+        verbose = TradingContextBuilder(timestamp=TIMESTAMP).build(tickers, prices, analysis)
+        compact = TradingContextBuilder(compact=True, timestamp=TIMESTAMP).build(tickers, prices, analysis)
+        self.assertLess(estimate_tokens(compact), estimate_tokens(verbose) / 2)
+
+    def test_budget_rounds_and_drops_fields_before_tickers(self):
+        tickers, prices, analysis = watchlist(50)
+        full = TradingContextBuilder(compact=True, timestamp=TIMESTAMP)
+        full.build(tickers, prices, analysis)
+        budget = int(full.estimated_tokens * 0.8)
+
+        builder = TradingContextBuilder(compact=True, token_budget=budget, timestamp=TIMESTAMP)
+        context = builder.build(tickers, prices, analysis)
+        self.assertLessEqual(builder.estimated_tokens, budget)
+        self.assertEqual(builder.estimated_tokens, estimate_tokens(context))
+        self.assertIn("T049|", context)
+        self.assertNotIn("OBV", context)
+        self.assertIn("|100.0|", context)
+
+    def test_budget_drops_trailing_tickers_last(self):
+        tickers, prices, analysis = watchlist(50)
+        builder = TradingContextBuilder(compact=True, token_budget=400, timestamp=TIMESTAMP)
+        context = builder.build(tickers, prices, analysis)
+        self.assertLessEqual(builder.estimated_tokens, 400)
+        self.assertIn("T000|", context)
+        self.assertNotIn("T049|", context)
+        self.assertEqual(builder.included, tickers[:len(builder.included)])
+        self.assertLess(len(builder.included), 50)
+        self.assertIn(f"{builder.included[-1]}|", context)
+        for key in DROP_ORDER:
+            self.assertNotIn(key, context)
+        self.assertIn("RSI", context)
+
+    def test_verbose_budget_keeps_hard_filter_fields(self):
+        tickers, prices, analysis = watchlist(10)
+        builder = TradingContextBuilder(token_budget=600, timestamp=TIMESTAMP)
+        context = builder.build(tickers, prices, analysis)
+        self.assertLessEqual(builder.estimated_tokens, 600)
+        self.assertIn("- 50-Day MA: 100.0\n", context)
+        self.assertIn("- RSI (14): 55\n", context)
+        self.assertNotIn("- OBV:", context)
+
+
+if __name__ == '__main__':
+    unittest.main()
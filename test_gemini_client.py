@@ -0,0 +1,102 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+
+from fakes import FakeClock, FlakyBackend
+from gemini_client import DEFAULT_WATCHLIST, GeminiClient, ResponseCache, StubBackend
+
+TICKERS = "AAPL,MSFT,NVDA,GOOG,JPM,AMZN,TSLA,META,BAC,WMT,XOM,CVX"
+
+
+class TestGeminiClient(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.clock = FakeClock(1_000.0)
+        self.cache = ResponseCache(self.tmp.name, ttl=60, max_entries=2, clock=self.clock)
+
+    def test_identical_prompts_are_served_from_cache(self):
+        backend = StubBackend(default=TICKERS)
+        client = GeminiClient(backend=backend, cache=self.cache)
+        self.assertEqual(len(client.get_swing_stocks()), 12)
+        self.assertEqual(len(client.get_swing_stocks()), 12)
+        self.assertEqual(len(backend.prompts), 1)
+
+        self.clock.now += 60
+        client.get_swing_stocks()
+        self.assertEqual(len(backend.prompts), 2)
+
+    def test_cache_is_keyed_by_model(self):
+        GeminiClient(backend=StubBackend(default="a", model_name="m1"), cache=self.cache).generate("p")
+        self.assertIsNone(self.cache.get("m2", "p"))
+        self.assertEqual(self.cache.get("m1", "p"), "a")
+
+    def test_cache_evicts_oldest_entries(self):
+        client = GeminiClient(backend=StubBackend(responses=lambda p: p.upper()), cache=self.cache)
+        for prompt in ("one", "two", "three"):
+            client.generate(prompt)
+        self.assertEqual(sum(self.cache.get("stub", p) is not None for p in ("one", "two", "three")), 2)
+
+    def test_retries_with_backoff(self):
+        sleeps = []
+        client = GeminiClient(backend=FlakyBackend(2, default="ok"), max_retries=3, backoff=0.5,
+                              sleep=sleeps.append)
+        self.assertEqual(client.generate("p"), "ok")
+        self.assertEqual(len(sleeps), 2)
+        self.assertLess(sleeps[0], sleeps[1])
+
+    def test_failures_fall_back_without_caching(self):
+        client = GeminiClient(backend=FlakyBackend(10), cache=self.cache, max_retries=1, sleep=lambda s: None)
+        self.assertEqual(client.get_swing_stocks(), DEFAULT_WATCHLIST)
+        self.assertIsNone(client.prompt_for_analysis("p"))
+        self.assertIsNone(self.cache.get("stub", "p"))
+
+    def test_short_watchlists_are_not_cached(self):
+        backend = StubBackend(default="NVDA,MSFT", chunk_size=4)
+        client = GeminiClient(backend=backend, cache=self.cache)
+        self.assertEqual(client.get_swing_stocks(), DEFAULT_WATCHLIST)
+        list(client.iter_swing_stocks())
+        self.assertIsNone(self.cache.get("stub", backend.prompts[0]))
+
+        backend.default = TICKERS
+        self.assertEqual(len(client.get_swing_stocks()), 12)
+        self.assertEqual(len(backend.prompts), 3)
+
+    def test_async_calls_overlap(self):
+        # Each call waits until all three are in flight, so calls that ran
+        # one after another would break the barrier.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def respond(prompt):
+            barrier.wait()
+            return TICKERS
+
+        client = GeminiClient(backend=StubBackend(responses=respond), max_retries=0)
+
+        async def run():
+            return await asyncio.gather(client.get_swing_stocks_async(), client.generate_async("x"),
+                                        client.prompt_for_analysis_async("y"))
+
+        watchlist, _, analysis = asyncio.run(run())
+        self.assertEqual(len(watchlist), 12)
+        self.assertEqual(analysis, TICKERS)
+
+    def test_streamed_watchlist_yields_tickers_as_they_arrive(self):
+        backend = StubBackend(default=TICKERS, chunk_size=7)
+        client = GeminiClient(backend=backend, cache=self.cache)
+        stream = client.iter_swing_stocks()
+        self.assertEqual(next(stream), "AAPL")
+        self.assertEqual(list(stream), TICKERS.split(",")[1:])
+        self.assertEqual(self.cache.get("stub", backend.prompts[0]), TICKERS)
+        self.assertEqual(list(client.iter_swing_stocks()), TICKERS.split(","))
+        self.assertEqual(len(backend.prompts), 1)
+
+    def test_short_streamed_watchlist_is_padded_with_defaults(self):
+        client = GeminiClient(backend=StubBackend(default="NVDA, MSFT", chunk_size=3))
+        self.assertEqual(list(client.iter_swing_stocks()),
+                         ["NVDA", "MSFT"] + [t for t in DEFAULT_WATCHLIST if t != "MSFT"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import random_walk_ohlcv
+from fakes import FakeClock
+from history_cache import HistoryCache, TTLCache
+from stock_analyzer import StockAnalyzer
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 9
+        self.assertEqual(cache.get("a"), 1)
+        clock.now = 10
+        self.assertIsNone(cache.get("a"))
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_concurrent_misses_load_once(self):
+        cache = TTLCache()
+        calls = []
+        started = threading.Event()
+
+        def loader():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return "value"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            first = executor.submit(cache.get_or_load, "a", loader)
+            started.wait()
+            others = [executor.submit(cache.get_or_load, "a", loader) for _ in range(7)]
+            results = [first.result()] + [future.result() for future in others]
+        self.assertEqual(results, ["value"] * 8)
+        self.assertEqual(len(calls), 1)
+
+
+class TestHistoryCache(unittest.TestCase):
+    def test_analyzer_fetches_history_and_info_once(self):
+        calls = {"history": 0, "info": 0}
+
+        def history_fetcher(ticker, period, interval):
+            calls["history"] += 1
+            return random_walk_ohlcv(260, start="2024-01-01")
+
+        def info_fetcher(ticker):
+            calls["info"] += 1
+            return {"trailingPE": 20, "forwardPE": 18, "dividendYield": 0.01}
+
+        cache = HistoryCache(history_fetcher=history_fetcher, info_fetcher=info_fetcher)
+        analyzer = StockAnalyzer("AAPL", cache=cache)
+        analyzer.get_technical_indicators()
+        analyzer.get_confidence_score()
+        StockAnalyzer("aapl", cache=cache).get_confidence_score()
+
+        self.assertEqual(calls, {"history": 1, "info": 1})
+
+    def test_keys_include_period_and_interval(self):
+        calls = []
+        cache = HistoryCache(history_fetcher=lambda t, p, i: calls.append((t, p, i)) or random_walk_ohlcv(260, start="2024-01-01"))
+        cache.get_history("MSFT", period="1y")
+        cache.get_history("MSFT", period="1y", interval="1wk")
+        cache.get_history("MSFT", period="5d")
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import random_walk_ohlcv
+from history_store import HistoryStore, period_start
+
+
+class FakeFetcher:
+    """Serves bars from a synthetic history, up to `available` rows."""
+    def __init__(self, full):
+        self.full = full
+        self.available = len(full)
+        self.calls = []
+
+    def __call__(self, ticker, start=None, interval="1d", initial_period="max"):
+        self.calls.append(start)
+        bars = self.full.iloc[:self.available]
+        if start is not None:
+            bars = bars[bars.index.tz_localize(None) >= start]
+        return bars
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.full = random_walk_ohlcv(index=pd.date_range("2020-01-01", periods=500, freq="B", tz="America/New_York"))
+        self.fetcher = FakeFetcher(self.full)
+        self.store = HistoryStore(self.tmp.name, fetcher=self.fetcher, refresh_interval=0)
+
+    def test_refresh_only_fetches_new_bars(self):
+        self.fetcher.available = 490
+        self.assertEqual(self.store.refresh("AAPL"), 490)
+        self.fetcher.available = 500
+        # The last stored bar is re-fetched along with the 10 new ones.
+        self.assertEqual(self.store.refresh("AAPL"), 11)
+        self.assertIsNone(self.fetcher.calls[0])
+
+        stored = self.store.history("AAPL", period="max")
+        expected = self.full.copy()
+        expected.index = expected.index.tz_localize(None)
+        np.testing.assert_allclose(stored.to_numpy(), expected.to_numpy())
+        self.assertTrue((stored.index == expected.index).all())
+
+    def test_period_start(self):
+        last = pd.Timestamp("2024-03-15")
+        self.assertEqual(period_start("1mo", now=last), pd.Timestamp("2024-02-15"))
+        self.assertEqual(period_start("ytd", now=last), pd.Timestamp("2024-01-01"))
+        self.assertIsNone(period_start("max", now=last))
+
+    def test_history_slices_period(self):
+        # Bars up to today, since history() counts the period back from now.
+        self.full.index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=len(self.full),
+                                         tz="America/New_York")
+        history = self.store.history("AAPL", period="1y")
+        start = period_start("1y")
+        stored = pd.DatetimeIndex(self.store.load("AAPL")["date"])
+        self.assertGreaterEqual(history.index[0], start)
+        self.assertLess(stored[stored.get_loc(history.index[0]) - 1], start)
+        self.assertEqual(history.index[-1], stored[-1])
+
+    def test_history_respects_refresh_interval(self):
+        store = HistoryStore(self.tmp.name, fetcher=self.fetcher, refresh_interval=3600)
+        store.history("MSFT", period="max")
+        store.history("MSFT", period="max")
+        self.assertEqual(len(self.fetcher.calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+import numpy as np
+
+from benchmarks.synthetic import flat_stretch, random_walk_ohlcv
+from indicator_kernel import compute_indicators, compute_indicators_from_frame
+from technical_indicators import (
+    calculate_moving_average,
+    calculate_rsi,
+    calculate_macd,
+    calculate_bollinger_bands,
+    calculate_obv,
+    calculate_stochastic_oscillator,
+)
+
+
+def make_history(rows, seed=0):
+    # Prices quoted in cents, and a flat stretch to exercise zero-loss RSI
+    # and equal closes in OBV.
+    data = random_walk_ohlcv(rows, seed=seed).round({"Open": 2, "High": 2, "Low": 2, "Close": 2})
+    return flat_stretch(data, 100, 130) if rows > 130 else data
+
+
+def with_gaps(data, rows=(0, 40, 41, 42, 150, 240), close_only=(90,)):
+    # Missing bars as yfinance reports them (every field NaN), plus bars that
+    # are only missing a close.
+    data = data.copy()
+    data.iloc[[row for row in rows if row < len(data)]] = np.nan
+    data.iloc[[row for row in close_only if row < len(data)], data.columns.get_loc("Close")] = np.nan
+    return data
+
+
+def batch_indicators(data):
+    macd, signal_line, histogram = calculate_macd(data)
+    upper_band, middle_band, lower_band = calculate_bollinger_bands(data)
+    return {
+        "ma50": calculate_moving_average(data, 50),
+        "ma200": calculate_moving_average(data, 200),
+        "rsi": calculate_rsi(data),
+        "macd": macd,
+        "signal": signal_line,
+        "histogram": histogram,
+        "bollinger_upper": upper_band,
+        "bollinger_middle": middle_band,
+        "bollinger_lower": lower_band,
+        "obv": calculate_obv(data),
+        "stochastic": calculate_stochastic_oscillator(data),
+    }
+
+
+def assert_matches(actual, expected, name, msg):
+    # pandas' online rolling variance can leave a standard deviation of around
+    # 1e-6 in a window of equal closes, depending on the bars that came before.
+    atol = 1e-5 if name.startswith("bollinger") else 1e-9
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=atol, equal_nan=True, err_msg=msg)
+
+
+class TestIndicatorKernel(unittest.TestCase):
+    def test_full_series_match_batch_functions(self):
+        for rows in (30, 260, 5_000):
+            data = make_history(rows)
+            kernel = compute_indicators_from_frame(data, last_only=False)
+            for name, expected in batch_indicators(data).items():
+                assert_matches(kernel[name], expected.to_numpy(), name, f"{name} ({rows} rows)")
+
+    def test_last_only_matches_batch_functions(self):
+        for rows in (10, 260, 5_000):
+            data = make_history(rows, seed=rows)
+            kernel = compute_indicators_from_frame(data, last_only=True)
+            for name, expected in batch_indicators(data).items():
+                assert_matches(kernel[name], expected.iloc[-1], name, f"{name} ({rows} rows)")
+
+    def test_nan_bars_match_batch_functions(self):
+        for rows in (30, 241, 260):
+            data = with_gaps(make_history(rows, seed=7))
+            full = compute_indicators_from_frame(data, last_only=False)
+            last = compute_indicators_from_frame(data, last_only=True)
+            for name, expected in batch_indicators(data).items():
+                assert_matches(full[name], expected.to_numpy(), name, f"{name} ({rows} rows)")
+                assert_matches(last[name], expected.iloc[-1], name, f"{name} ({rows} rows, last only)")
+        # A single missing bar only blanks the windows that contain it.
+        self.assertFalse(np.isnan(full["macd"][-1]))
+        self.assertFalse(np.isnan(full["obv"][-1]))
+
+    def test_last_only_reads_ema_tail(self):
+        data = make_history(20_000, seed=3)
+        expected = compute_indicators_from_frame(data, last_only=False)
+        result = compute_indicators_from_frame(data, last_only=True)
+        for name in ("macd", "signal", "histogram"):
+            np.testing.assert_allclose(result[name], expected[name][-1], rtol=1e-13, atol=1e-12)
+
+    def test_close_only_skips_volume_and_range_indicators(self):
+        result = compute_indicators(np.arange(1.0, 300.0), ma_windows=(10,), last_only=True)
+        self.assertEqual(result["ma10"], 294.5)
+        self.assertNotIn("obv", result)
+        self.assertNotIn("stochastic", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import unittest
+
+import instrumentation
+from fakes import FlakyBackend
+from gemini_client import GeminiClient, ResponseCache
+from history_cache import HistoryCache
+from instrumentation import Recorder, count, instrumented, span
+
+
+@instrumented("test.square")
+def square(x):
+    return x * x
+
+
+@instrumented()
+def fail():
+    raise ValueError("boom")
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(instrumentation.disable)
+
+    def test_disabled_records_nothing(self):
+        self.assertIsNone(instrumentation.get_recorder())
+        self.assertEqual(square(3), 9)
+        with span("noop") as s:
+            count("noop")
+        self.assertIs(s, span("other"))
+
+    def test_spans_counters_and_histograms(self):
+        recorder = instrumentation.enable()
+        for x in range(5):
+            square(x)
+        with self.assertRaises(ValueError):
+            fail()
+        with span("block", ticker="AAPL"):
+            count("things", 3)
+        count("things")
+
+        summary = recorder.summary()
+        self.assertEqual(summary["latencies"]["test.square"]["calls"], 5)
+        self.assertEqual(sum(summary["latencies"]["test.square"]["histogram_us"].values()), 5)
+        self.assertEqual(summary["counters"]["things"], 4)
+        self.assertEqual(summary["counters"][f"{__name__}.fail.errors"], 1)
+        block = [e for e in recorder.events if e["name"] == "block"][0]
+        self.assertEqual(block["args"], {"ticker": "AAPL"})
+        self.assertIn("test.square", recorder.report())
+
+    def test_event_cap_keeps_statistics(self):
+        recorder = instrumentation.enable(Recorder(max_events=3))
+        for x in range(10):
+            square(x)
+        self.assertEqual(len(recorder.events), 3)
+        self.assertEqual(recorder.dropped_events, 7)
+        self.assertEqual(recorder.summary()["latencies"]["test.square"]["calls"], 10)
+
+    def test_trace_and_cache_hit_rates(self):
+        recorder = instrumentation.enable()
+        cache = HistoryCache(history_fetcher=lambda t, p, i: t, info_fetcher=lambda t: {})
+        recorder.register_cache("history", cache.history)
+        for _ in range(3):
+            cache.get_history("AAPL")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            client = GeminiClient(backend=FlakyBackend(1, default="ok"), cache=ResponseCache(tmp),
+                                  sleep=lambda s: None)
+            recorder.register_cache("gemini", client.cache)
+            client.generate("p")
+            client.generate("p")
+            path = os.path.join(tmp, "trace.json")
+            recorder.write_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+
+        names = [event["name"] for event in trace["traceEvents"]]
+        self.assertEqual(names.count("gemini.generate"), 2)
+        self.assertEqual(names.count("gemini.api"), 2)  # one failed attempt, one success
+        other = trace["otherData"]
+        self.assertEqual(other["counters"]["gemini.retries"], 1)
+        self.assertEqual(other["counters"]["gemini.response_bytes"], 2)
+        self.assertEqual(other["counters"]["gemini.api.errors"], 1)
+        self.assertAlmostEqual(other["caches"]["history"]["hit_rate"], 2 / 3)
+        self.assertEqual(other["caches"]["gemini"], {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+
+if __name__ == '__main__':
+    unittest.main()
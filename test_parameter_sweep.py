@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from backtest import run_backtest
+from benchmarks.synthetic import random_walk_panel
+from parameter_sweep import expand_grid, load_results, params_key, run_sweep
+
+GRID = {"rsi_window": [10, 14], "stop_loss": [0.9, 0.95], "stochastic_max": [None, 80]}
+
+
+class TestParameterSweep(unittest.TestCase):
+    def setUp(self):
+        self.panel = random_walk_panel(3, 600, seed=7)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_matches_direct_backtests(self):
+        output = os.path.join(self.tmp.name, "results.npz")
+        results = run_sweep(self.panel, GRID, workers=2, output=output, chunk_size=3, progress=False)
+        self.assertEqual(len(results), 8)
+        for row, params in zip(results.to_dict("records"), expand_grid(GRID)):
+            summary = run_backtest(self.panel, **params)["summary"]
+            self.assertEqual(row["trades"], summary["trades"])
+            self.assertAlmostEqual(row["compounded_return"], summary["compounded_return"])
+
+        stored = load_results(output)
+        self.assertEqual(list(stored["rsi_window"]), list(results["rsi_window"]))
+        self.assertTrue(np.isnan(stored["stochastic_max"][0]))
+
+    def test_resumes_from_checkpoint(self):
+        checkpoint = os.path.join(self.tmp.name, "checkpoint.jsonl")
+        first = expand_grid(GRID)[0]
+        marker = {"trades": -1.0}
+        with open(checkpoint, "w") as f:
+            f.write(json.dumps({"params": first, "metrics": marker}) + "\n")
+            f.write('{"params": {"rsi_wi')  # truncated by an interrupted run
+
+        results = run_sweep(self.panel, GRID, workers=2, checkpoint=checkpoint, progress=False)
+        self.assertEqual(results.iloc[0]["trades"], -1.0)
+        with open(checkpoint) as f:
+            recorded = [json.loads(line) for line in f if line.strip().endswith("}")]
+        self.assertEqual(len({params_key(row["params"]) for row in recorded}), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import asyncio
+import contextlib
+import io
+import threading
+import time
+import math
+import unittest
+
+from analysis_records import AnalysisResult, IndicatorValues
+from pipeline import Pipeline, Stage, format_stage_report, timed_step
+from trader import build_analysis_pipeline
+
+
+def slow_source(items, delay):
+    for item in items:
+        time.sleep(delay)
+        yield item
+
+
+class TestPipeline(unittest.TestCase):
+    def test_stages_overlap(self):
+        # The first stage holds its last item until an earlier one has left the
+        # last stage, which only happens if the stages run concurrently.
+        through = threading.Event()
+        waited = []
+
+        def first(item):
+            if item == 4:
+                waited.append(through.wait(timeout=5))
+            return item + 1
+
+        def last(item):
+            through.set()
+            return item + 1
+
+        stages = [Stage("first", first, workers=2), Stage("middle", lambda item: item + 1, workers=2),
+                  Stage("last", last, workers=2)]
+        results = Pipeline(slow_source(range(5), 0.001), stages).run_sync()
+        self.assertEqual(waited, [True])
+        self.assertEqual(sorted(results), [3, 4, 5, 6, 7])
+
+    def test_ordered_stage_keeps_arrival_order(self):
+        def step(item):
+            time.sleep(0.05 if item % 2 == 0 else 0.0)
+            return item
+
+        pipeline = Pipeline(range(8), [Stage("step", step, workers=4, ordered=True)])
+        self.assertEqual(pipeline.run_sync(), list(range(8)))
+
+    def test_limit_cancels_upstream(self):
+        seen = []
+
+        def step(item):
+            seen.append(item)
+            return item if item % 3 == 0 else None
+
+        pipeline = Pipeline(slow_source(range(1000), 0.001),
+                            [Stage("filter", step, workers=2, ordered=True, limit=3, queue_size=2),
+                             Stage("double", lambda item: item * 2)])
+        self.assertEqual(pipeline.run_sync(), [0, 6, 12])
+        self.assertLess(len(seen), 20)
+
+    def test_backpressure_bounds_the_source(self):
+        produced = []
+        release = threading.Event()
+
+        def source():
+            for item in range(100):
+                produced.append(item)
+                yield item
+
+        def step(item):
+            release.wait()
+            return item
+
+        async def run():
+            pipeline = Pipeline(source(), [Stage("slow", step, queue_size=3)])
+            task = asyncio.create_task(pipeline.run())
+            await asyncio.sleep(0.1)
+            in_flight = len(produced)
+            release.set()
+            await task
+            return in_flight, pipeline.results
+
+        in_flight, results = asyncio.run(run())
+        self.assertLessEqual(in_flight, 6)
+        self.assertEqual(results, list(range(100)))
+
+    def test_errors_timeouts_and_source_failure(self):
+        errors = []
+
+        def source():
+            yield from ["ok", "bad", "slow"]
+            raise ConnectionError("stream dropped")
+
+        def step(item):
+            if item == "bad":
+                raise ValueError("no data")
+            if item == "slow":
+                time.sleep(0.3)
+            return item
+
+        pipeline = Pipeline(source(), [Stage("step", step, workers=3, timeout=0.05,
+                                             on_error=lambda item, e: errors.append((item, type(e))))])
+        self.assertEqual(pipeline.run_sync(), ["ok"])
+        self.assertEqual(sorted(errors), [("bad", ValueError), ("slow", TimeoutError)])
+        self.assertIsInstance(pipeline.source_error, ConnectionError)
+        self.assertEqual(pipeline.stats[1].errors, 2)
+
+    def test_cancel_returns_partial_results(self):
+        async def run():
+            pipeline = Pipeline(slow_source(range(1000), 0.005), [Stage("step", lambda item: item)])
+            task = asyncio.create_task(pipeline.run())
+            await asyncio.sleep(0.1)
+            pipeline.cancel()
+            return await task
+
+        results = asyncio.run(run())
+        self.assertGreater(len(results), 0)
+        self.assertLess(len(results), 1000)
+
+    def test_stage_report(self):
+        pipeline = Pipeline(range(3), [Stage("step", lambda item: item)])
+        pipeline.run_sync()
+        stats = list(pipeline.stats)
+        with timed_step(stats, "sequential"):
+            time.sleep(0.01)
+        report = format_stage_report(stats, 1.0)
+        for name in ("source", "step", "sequential", "Wall time: 1.00s"):
+            self.assertIn(name, report)
+        self.assertEqual(stats[1].items_in, 3)
+        self.assertGreaterEqual(stats[-1].busy, 0.01)
+
+
+INDICATORS = IndicatorValues(100.0, 90.0, 50.0, 1.0, 0.5, 110.0, 90.0, 1e6, 60.0)
+
+
+class TestAnalysisPipeline(unittest.TestCase):
+    def test_first_qualifying_tickers_in_watchlist_order(self):
+        delays = {"A": 0.03, "B": 0.0, "C": 0.05, "D": 0.0, "E": 0.0, "F": 0.0}
+        scores = {"A": 90.0, "B": 50.0, "C": 95.0, "D": math.nan, "E": 88.0, "F": 99.0}
+
+        def analyze(ticker):
+            time.sleep(delays[ticker])
+            return AnalysisResult(ticker, scores[ticker], INDICATORS)
+
+        pipeline = build_analysis_pipeline(list(delays), max_stocks=3, workers=4, analyze=analyze,
+                                           price_fetcher=lambda ticker: 100.0 + ord(ticker))
+        results = pipeline.run_sync()
+        self.assertEqual([(ticker, price) for ticker, _, price in results],
+                         [("A", 165.0), ("C", 167.0), ("E", 169.0)])
+
+    def test_only_emitted_tickers_are_announced(self):
+        # B and C qualify before A, but only A is released under the limit of
+        # one, and D is still being analysed when the pipeline finishes.
+        release = threading.Event()
+        analysing_d = []
+
+        def analyze(ticker):
+            if ticker == "A":
+                time.sleep(0.1)
+            if ticker == "D":
+                analysing_d.append(threading.current_thread())
+                release.wait(timeout=5)
+                return AnalysisResult(ticker, 50.0, INDICATORS)
+            return AnalysisResult(ticker, 90.0, INDICATORS)
+
+        output = io.StringIO()
+        pipeline = build_analysis_pipeline(["A", "B", "C", "D"], max_stocks=1, workers=4, analyze=analyze,
+                                           price_fetcher=lambda ticker: 1.0)
+        with contextlib.redirect_stdout(output):
+            results = pipeline.run_sync()
+            release.set()
+            analysing_d[0].join(timeout=5)
+        self.assertEqual([ticker for ticker, _, _ in results], ["A"])
+        self.assertEqual(output.getvalue(), "  + Adding A to final list (Confidence: 90.00%)\n")
+
+    def test_failed_price_fetch_drops_ticker(self):
+        def analyze(ticker):
+            return AnalysisResult(ticker, 90.0, INDICATORS)
+
+        def price(ticker):
+            if ticker == "B":
+                raise ConnectionError("no quote")
+            return 1.0
+
+        results = build_analysis_pipeline(["A", "B", "C"], analyze=analyze, price_fetcher=price).run_sync()
+        self.assertEqual([ticker for ticker, _, _ in results], ["A", "C"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+
+import numpy as np
+
+from portfolio_tracker import PortfolioTracker
+from quote_service import QuoteService
+
+
+class TestPortfolioTracker(unittest.TestCase):
+    def test_adding_shares_updates_cost_basis(self):
+        tracker = PortfolioTracker()
+        tracker.add_position("AAPL", 10, 100.0)
+        tracker.add_position("AAPL", 10, 200.0)
+        self.assertEqual(tracker.portfolio, {"AAPL": {"shares": 20.0, "purchase_price": 150.0}})
+
+    def test_fifo_closes_oldest_lots_first(self):
+        tracker = PortfolioTracker(method="fifo", cash=10_000.0)
+        tracker.add_position("AAPL", 10, 100.0)
+        tracker.add_position("AAPL", 10, 200.0)
+        tracker.remove_position("AAPL", 15, sale_price=250.0)
+        self.assertEqual(tracker.realized_pnl(), {"AAPL": 10 * 150.0 + 5 * 50.0})
+        self.assertEqual(tracker.portfolio["AAPL"], {"shares": 5.0, "purchase_price": 200.0})
+        self.assertEqual(list(tracker.lot_pnl()["purchase_price"]), [200.0])
+        self.assertEqual(tracker.cash, 10_000.0 - 3000.0 + 15 * 250.0)
+
+    def test_average_cost_keeps_average(self):
+        tracker = PortfolioTracker(method="average")
+        tracker.add_position("AAPL", 10, 100.0)
+        tracker.add_position("AAPL", 10, 200.0)
+        tracker.remove_position("AAPL", 15, sale_price=250.0)
+        self.assertAlmostEqual(tracker.realized_pnl()["AAPL"], 15 * 100.0)
+        self.assertAlmostEqual(tracker.portfolio["AAPL"]["purchase_price"], 150.0)
+        self.assertAlmostEqual(tracker.lot_pnl()["shares"].sum(), 5.0)
+
+    def test_removing_everything_closes_the_position(self):
+        tracker = PortfolioTracker()
+        tracker.add_position("KO", 5, 60.0)
+        tracker.remove_position("KO", 50, sale_price=55.0)
+        self.assertEqual(tracker.portfolio, {})
+        self.assertEqual(tracker.market_value, 0.0)
+        self.assertEqual(tracker.realized_pnl(), {"KO": -25.0})
+        self.assertEqual(len(tracker.lot_pnl()["ticker"]), 0)
+
+    def test_unquoted_positions_are_unpriced(self):
+        tracker = PortfolioTracker(cash=1000.0)
+        tracker.add_position("KO", 5, 60.0)
+        self.assertEqual(tracker.market_value, 0.0)
+        self.assertEqual(tracker.exposures(), {})
+        self.assertEqual(tracker.unrealized_pnl(), {})
+        tracker.remove_position("KO", 2)  # sold at cost, as there is no price to book P&L at
+        self.assertEqual(tracker.realized_pnl(), {})
+        self.assertEqual(tracker.cash, 1000.0 - 3 * 60.0)
+
+        tracker.update_price("KO", 62.0)
+        self.assertEqual(tracker.exposures(), {"KO": 186.0})
+        tracker.remove_position("KO", 3)
+        self.assertEqual(tracker.realized_pnl(), {"KO": 6.0})
+
+    def test_cash_is_only_tracked_from_a_starting_balance(self):
+        tracker = PortfolioTracker()
+        tracker.add_position("KO", 10, 60.0)
+        tracker.update_price("KO", 62.0)
+        tracker.remove_position("KO", 5)
+        self.assertIsNone(tracker.cash)
+        self.assertEqual(tracker.nav, 310.0)
+
+    def test_incremental_nav_matches_full_revaluation(self):
+        rng = np.random.default_rng(7)
+        tickers = [f"T{i:03d}" for i in range(50)]
+        tracker = PortfolioTracker(cash=1_000_000.0)
+        for _ in range(2000):
+            tracker.add_position(tickers[rng.integers(50)], float(rng.integers(1, 100)), float(rng.uniform(10, 500)))
+        tracker.update_prices({ticker: float(rng.uniform(10, 500)) for ticker in tickers})
+        for _ in range(300):
+            tracker.remove_position(tickers[rng.integers(50)], float(rng.integers(1, 50)))
+        for _ in range(5000):
+            tracker.update_price(tickers[rng.integers(50)], float(rng.uniform(10, 500)))
+
+        incremental = tracker.market_value
+        self.assertAlmostEqual(incremental, tracker.revalue(), delta=1e-6 * abs(incremental))
+        self.assertAlmostEqual(tracker.nav, tracker.cash + tracker.market_value)
+
+        lots = tracker.lot_pnl()
+        prices = {t: tracker._prices[tracker._index[t]] for t in tickers}
+        expected = [s * (prices[t] - p) for t, s, p in zip(lots["ticker"], lots["shares"], lots["purchase_price"])]
+        np.testing.assert_allclose(lots["unrealized_pnl"], expected)
+        self.assertAlmostEqual(sum(tracker.unrealized_pnl().values()), sum(expected), places=4)
+
+    def test_performance_prices_positions_in_one_lookup(self):
+        calls = []
+
+        def source(tickers):
+            calls.append(list(tickers))
+            return {"AAPL": 200.0, "MSFT": 400.0}
+
+        tracker = PortfolioTracker(quote_service=QuoteService(source=source))
+        tracker.add_position("AAPL", 10, 150.0)
+        tracker.add_position("AAPL", 10, 250.0)
+        tracker.add_position("MSFT", 5, 400.0)
+        performance = tracker.get_portfolio_performance()
+        self.assertEqual(performance["Total Portfolio Value"], "$6,000.00")
+        self.assertEqual(performance["Total Return"], "0.00%")
+        self.assertEqual(calls, [["AAPL", "MSFT"]])
+
+    def test_unknown_method_is_rejected(self):
+        with self.assertRaises(ValueError):
+            PortfolioTracker(method="lifo")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import random_walk_ohlcv
+from history_store import HistoryStore
+from indicator_kernel import compute_indicators_from_frame
+from price_cube import PriceCube
+from technical_indicators import calculate_moving_average, calculate_rsi
+
+DATES = pd.date_range("2023-01-02", periods=300, freq="B")
+HISTORIES = {
+    "AAA": random_walk_ohlcv(seed=1, index=DATES),
+    "BBB": random_walk_ohlcv(seed=2, index=DATES[50:]),                      # listed later
+    "CCC": random_walk_ohlcv(seed=3, index=DATES.delete([100, 101, 102])),   # trading halt
+}
+
+
+class TestPriceCube(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cube")
+        self.cube = PriceCube.build(self.path, HISTORIES)
+
+    def test_aligned_with_nan_gaps(self):
+        cube = PriceCube.open(self.path)
+        self.assertEqual(cube.shape, (5, 3, 300))
+        self.assertTrue(cube.dates.equals(DATES))
+        close = cube.values("Close")
+        self.assertTrue(np.isnan(close[1, :50]).all())
+        self.assertTrue(np.isnan(close[2, 100:103]).all())
+        np.testing.assert_array_equal(close[0], HISTORIES["AAA"]["Close"].to_numpy())
+
+    def test_views_share_the_mapping(self):
+        panel = self.cube.panel(start=DATES[10], end=DATES[200])
+        self.assertEqual(len(panel), 191)
+        self.assertTrue(np.shares_memory(panel["Close"].to_numpy(), self.cube.data))
+        self.assertTrue(np.shares_memory(self.cube.history("AAA").to_numpy(), self.cube.data))
+        subset = self.cube.panel(["BBB", "CCC"], start=DATES[10])
+        self.assertEqual(list(subset["Close"].columns), ["BBB", "CCC"])
+        for field in self.cube.fields:
+            self.assertTrue(np.shares_memory(subset[field].to_numpy(), self.cube.data), field)
+        np.testing.assert_array_equal(subset["Close"].to_numpy().T, self.cube.values("Close", ["BBB", "CCC"])[:, 10:])
+        self.assertTrue(np.shares_memory(self.cube.values("Close", ["BBB", "CCC"]), self.cube.data))
+        self.assertFalse(np.shares_memory(self.cube.values("Close", ["AAA", "CCC"]), self.cube.data))
+
+    def test_indicators_run_on_views(self):
+        panel = self.cube.panel()
+        np.testing.assert_array_equal(calculate_moving_average(panel, 50)["AAA"].to_numpy(),
+                                      calculate_moving_average(HISTORIES["AAA"], 50).to_numpy())
+        np.testing.assert_array_equal(calculate_rsi(self.cube.history("AAA")).to_numpy(),
+                                      calculate_rsi(HISTORIES["AAA"]).to_numpy())
+
+    def test_history_fetcher_drops_gaps(self):
+        history = self.cube.history_fetcher("ccc", period="max")
+        self.assertEqual(len(history), 297)
+        self.assertEqual(compute_indicators_from_frame(history), compute_indicators_from_frame(HISTORIES["CCC"]))
+        self.assertEqual(self.cube.history_fetcher("BBB", period="max").index[0], DATES[50])
+
+    def test_float32_and_calendar(self):
+        calendar = DATES[::2]
+        cube = PriceCube.build(self.path, HISTORIES, dtype="float32", calendar=calendar)
+        self.assertEqual(cube.dtype, np.float32)
+        self.assertEqual(cube.shape, (5, 3, 150))
+        np.testing.assert_allclose(cube.values("Close")[0], HISTORIES["AAA"]["Close"].to_numpy()[::2], rtol=1e-6)
+
+    def test_from_store(self):
+        store = HistoryStore(os.path.join(self.tmp.name, "store"),
+                             fetcher=lambda ticker, **kwargs: HISTORIES[ticker])
+        for ticker in HISTORIES:
+            store.refresh(ticker)
+        cube = PriceCube.from_store(self.path, store, ["AAA", "BBB", "CCC", "MISSING"])
+        self.assertEqual(cube.tickers, ["AAA", "BBB", "CCC"])
+        np.testing.assert_array_equal(cube.values("Close"), self.cube.values("Close"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from portfolio_tracker import PortfolioTracker
+from price_monitor import JsonLinesSink, PriceMonitor, replay_feed
+
+
+class TestPriceMonitor(unittest.TestCase):
+    def test_fires_only_crossed_levels(self):
+        events = []
+        monitor = PriceMonitor(sinks=[events.append])
+        monitor.add_position("a", "AAPL", 10, stop_loss=90.0, take_profit=120.0)
+        monitor.add_position("b", "AAPL", 5, stop_loss=95.0, take_profit=110.0)
+        monitor.add_position("c", "MSFT", 1, stop_loss=300.0, take_profit=500.0)
+
+        self.assertEqual(monitor.on_tick("AAPL", 100.0), [])
+        self.assertEqual([e["position"] for e in monitor.on_tick("AAPL", 95.0, "t1")], ["b"])
+        self.assertEqual(monitor.on_tick("AAPL", 94.0), [])
+        fired = monitor.on_tick("AAPL", 125.0, "t2")
+        self.assertEqual([(e["position"], e["event"], e["level"]) for e in fired], [("a", "take_profit", 120.0)])
+        self.assertEqual(set(p["id"] for p in monitor.positions.values()), {"c"})
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0]["time"], "t1")
+
+    def test_replayed_feed_closes_tracker_lots(self):
+        tracker = PortfolioTracker(cash=10_000.0)
+        tracker.add_position("AAPL", 10, 100.0)
+        tracker.add_position("KO", 20, 50.0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            feed = os.path.join(tmp, "ticks.csv")
+            with open(feed, "w") as f:
+                f.write("timestamp,ticker,price\n")
+                for i, (ticker, price) in enumerate([("AAPL", 105), ("KO", 52), ("AAPL", 121), ("KO", 44.5),
+                                                     ("KO", 60)]):
+                    f.write(f"2024-01-02T10:00:{i:02d},{ticker},{price}\n")
+            events_path = os.path.join(tmp, "events.jsonl")
+            sink = JsonLinesSink(events_path)
+            monitor = PriceMonitor(sinks=[sink])
+            monitor.load_tracker(tracker)
+            monitor.run(replay_feed(feed))
+            sink.close()
+            with open(events_path) as f:
+                events = [json.loads(line) for line in f]
+
+        self.assertEqual([(e["ticker"], e["event"]) for e in events], [("AAPL", "take_profit"), ("KO", "stop_loss")])
+        self.assertEqual(monitor.ticks, 4)  # stops once nothing is left to watch
+        self.assertEqual(tracker.portfolio, {})
+        self.assertAlmostEqual(tracker.cash, 10_000.0 + 10 * 21 - 20 * 5.5)
+
+    def test_fired_level_closes_its_own_lot(self):
+        tracker = PortfolioTracker(cash=10_000.0)
+        tracker.add_position("AAPL", 10, 100.0)  # stop at 90
+        tracker.add_position("AAPL", 10, 120.0)  # stop at 108
+        monitor = PriceMonitor()
+        monitor.load_tracker(tracker)
+
+        fired = monitor.on_tick("AAPL", 105.0)
+        self.assertEqual([(e["position"], e["event"]) for e in fired], [("AAPL#2", "stop_loss")])
+        self.assertEqual(tracker.portfolio, {"AAPL": {"shares": 10.0, "purchase_price": 100.0}})
+        self.assertEqual(list(tracker.lot_pnl()["purchase_price"]), [100.0])
+        self.assertEqual(tracker.realized_pnl(), {"AAPL": 10 * (105.0 - 120.0)})
+
+    def test_many_positions_match_a_full_scan(self):
+        rng = np.random.default_rng(3)
+        monitor = PriceMonitor()
+        tickers = [f"T{i:03d}" for i in range(100)]
+        for i in range(5000):
+            cost = float(rng.uniform(50, 150))
+            monitor.add_position(i, tickers[i % 100], 1, cost * 0.9, cost * 1.2)
+        for _ in range(10000):
+            ticker, price = tickers[rng.integers(100)], float(rng.uniform(60, 140))
+            # Every level the tick crosses fires, and nothing else.
+            expected = {p["id"] for p in monitor.positions.values()
+                        if p["ticker"] == ticker and (p["stop_loss"] >= price or p["take_profit"] <= price)}
+            self.assertEqual({e["position"] for e in monitor.on_tick(ticker, price)}, expected)
+        remaining = len(monitor.positions)
+        self.assertEqual(sum(len(l.stops) for l in monitor._levels.values()), remaining)
+        self.assertEqual(sum(len(l.targets) for l in monitor._levels.values()), remaining)
+
+
+if __name__ == '__main__':
+    unittest.main()
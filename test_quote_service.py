@@ -0,0 +1,84 @@
+import unittest
+
+import pandas as pd
+
+from fakes import FakeClock
+from history_cache import HistoryCache
+from portfolio_tracker import PortfolioTracker
+from quote_service import QuoteService
+
+
+class FakeSource:
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, tickers):
+        self.calls.append(list(tickers))
+        if self.fail:
+            raise ConnectionError("quote endpoint unavailable")
+        return {ticker: self.prices[ticker] for ticker in tickers if ticker in self.prices}
+
+
+def history(closes, end="2024-01-05"):
+    index = pd.date_range(end=end, periods=len(closes), freq="D")
+    return pd.DataFrame({"Close": closes}, index=index)
+
+
+class TestQuoteService(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.source = FakeSource({"AAPL": 190.0, "MSFT": 410.0, "KO": 60.0})
+        self.history_cache = HistoryCache(history_fetcher=lambda t, p, i: None)
+        self.service = QuoteService(source=self.source, ttl=15, history_cache=self.history_cache,
+                                    batch_size=2, clock=self.clock)
+
+    def test_batches_lookups_and_caches_quotes(self):
+        quotes = self.service.get_quotes(["AAPL", "msft", "KO", "AAPL"])
+        self.assertEqual(quotes, {"AAPL": 190.0, "msft": 410.0, "KO": 60.0})
+        self.assertEqual(self.source.calls, [["AAPL", "MSFT"], ["KO"]])
+
+        self.service.get_quotes(["AAPL", "KO"])
+        self.assertEqual(len(self.source.calls), 2)
+
+        self.clock.now += 15
+        self.source.prices["AAPL"] = 191.0
+        self.assertEqual(self.service.get_quote("AAPL"), 191.0)
+        self.assertEqual(self.source.calls[-1], ["AAPL"])
+
+    def test_falls_back_to_stale_quote_then_cached_bar(self):
+        self.service.get_quotes(["AAPL"])
+        self.clock.now += 60
+        self.source.fail = True
+        self.history_cache.history.set(("NVDA", "1y", "1d"), history([100.0, 101.0, 102.0]))
+        self.history_cache.history.set(("NVDA", "5d", "1m"), history([99.0, 103.5], end="2024-01-06"))
+
+        quotes = self.service.get_quotes(["AAPL", "NVDA", "ZZZZ"])
+        self.assertEqual(quotes, {"AAPL": 190.0, "NVDA": 103.5})
+        self.assertEqual(self.service.fallbacks, 2)
+        self.assertIsInstance(self.service.last_error, ConnectionError)
+        with self.assertRaises(KeyError):
+            self.service.get_quote("ZZZZ")
+
+
+class TestPortfolioTracker(unittest.TestCase):
+    def test_performance_uses_one_batched_lookup(self):
+        source = FakeSource({"AAPL": 200.0, "MSFT": 400.0})
+        tracker = PortfolioTracker(quote_service=QuoteService(source=source))
+        tracker.add_position("AAPL", 10, 150.0)
+        tracker.add_position("MSFT", 5, 400.0)
+        performance = tracker.get_portfolio_performance()
+        self.assertEqual(performance["Total Portfolio Value"], "$4,000.00")
+        self.assertEqual(performance["Total Return"], "14.29%")
+        self.assertEqual(source.calls, [["AAPL", "MSFT"]])
+
+    def test_unpriced_positions_are_reported(self):
+        tracker = PortfolioTracker(quote_service=QuoteService(source=FakeSource({}),
+                                                              history_cache=HistoryCache()))
+        tracker.add_position("ZZZZ", 1, 10.0)
+        self.assertEqual(tracker.get_portfolio_performance(), "Could not get a price for: ZZZZ")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import random_walk_ohlcv
+from history_store import HistoryStore, period_start
+from resampling import IncrementalResampler, MultiTimeframeHistory, resample
+
+AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def minute_bars(days=3, seed=0):
+    sessions = pd.bdate_range("2024-03-04", periods=days)
+    index = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(day + pd.Timedelta("09:30:00"), periods=390, freq="min").to_numpy() for day in sessions
+    ])).tz_localize("America/New_York")
+    return random_walk_ohlcv(seed=seed, volatility=0.001, index=index)
+
+
+class TestResample(unittest.TestCase):
+    def test_intraday_matches_pandas(self):
+        bars = minute_bars()
+        for timeframe, rule, offset in (("5m", "5min", None), ("15m", "15min", None), ("1h", "60min", "30min")):
+            expected = bars.resample(rule, offset=offset).agg(AGGREGATION).dropna(subset=["Close"])
+            result = resample(bars, timeframe)
+            pd.testing.assert_frame_equal(result, expected, check_freq=False, check_index_type=False)
+        # Hourly bars start at the open, like yfinance's: 09:30, 10:30, ... 15:30.
+        self.assertEqual(len(resample(bars, "1h")), 3 * 7)
+
+    def test_calendar_timeframes(self):
+        daily = random_walk_ohlcv(index=pd.bdate_range("2023-01-02", "2024-06-28"))
+        weekly = resample(daily, "1wk")
+        self.assertTrue((weekly.index.dayofweek == 0).all())
+        week = daily.loc["2024-01-08":"2024-01-12"]
+        self.assertEqual(weekly.loc["2024-01-08", "High"], week["High"].max())
+        self.assertEqual(weekly.loc["2024-01-08", "Volume"], week["Volume"].sum())
+
+        monthly = resample(daily, "1mo")
+        self.assertEqual(len(monthly), 18)
+        self.assertEqual(monthly.loc["2024-02-01", "Open"], daily.loc["2024-02-01", "Open"])
+        self.assertEqual(monthly.loc["2024-02-01", "Close"], daily.loc["2024-02-29", "Close"])
+        self.assertTrue(resample(minute_bars(), "1d").index.equals(
+            pd.DatetimeIndex(["2024-03-04", "2024-03-05", "2024-03-06"]).tz_localize("America/New_York")))
+
+
+class TestIncrementalResampler(unittest.TestCase):
+    def test_matches_batch_with_revised_bars(self):
+        bars = minute_bars(days=2, seed=1)
+        resampler = IncrementalResampler("15m")
+        position = 0
+        for size in (7, 1, 100, 23, 400, 249):
+            # Each update re-sends the previous last bar, whose close was partial.
+            chunk = bars.iloc[max(0, position - 1):position + size].copy()
+            chunk.iloc[-1, chunk.columns.get_loc("Close")] += 1.0
+            resampler.update(chunk)
+            position += size
+            expected = bars.iloc[:position].copy()
+            expected.iloc[-1, expected.columns.get_loc("Close")] += 1.0
+            pd.testing.assert_frame_equal(resampler.bars, resample(expected, "15m"))
+        self.assertEqual(len(resampler.completed), 2 * 26 - 1)
+
+    def test_empty_before_first_update(self):
+        resampler = IncrementalResampler("1wk")
+        self.assertIsInstance(resampler.completed.index, pd.DatetimeIndex)
+        self.assertIsInstance(resampler.bars.index, pd.DatetimeIndex)
+        self.assertTrue(resampler.bars[resampler.bars.index >= period_start("1y")].empty)
+
+
+class TestMultiTimeframeHistory(unittest.TestCase):
+    def test_serves_timeframes_without_fetching(self):
+        daily = random_walk_ohlcv(400, seed=2, start="2022-01-03")
+        minutes = minute_bars(seed=3)
+        sources = {"1d": daily, "1m": minutes}
+        calls = []
+
+        def fetcher(ticker, start=None, interval="1d", initial_period="max"):
+            calls.append(interval)
+            frame = sources[interval]
+            return frame if start is None else frame[frame.index.tz_localize(None) >= start]
+
+        with tempfile.TemporaryDirectory() as root:
+            history = MultiTimeframeHistory(HistoryStore(root, fetcher=fetcher, refresh_interval=3600))
+            weekly = history.history("AAPL", period="max", interval="1wk")
+            hourly = history.history("AAPL", period="max", interval="1h")
+            history.history("AAPL", period="max", interval="1mo")
+            history.history("AAPL", period="max", interval="5m")
+
+            self.assertEqual(sorted(calls), ["1d", "1m"])
+            pd.testing.assert_frame_equal(weekly, resample(daily.tz_localize(None), "1wk"), check_names=False)
+            pd.testing.assert_frame_equal(hourly, resample(minutes.tz_localize(None), "1h"), check_names=False)
+
+            # A ticker without stored bars has no bars in any timeframe.
+            sources["1d"] = sources["1d"].iloc[:0]
+            self.assertTrue(history.history("NONE", period="1y", interval="1wk").empty)
+            sources["1d"] = daily
+
+            # New daily bars extend the weekly series.
+            sources["1d"] = pd.concat([daily, random_walk_ohlcv(20, seed=4, start=daily.index[-1] + pd.offsets.BDay())])
+            history.store.refresh("AAPL", "1d")
+            pd.testing.assert_frame_equal(history.history("AAPL", period="max", interval="1wk"),
+                                          resample(sources["1d"].tz_localize(None), "1wk"), check_names=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import math
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import random_walk_ohlcv
+from context_builder import TradingContextBuilder
+from portfolio_tracker import PortfolioTracker
+from risk import RiskModel
+
+
+def make_closes(bars=300, tickers=("AAA", "BBB", "CCC"), seed=0):
+    # Each ticker's own walk is scaled by a growing share of a common one, so they are correlated.
+    walks = [random_walk_ohlcv(bars, seed=seed + i, start="2023-01-02")["Close"] for i in range(len(tickers) + 1)]
+    market = walks[0] / walks[0].iloc[0]
+    return pd.DataFrame({ticker: walks[i + 1] * market ** (0.5 * (i + 1)) for i, ticker in enumerate(tickers)})
+
+
+def direct_covariance(returns, decay):
+    # The weighted average of r r' over every bar, without the recursion.
+    weights = (1 - decay) * decay ** np.arange(len(returns) - 1, -1, -1)
+    return (returns * weights[:, None]).T @ returns / weights.sum()
+
+
+class TestRiskModel(unittest.TestCase):
+    def setUp(self):
+        self.closes = make_closes()
+        self.returns = self.closes.pct_change().to_numpy()[1:]
+
+    def test_matches_direct_estimate(self):
+        model = RiskModel.from_prices(self.closes, decay=0.97)
+        np.testing.assert_allclose(model.covariance().to_numpy(), direct_covariance(self.returns, 0.97), rtol=1e-9)
+        correlation = model.correlation().to_numpy()
+        np.testing.assert_allclose(np.diag(correlation), 1.0)
+        self.assertGreater(correlation[1, 2], 0.3)
+
+    def test_incremental_updates_match_batch(self):
+        batch = RiskModel.from_prices(self.closes)
+        model = RiskModel.from_prices(self.closes.iloc[:200])
+        for _, row in self.closes.iloc[200:].iterrows():
+            model.update_prices(row.to_dict())
+        np.testing.assert_allclose(model.covariance().to_numpy(), batch.covariance().to_numpy(), rtol=1e-9)
+        exposures = {"AAA": 5000.0, "CCC": -2000.0}
+        self.assertAlmostEqual(model.historical_var(exposures), batch.historical_var(exposures))
+
+    def test_symbol_added_later(self):
+        closes = self.closes.copy()
+        closes.iloc[:100, 2] = np.nan
+        model = RiskModel.from_prices(closes)
+        late = self.returns[100:, 2]
+        self.assertAlmostEqual(model.covariance().iloc[2, 2], direct_covariance(late[:, None], 0.94)[0, 0])
+
+    def test_portfolio_figures(self):
+        model = RiskModel.from_prices(self.closes, window=250)
+        exposures = {"AAA": 6000.0, "BBB": 3000.0, "CCC": 1000.0}
+        w = np.array(list(exposures.values()))
+        sigma = math.sqrt(w @ model.covariance().to_numpy() @ w)
+
+        self.assertAlmostEqual(model.volatility(exposures), sigma)
+        self.assertAlmostEqual(model.volatility(exposures, horizon=4), 2 * sigma)
+        self.assertAlmostEqual(model.parametric_var(exposures, 0.99), 2.3263478740 * sigma, places=6)
+        pnl = self.returns[-250:] @ w
+        self.assertAlmostEqual(model.historical_var(exposures, 0.95), -np.quantile(pnl, 0.05))
+        contributions = model.contributions(exposures)
+        self.assertAlmostEqual(sum(contributions.values()), sigma)
+        self.assertGreater(contributions["AAA"], contributions["CCC"])
+
+    def test_summary_in_trading_context(self):
+        model = RiskModel.from_prices(self.closes)
+        tracker = PortfolioTracker(cash=20000.0)
+        tracker.add_position("AAA", 50, 100.0)
+        tracker.update_prices(self.closes.iloc[-1].to_dict())
+        self.assertEqual(list(tracker.exposures()), ["AAA"])
+
+        summary = model.summary(tracker.exposures(), watchlist=["AAA", "BBB", "UNKNOWN"])
+        self.assertEqual(list(summary.correlations), ["BBB", "UNKNOWN"])
+        self.assertAlmostEqual(summary.contributions["AAA"], summary.volatility)
+
+        context = TradingContextBuilder(nav=tracker.nav, cash=tracker.cash, risk=summary,
+                                        timestamp="2024-01-02 15:30:00").build(["BBB"], {"BBB": 101.0}, {})
+        self.assertIn(f"Net Asset Value (NAV): ${tracker.nav:,.2f}", context)
+        self.assertIn("Value at Risk (1-day, 95%): parametric $", context)
+        self.assertIn("Risk Contributions: AAA 100%", context)
+        self.assertIn("Correlation with Portfolio: BBB ", context)
+
+    def test_unpriced_positions_are_reported(self):
+        model = RiskModel.from_prices(self.closes)
+        tracker = PortfolioTracker(cash=20000.0)
+        tracker.add_position("AAA", 50, 100.0)
+        tracker.add_position("BBB", 10, 100.0)
+        tracker.add_position("NEW", 10, 100.0)
+        tracker.update_prices({"AAA": 101.0, "NEW": 20.0})
+
+        summary = model.summary(tracker.exposures(), watchlist=["BBB", "CCC"], positions=tracker.portfolio)
+        self.assertEqual(summary.unmodelled, ["BBB", "NEW"])
+        self.assertEqual(list(summary.correlations), ["CCC"])
+        self.assertIn("Excluded from risk (no price or return history): BBB, NEW",
+                      summary.format_lines(tracker.nav))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("yfinance", "pandas", "numpy", "tabulate", "google.generativeai")
+
+
+def loaded_modules(code):
+    result = subprocess.run([sys.executable, "-c", code + "; import sys; print(' '.join(sys.modules))"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+class TestStartup(unittest.TestCase):
+    def test_importing_entry_points_stays_light(self):
+        for module in ("trader", "stock_analyzer", "price_monitor"):
+            loaded = loaded_modules(f"import {module}")
+            self.assertEqual([m for m in HEAVY_MODULES if m in loaded], [], module)
+
+    def test_offline_data_modules_do_not_load_yfinance(self):
+        # Scans, cubes and resampling read stored bars; only a refresh downloads.
+        for module in ("history_store", "universe_scan", "price_cube", "resampling"):
+            self.assertNotIn("yfinance", loaded_modules(f"import {module}"), module)
+
+    def test_sell_price_cli_needs_no_heavy_modules(self):
+        code = ("import runpy, sys; sys.argv = ['trader.py', 'AAPL', '150']; "
+                "runpy.run_path('trader.py', run_name='__main__')")
+        loaded = loaded_modules(code)
+        self.assertEqual([m for m in HEAVY_MODULES if m in loaded], [])
+
+        result = subprocess.run([sys.executable, "trader.py", "AAPL", "150"], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        self.assertIn("Stop Loss: 135.00", result.stdout)
+        self.assertIn("Take Profit: 180.00", result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from fakes import FakeClock
+from fundamentals import FundamentalsSnapshot
+from history_cache import HistoryCache
+from stock_screener import StockScreener
+
+INFO = {
+    "AAA": {"marketCap": 5e11, "trailingPE": 20, "forwardPE": 18, "dividendYield": 0.02},
+    "BBB": {"marketCap": 2e9, "trailingPE": 15, "forwardPE": 16, "dividendYield": 0.03},
+    "CCC": {"marketCap": 8e10, "trailingPE": 40, "forwardPE": 30},
+    "DDD": {"marketCap": 3e10, "forwardPE": 12, "dividendYield": 0.01},
+}
+
+
+class TestStockScreener(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def info_fetcher(ticker):
+            self.calls.append(ticker)
+            return INFO[ticker]
+
+        self.cache = HistoryCache(info_fetcher=info_fetcher)
+        self.screener = StockScreener(list(INFO), cache=self.cache)
+
+    def test_legacy_criteria(self):
+        self.assertEqual(self.screener.screen_stocks({"market_cap": 1e10}), ["AAA", "CCC", "DDD"])
+        self.assertEqual(self.screener.screen_stocks({"pe_ratio": 25}), ["AAA", "BBB"])
+        self.assertEqual(self.screener.screen_stocks({"dividend_yield": 0.015}), ["AAA", "BBB"])
+        self.assertEqual(self.screener.screen_stocks({"market_cap": 1e10, "pe_ratio": 25}), ["AAA"])
+
+    def test_ranges_ratios_and_technical_columns(self):
+        self.assertEqual(self.screener.screen_stocks({"trailingPE": ("between", 15, 25)}), ["AAA", "BBB"])
+        self.assertEqual(self.screener.screen_stocks({"forwardPE/trailingPE": ("<", 1)}), ["AAA", "CCC"])
+        self.assertEqual(self.screener.screen_stocks({"dividendYield": ("!=", 0.03)}), ["AAA", "DDD"])
+
+        technicals = pd.DataFrame({"ma50": [110, 90, 100], "ma200": [100, 100, 95]},
+                                  index=["AAA", "BBB", "DDD"])
+        criteria = {"ma50": (">", "ma200"), "market_cap": 1e10}
+        self.assertEqual(self.screener.screen_stocks(criteria, technicals=technicals), ["AAA", "DDD"])
+
+    def test_snapshot_refreshes_only_stale_rows(self):
+        clock = FakeClock(1_000_000.0)
+        snapshot = FundamentalsSnapshot(ttl=60, info_fetcher=INFO.get, clock=clock)
+        self.assertEqual(snapshot.refresh(["AAA", "BBB"]), 2)
+        clock.now += 30
+        self.assertEqual(snapshot.refresh(["AAA", "BBB", "CCC"]), 1)
+        clock.now += 45
+        self.assertEqual(snapshot.refresh(["AAA", "BBB", "CCC"]), 2)
+
+    def test_snapshot_persists_between_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fundamentals.pkl")
+            FundamentalsSnapshot(path=path, info_fetcher=INFO.get).refresh(list(INFO))
+            reloaded = FundamentalsSnapshot(path=path, info_fetcher=lambda t: self.fail("refetched"))
+            self.assertEqual(reloaded.get(["CCC"]).loc["CCC", "trailingPE"], 40)
+
+    def test_fundamentals_are_fetched_once(self):
+        self.screener.screen_stocks({"market_cap": 1e10})
+        self.screener.screen_stocks({"pe_ratio": 25})
+        self.assertEqual(sorted(self.calls), sorted(INFO))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import flat_stretch, random_walk_ohlcv
+from streaming_indicators import IndicatorStreams, StreamingIndicatorSet
+from technical_indicators import (
+    calculate_moving_average,
+    calculate_rsi,
+    calculate_macd,
+    calculate_bollinger_bands,
+    calculate_obv,
+    calculate_stochastic_oscillator,
+)
+
+
+def make_history(rows=400, seed=0):
+    # A flat stretch exercises zero-loss RSI and equal closes in OBV.
+    return flat_stretch(random_walk_ohlcv(rows, seed=seed, start="2020-01-01"), 150, 170)
+
+
+class TestStreamingIndicators(unittest.TestCase):
+    def test_matches_batch_functions_bar_by_bar(self):
+        data = make_history()
+        macd, signal_line, _ = calculate_macd(data)
+        upper_band, _, lower_band = calculate_bollinger_bands(data)
+        expected = pd.DataFrame({
+            "ma50": calculate_moving_average(data, 50),
+            "ma200": calculate_moving_average(data, 200),
+            "rsi": calculate_rsi(data),
+            "macd": macd,
+            "signal": signal_line,
+            "bollinger_upper": upper_band,
+            "bollinger_lower": lower_band,
+            "obv": calculate_obv(data),
+            "stochastic": calculate_stochastic_oscillator(data),
+        })
+
+        indicators = StreamingIndicatorSet()
+        rows = [indicators.update(r.High, r.Low, r.Close, r.Volume) for r in data.itertuples()]
+        actual = pd.DataFrame(rows, index=data.index)
+
+        for column in expected:
+            np.testing.assert_allclose(actual[column], expected[column], rtol=1e-9, atol=1e-9,
+                                       equal_nan=True, err_msg=column)
+
+    def test_seeded_stream_continues_like_batch(self):
+        data = make_history(300, seed=1)
+        streams = IndicatorStreams()
+        streams.seed("AAPL", data.iloc[:250])
+        for r in data.iloc[250:].itertuples():
+            latest = streams.update("AAPL", r.High, r.Low, r.Close, r.Volume)
+
+        self.assertAlmostEqual(latest["ma200"], calculate_moving_average(data, 200).iloc[-1], places=9)
+        self.assertAlmostEqual(latest["rsi"], calculate_rsi(data).iloc[-1], places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
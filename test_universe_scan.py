@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from analysis_records import IndicatorValues
+from benchmarks.synthetic import random_walk_ohlcv
+from fundamentals import FundamentalsSnapshot
+from history_store import HistoryStore
+from indicator_kernel import compute_indicators_from_frame
+from stock_analyzer import confidence_score
+from universe_scan import read_ticker_list, scan_universe, shard_tickers
+
+
+HISTORIES = {f"T{i:02d}": random_walk_ohlcv(260, seed=i, drift=0.0005 * (i % 3 - 1), start="2020-01-01")
+             for i in range(24)}
+INFOS = {ticker: {"trailingPE": 10 + i, "forwardPE": 12 + i % 5 * 2, "dividendYield": 0.01 * (i % 2)}
+         for i, ticker in enumerate(HISTORIES)}
+
+
+class TestReadTickerList(unittest.TestCase):
+    def write(self, text):
+        fd, path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_plain_list(self):
+        path = self.write("# universe\naapl\n\nMSFT\nAAPL\n brk-b \n")
+        self.assertEqual(read_ticker_list(path), ["AAPL", "MSFT", "BRK-B"])
+
+    def test_csv_with_symbol_column(self):
+        path = self.write("Name,Symbol,Sector\nApple,AAPL,Tech\nMicrosoft,MSFT,Tech\n")
+        self.assertEqual(read_ticker_list(path), ["AAPL", "MSFT"])
+
+    def test_shards_cover_universe(self):
+        shards = shard_tickers(list("ABCDEFG"), 3)
+        self.assertEqual(shards, [(0, list("ABC")), (3, list("DEF")), (6, ["G"])])
+
+
+class TestScanUniverse(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        store = HistoryStore(self.tmp.name, fetcher=lambda ticker, **kwargs: HISTORIES[ticker])
+        for ticker in HISTORIES:
+            store.refresh(ticker)
+        self.fundamentals = FundamentalsSnapshot(info_fetcher=INFOS.get)
+        self.fundamentals.refresh(list(HISTORIES) + ["MISSING"])
+
+    def expected(self):
+        scores = {}
+        for ticker, hist in HISTORIES.items():
+            values = IndicatorValues.from_mapping(compute_indicators_from_frame(hist))
+            scores[ticker] = confidence_score(INFOS[ticker], values.ma50, values.ma200, values.rsi)
+        # Ties are broken by position in the universe.
+        return sorted(scores, key=lambda ticker: -scores[ticker]), scores
+
+    def test_top_k_matches_full_ranking(self):
+        universe = list(HISTORIES) + ["MISSING"]
+        results, counts = scan_universe(universe, history_dir=self.tmp.name, fundamentals=self.fundamentals,
+                                        top_k=7, period="max", workers=2, shard_size=5, progress=False)
+        order, scores = self.expected()
+        self.assertEqual([result.ticker for result in results], order[:7])
+        self.assertEqual([result.confidence for result in results], [scores[t] for t in order[:7]])
+        self.assertEqual(counts, {"scanned": 25, "no_data": 1, "failed": 0})
+
+        values = IndicatorValues.from_mapping(compute_indicators_from_frame(HISTORIES[results[0].ticker]))
+        self.assertEqual(results[0].indicators, values)
+
+
+if __name__ == '__main__':
+    unittest.main()
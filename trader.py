@@ -1,76 +1,169 @@
-import yfinance as yf
-from datetime import datetime
+import math
 import textwrap
-from tabulate import tabulate
+import time
 
-# Imports from other project modules
-from gemini_client import get_swing_stocks, prompt_gemini_for_analysis
+# Imports from other project modules. Modules that pull in pandas, NumPy,
+# yfinance or tabulate are imported where they are used, so that quick
+# invocations such as the sell-price calculation start fast.
+from analysis_records import AnalysisResult, NO_DATA
+from concurrent_analysis import RateLimiter
+from context_builder import TradingContextBuilder, estimate_tokens
+from gemini_client import get_default_client, prompt_gemini_for_analysis
+from history_cache import HistoryCache, get_default_cache, set_default_cache
+from price_monitor import JsonLinesSink, PriceMonitor, poll_quote_feed, print_sink, replay_feed
+from quote_service import get_default_quote_service
 from stock_analyzer import StockAnalyzer
 
-def analyze_watchlist(tickers: list) -> dict:
-    """Analyzes a list of stock tickers using the StockAnalyzer class."""
+COMPACT_PROMPT_TEMPLATE = textwrap.dedent("""
+You are a Senior Portfolio Manager at a quant fund. Propose high-probability swing trades from the data below.
+
+[START CONTEXT AND DATA]
+{context}
+[END CONTEXT AND DATA]
+
+The PROPRIETARY ANALYSIS DATA is a '|'-separated table, one row per ticker: Price is the current price, Confidence is our proprietary score (weight it heavily), MA50/MA200 are moving averages, RSI is the 14-day RSI, MACD/Signal are the MACD and its signal line, BBUpper/BBLower are Bollinger Bands, OBV is on-balance volume, Stoch is the stochastic oscillator. NA means unavailable.
+Hard filters: Price > MA50 and RSI < 70.
+Output only a table with these columns, nothing else:
+Ticker | Action | Entry Range | Stop Loss | Profit Target | Profitability Chance | Thesis
+Stop Loss and Profit Target include the % change from entry, e.g. "$250.00 (-10%)". Profitability Chance is the % chance of reaching the target before the stop. Thesis is <= 20 words citing the data, or states why a stock fails the filters.
+""").strip()
+
+def analyze_watchlist(tickers: list, batch: bool = False) -> dict:
+    """
+    Analyzes a list of stock tickers using the StockAnalyzer class. With
+    batch=True, all tickers are downloaded in one request and their indicators
+    computed panel-wide instead.
+    """
+    if batch:
+        from batch_analyzer import analyze_batch
+
+        return analyze_batch(tickers)
+
     analysis_results = {}
     for ticker in tickers:
-        try:
-            analyzer = StockAnalyzer(ticker)
-            tech_indicators = analyzer.get_technical_indicators()
-            confidence = analyzer.get_confidence_score()
-            
-            if isinstance(tech_indicators, dict):
-                analysis_results[ticker] = {
-                    "Technical Indicators": tech_indicators,
-                    "Confidence Score": confidence
-                }
-                print(f"  - Analysis for {ticker}: Success")
-            else:
-                analysis_results[ticker] = {
-                    "Technical Indicators": "Data not available",
-                    "Confidence Score": "N/A"
-                }
-                print(f"  - Analysis for {ticker}: Failed (Insufficient data)")
-        except Exception as e:
-            analysis_results[ticker] = { "Technical Indicators": "Analysis failed", "Confidence Score": "N/A"}
-            print(f"  - Analysis for {ticker}: Error ({e})")
-            
+        result = StockAnalyzer(ticker).analyze()
+        if result.indicators is not None:
+            print(f"  - Analysis for {ticker}: Success")
+        elif result.error == NO_DATA:
+            result.confidence = math.nan
+            print(f"  - Analysis for {ticker}: Failed (Insufficient data)")
+        else:
+            print(f"  - Analysis for {ticker}: Error ({result.error})")
+        analysis_results[ticker] = result.format()
+
     return analysis_results
 
-def generate_trading_context(target_stocks: list, live_prices: dict, analysis_data: dict) -> str:
-    """Creates a detailed context string for the AI to process."""   
-    # Basic portfolio snapshot
-    nav = 10000.00
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    watchlist_with_prices = [f"{ticker} (Current Price: ${live_prices.get(ticker, 0):.2f})" for ticker in target_stocks]
+def analyze_candidate(ticker: str) -> AnalysisResult:
+    """Computes the confidence score and technical indicators used to filter a candidate."""
+    return StockAnalyzer(ticker).analyze()
 
-    portfolio_string = (
-        f"PORTFOLIO SNAPSHOT (Timestamp: {timestamp} UTC)\n"
-        f"Net Asset Value (NAV): ${nav:,.2f}\n"
-        f"Cash: ${nav:,.2f} (100%)\n"
-        f"Watchlist: {', '.join(watchlist_with_prices)}"
-    )
+# The confidence score (in percent) a candidate needs to make the final list.
+MIN_CONFIDENCE = 85.0
+
+def is_qualified_candidate(candidate: AnalysisResult, min_confidence: float = MIN_CONFIDENCE) -> bool:
+    """Returns True if a candidate clears the confidence cutoff and has technical data."""
+    return candidate.ok and candidate.confidence >= min_confidence
 
-    # Add the detailed analysis section
-    analysis_string = "\n\n[START PROPRIETARY ANALYSIS DATA]\n"
-    for ticker in target_stocks:
-        analysis_string += f"--- Analysis for {ticker} ---\n"
-        data = analysis_data.get(ticker, {})
-        analysis_string += f"Confidence Score: {data.get('Confidence Score', 'N/A')}\n"
-        indicators = data.get('Technical Indicators')
-        if isinstance(indicators, dict):
-            for key, value in indicators.items():
-                analysis_string += f"- {key}: {value}\n"
-        else:
-            analysis_string += f"- Technical Indicators: {indicators}\n"
-        analysis_string += "\n"
-    analysis_string += "[END PROPRIETARY ANALYSIS DATA]\n"
-    
-    return portfolio_string + analysis_string
+def fetch_live_price(ticker: str) -> float:
+    """Returns the last price of a ticker from the shared quote service."""
+    return get_default_quote_service().get_quote(ticker)
 
-def create_trading_prompt(context: str) -> str:
+def build_analysis_pipeline(watchlist, max_stocks: int = 5, workers: int = 8, rate: float = None,
+                            timeout: float = 30.0, analyze=analyze_candidate,
+                            price_fetcher=fetch_live_price):
+    """
+    Builds steps 1-3 of a run as one pipeline: tickers stream from the
+    watchlist into the analysis stage as they arrive, and each ticker that
+    qualifies has its live price fetched straight away. Analysis results are
+    released in watchlist order, and once `max_stocks` tickers have qualified
+    the rest of the watchlist is cancelled, as the sequential flow did.
+    A ticker is announced as added once it has its live price, and analyses
+    still running when the pipeline finishes report nothing.
+
+    The pipeline's results are (ticker, candidate, live_price) tuples.
+    """
+    from pipeline import Pipeline, Stage
+
+    limiter = RateLimiter(rate) if rate else None
+
+    def analysis_stage(ticker):
+        if limiter is not None:
+            limiter.acquire()
+        candidate = analyze(ticker)
+        if is_qualified_candidate(candidate):
+            return ticker, candidate
+        if pipeline.finished:
+            return None
+
+        # Report why the candidate fell short
+        if candidate.error is not None and candidate.error != NO_DATA:
+            print(f"  - Skipping {ticker} ({candidate.error})")
+            return None
+        if math.isnan(candidate.confidence):
+            print(f"  - Skipping {ticker} (No confidence score)")
+        elif candidate.confidence < MIN_CONFIDENCE:
+            print(f"  - Skipping {ticker} (Confidence: {candidate.format_confidence()} < {MIN_CONFIDENCE:.0f}%)")
+        else:
+            print(f"  - Skipping {ticker} (Insufficient technical data)")
+        return None
+
+    def live_price_stage(entry):
+        ticker, candidate = entry
+        live_price = price_fetcher(ticker)
+        if not pipeline.finished:
+            print(f"  + Adding {ticker} to final list (Confidence: {candidate.format_confidence()})")
+        return ticker, candidate, live_price
+
+    pipeline = Pipeline(watchlist, [
+        Stage("analysis", analysis_stage, workers=workers, ordered=True, limit=max_stocks, timeout=timeout,
+              on_error=lambda ticker, e: print(f"  - Skipping {ticker} (Analysis failed: {e})")),
+        Stage("live_price", live_price_stage, workers=4, ordered=True, timeout=timeout,
+              on_error=lambda entry, e: print(f"  - Dropping {entry[0]} (Could not fetch live price: {e})")),
+    ])
+    return pipeline
+
+def generate_trading_context(target_stocks: list, live_prices: dict, analysis_data: dict,
+                             compact: bool = False, token_budget: int = None, nav: float = 10000.00,
+                             cash: float = None, risk=None) -> str:
+    """
+    Creates a detailed context string for the AI to process. With compact=True
+    the analysis is encoded as one table row per ticker, and with a token
+    budget, values are rounded and low-value indicators dropped to fit it.
+    The portfolio is all cash unless its NAV, cash and RiskSummary are given.
+    """
+    return TradingContextBuilder(compact=compact, token_budget=token_budget, nav=nav, cash=cash, risk=risk).build(
+        target_stocks, live_prices, analysis_data)
+
+def portfolio_snapshot(positions: str, cash: float, watchlist: list):
+    """
+    Values the open positions in a CSV file at live prices and measures their
+    risk, returning (nav, cash, risk). Without positions, the portfolio is
+    all cash.
+    """
+    if not positions:
+        return cash, cash, None
+
+    from portfolio_tracker import PortfolioTracker
+    from risk import RiskModel, load_closes
+
+    tracker = PortfolioTracker.from_csv(positions)
+    tracker.cash = cash  # the balance left after the positions were bought
+    tracker.update_prices(get_default_quote_service().get_quotes(list(tracker.portfolio)))
+    model = RiskModel.from_prices(load_closes(list(tracker.portfolio) + list(watchlist)))
+    return tracker.nav, tracker.cash, model.summary(tracker.exposures(), watchlist=watchlist,
+                                                    positions=tracker.portfolio)
+
+def create_trading_prompt(context: str, compact: bool = False) -> str:
     """
     Constructs the final prompt for Gemini, instructing it to use the
-    provided proprietary analysis and add a profitability estimate.
+    provided proprietary analysis and add a profitability estimate. With
+    compact=True, a condensed version of the instructions is used that also
+    explains the columns of a compact context.
     """
-    
+    if compact:
+        # Formatted after dedenting, so the context's lines do not defeat the dedent.
+        return COMPACT_PROMPT_TEMPLATE.format(context=context)
+
     prompt_template = textwrap.dedent(f"""
     System Instructions
     You are a Senior Portfolio Manager at an elite quant fund. Your task is to synthesize the provided proprietary analysis with your own market knowledge to propose high-probability trade setups.
@@ -99,6 +192,8 @@ def create_trading_prompt(context: str) -> str:
 
 def parse_and_print_response(response_text: str):
     """Parses the Gemini response text and prints it as a formatted table."""
+    from tabulate import tabulate
+
     print("\n" + "="*50)
     print("               Final Trade Plan")
     print("="*50)
@@ -130,15 +225,60 @@ def parse_and_print_response(response_text: str):
     print("="*50 + "\n")
 
 
-if __name__ == "__main__":
-    import argparse
+def main(args):
+    """Runs the command selected by the parsed command-line arguments."""
+    if args.history_dir:
+        from history_store import HistoryStore
+        from resampling import MultiTimeframeHistory
 
-    parser = argparse.ArgumentParser(description="Stock Trading Bot")
-    parser.add_argument("ticker", type=str, nargs="?", help="Stock ticker symbol (e.g., AAPL)")
-    parser.add_argument("price", type=float, nargs="?", help="Purchase price of the stock")
-    args = parser.parse_args()
+        # Weekly, monthly and intraday timeframes are resampled from the stored bars
+        history = MultiTimeframeHistory(HistoryStore(args.history_dir))
+        set_default_cache(HistoryCache(history_fetcher=history.history))
+    if args.cube:
+        from price_cube import PriceCube
+
+        set_default_cache(HistoryCache(history_fetcher=PriceCube.open(args.cube).history_fetcher))
+
+    if args.monitor:
+        # Watch the stop-loss and take-profit levels of open positions
+        from portfolio_tracker import PortfolioTracker
 
-    if args.ticker and args.price:
+        tracker = PortfolioTracker.from_csv(args.positions) if args.positions else PortfolioTracker()
+        if args.ticker and args.price:
+            tracker.add_position(args.ticker, 1, args.price)
+        if not tracker.portfolio:
+            print("No open positions to monitor. Pass --positions or a ticker and purchase price.")
+            return
+
+        sink = JsonLinesSink(args.events)
+        monitor = PriceMonitor(sinks=[print_sink, sink])
+        monitor.load_tracker(tracker)
+        print(f"Monitoring {len(monitor.positions)} positions in {len(tracker.portfolio)} stocks "
+              f"(alerts are appended to {args.events})...")
+        if args.feed:
+            feed = replay_feed(args.feed)
+        else:
+            feed = poll_quote_feed(get_default_quote_service(), list(tracker.portfolio), args.poll_interval)
+        try:
+            monitor.run(feed)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sink.close()
+        print(f"Monitor stopped: {monitor.latency_report()}")
+    elif args.scan:
+        # Rank a whole universe and plan trades for the best stocks
+        from pipeline import timed_step
+
+        run_start = time.perf_counter()
+        stage_stats = []
+        with timed_step(stage_stats, "scan"):
+            filtered_stocks, live_prices, analysis_data = scan_for_candidates(args)
+        if len(filtered_stocks) < 3:
+            print("\nCould not find at least 3 high-probability stocks. Exiting.")
+            return
+        plan_trades(args, filtered_stocks, live_prices, analysis_data, stage_stats, run_start)
+    elif args.ticker and args.price:
         # If ticker and price are provided, calculate sell prices
         analyzer = StockAnalyzer(args.ticker)
         sell_prices = analyzer.get_sell_prices(args.price)
@@ -146,80 +286,166 @@ if __name__ == "__main__":
         print(f"  - Stop Loss: {sell_prices['stop_loss']}")
         print(f"  - Take Profit: {sell_prices['take_profit']}")
     else:
-        # Original functionality
-        # 1. Get watchlist from Gemini
-        print("STEP 1: Asking Gemini for 25 potential swing trade stocks...")
-        initial_watchlist = get_swing_stocks()
-        print("-" * 50)
-
-        # 2. Filter and Analyze the watchlist
-        print("STEP 2: Filtering and analyzing watchlist with local tools...")
-
-        filtered_stocks = []
-        analysis_data = {}
-
-        for ticker in initial_watchlist:
-            if len(filtered_stocks) >= 5:
-                print("\n  > Analysis complete. Found 5 suitable stocks.")
-                break
-
-            analyzer = StockAnalyzer(ticker)
-
-            # Check for high-profitability chance
-            confidence_str = analyzer.get_confidence_score()
-            try:
-                confidence_val = float(confidence_str.strip('%'))
-                if confidence_val < 85.0:
-                    print(f"  - Skipping {ticker} (Confidence: {confidence_str} < 85%)")
-                    continue
-            except (ValueError, TypeError):
-                print(f"  - Skipping {ticker} (Could not parse confidence score)")
-                continue
-
-            # Check technical indicators
-            tech_indicators = analyzer.get_technical_indicators()
-            if not isinstance(tech_indicators, dict):
-                print(f"  - Skipping {ticker} (Insufficient technical data)")
-                continue
-
-            # Add to filtered list
-            print(f"  + Adding {ticker} to final list (Confidence: {confidence_str})")
-            filtered_stocks.append(ticker)
-            analysis_data[ticker] = {
-                "Technical Indicators": tech_indicators,
-                "Confidence Score": confidence_str
-            }
+        # Original functionality, run as a pipeline so that steps 1-3 overlap
+        from pipeline import format_stage_report
+
+        run_start = time.perf_counter()
+        print("STEPS 1-3: Streaming Gemini's swing trade watchlist through local analysis and live prices...")
+        pipeline = build_analysis_pipeline(
+            get_default_client().iter_swing_stocks(),
+            max_stocks=args.max_stocks,
+            workers=args.workers,
+            rate=args.rate,
+            timeout=args.timeout,
+        )
+        results = pipeline.run_sync()
+        stage_stats = list(pipeline.stats)
+
+        filtered_stocks = [ticker for ticker, _, _ in results]
+        analysis_data = {ticker: candidate for ticker, candidate, _ in results}
+        live_prices = {ticker: price for ticker, _, price in results}
+
+        if len(filtered_stocks) >= args.max_stocks:
+            print(f"\n  > Analysis complete. Found {args.max_stocks} suitable stocks.")
 
         if len(filtered_stocks) < 3:
             print("\nCould not find at least 3 high-probability stocks. Exiting.")
-            exit()
+            print(format_stage_report(stage_stats, time.perf_counter() - run_start))
+            return
 
-        print(f"\nFinal Watchlist: {', '.join(filtered_stocks)}")
-        print("-" * 50)
+        plan_trades(args, filtered_stocks, live_prices, analysis_data, stage_stats, run_start)
 
-        # 3. Fetch live prices
-        print("STEP 3: Fetching live market prices...")
-        try:
-            data = yf.download(tickers=filtered_stocks, period='2d', interval='1m', progress=False, auto_adjust=True)
-            live_prices = data['Close'].iloc[-1].to_dict()
-            print("  - Success: Live prices fetched.")
-        except Exception as e:
-            print(f"  - Error: Could not fetch live prices: {e}. Exiting.")
-            exit()
-        print("-" * 50)
-
-        # 4. Generate context
-        print("STEP 4: Generating full context for Gemini...")
-        full_context = generate_trading_context(filtered_stocks, live_prices, analysis_data)
-
-        # 5. Create prompt
-        print("STEP 5: Constructing final, detailed prompt...")
-        analysis_prompt = create_trading_prompt(full_context)
-        print("-" * 50)
-
-        # 6. Send to Gemini
-        print("STEP 6: Sending final prompt to Gemini for trade plan...")
+
+def scan_for_candidates(args):
+    """
+    Ranks the universe in `args.scan` by confidence score and returns the
+    best qualifying tickers with their analyses and live prices.
+    """
+    from fundamentals import FundamentalsSnapshot
+    from universe_scan import format_ranking, read_ticker_list, scan_universe
+
+    tickers = read_ticker_list(args.scan)
+    print(f"STEP 1: Scanning {len(tickers):,} tickers from {args.scan}...")
+    results, counts = scan_universe(
+        tickers,
+        history_dir=args.history_dir,
+        fundamentals=FundamentalsSnapshot(path=args.fundamentals),
+        top_k=args.top_k,
+        workers=args.scan_workers,
+        refresh=args.refresh,
+    )
+    print(f"  > Scanned {counts['scanned']:,} tickers ({counts['no_data']:,} without data, "
+          f"{counts['failed']:,} failed).")
+    print(format_ranking(results))
+
+    print("STEPS 2-3: Selecting the highest-confidence stocks and fetching live prices...")
+    selected = [result for result in results if is_qualified_candidate(result)][:args.max_stocks]
+    live_prices = get_default_quote_service().get_quotes([result.ticker for result in selected])
+    selected = [result for result in selected if result.ticker in live_prices]
+    return [result.ticker for result in selected], live_prices, {result.ticker: result for result in selected}
+
+
+def plan_trades(args, filtered_stocks, live_prices, analysis_data, stage_stats, run_start):
+    """Runs steps 4-7: builds the context and prompt, requests the trade plan and prints it."""
+    from pipeline import format_stage_report, timed_step
+
+    print(f"\nFinal Watchlist: {', '.join(filtered_stocks)}")
+    print("-" * 50)
+
+    # 4. Generate context
+    print("STEP 4: Generating full context for Gemini...")
+    with timed_step(stage_stats, "risk"):
+        nav, cash, risk = portfolio_snapshot(args.positions, args.cash, filtered_stocks)
+    with timed_step(stage_stats, "context"):
+        builder = TradingContextBuilder(compact=args.compact, token_budget=args.token_budget,
+                                        nav=nav, cash=cash, risk=risk)
+        full_context = builder.build(filtered_stocks, live_prices, analysis_data)
+    dropped = [ticker for ticker in filtered_stocks if ticker not in builder.included]
+    if dropped:
+        print(f"  ! Left out to fit the {args.token_budget:,}-token budget: {', '.join(dropped)}")
+
+    # 5. Create prompt
+    print("STEP 5: Constructing final, detailed prompt...")
+    with timed_step(stage_stats, "prompt"):
+        analysis_prompt = create_trading_prompt(full_context, compact=args.compact)
+    print(f"  - Estimated prompt size: ~{estimate_tokens(analysis_prompt):,} tokens "
+          f"({len(builder.included)} stocks)")
+    print("-" * 50)
+
+    # 6. Send to Gemini
+    print("STEP 6: Sending final prompt to Gemini for trade plan...")
+    with timed_step(stage_stats, "trade_plan"):
         final_response_text = prompt_gemini_for_analysis(analysis_prompt)
 
-        # 7. Parse and print final result
-        parse_and_print_response(final_response_text)
+    # 7. Parse and print final result
+    parse_and_print_response(final_response_text)
+    print("Stage timings:")
+    print(format_stage_report(stage_stats, time.perf_counter() - run_start))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stock Trading Bot")
+    parser.add_argument("ticker", type=str, nargs="?", help="Stock ticker symbol (e.g., AAPL)")
+    parser.add_argument("price", type=float, nargs="?", help="Purchase price of the stock")
+    parser.add_argument("--workers", type=int, default=8, help="Number of tickers analyzed concurrently")
+    parser.add_argument("--rate", type=float, default=None, help="Maximum ticker analyses started per second")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds before a single ticker analysis is abandoned")
+    parser.add_argument("--history-dir", type=str, help="Directory of a local OHLCV store to serve price history from")
+    parser.add_argument("--cube", type=str, help="Directory of a price cube to serve daily history from")
+    parser.add_argument("--monitor", action="store_true",
+                        help="Watch stop-loss and take-profit levels of open positions until they are all hit")
+    parser.add_argument("--positions", type=str,
+                        help="CSV of open positions (ticker,shares,purchase_price) to monitor, or to value and "
+                             "measure the risk of in the trade-plan context")
+    parser.add_argument("--cash", type=float, default=10000.00,
+                        help="Cash balance of the portfolio, excluding the open positions (default: 10000)")
+    parser.add_argument("--feed", type=str, help="CSV of (timestamp,ticker,price) ticks to replay instead of polling quotes")
+    parser.add_argument("--poll-interval", type=float, default=15.0, help="Seconds between quote polls in monitor mode")
+    parser.add_argument("--events", type=str, default="monitor_events.jsonl",
+                        help="JSON-lines file that monitor alerts are appended to")
+    parser.add_argument("--max-stocks", type=int, default=5, help="Number of qualifying stocks sent for analysis")
+    parser.add_argument("--compact", action="store_true", help="Send the analysis as a compact table, one row per ticker")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help="Round or drop low-value indicators so the context fits this many tokens")
+    parser.add_argument("--scan", type=str,
+                        help="File of ticker symbols to rank by confidence score instead of asking Gemini for a watchlist")
+    parser.add_argument("--top-k", type=int, default=20, help="Number of best-ranked tickers reported by --scan")
+    parser.add_argument("--scan-workers", type=int, default=None, help="Worker processes for --scan (default: all cores)")
+    parser.add_argument("--fundamentals", type=str, default="fundamentals_snapshot.pkl",
+                        help="Snapshot file of fundamentals used by --scan")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Let --scan download stale history and fundamentals instead of reading only cached data")
+    parser.add_argument("--profile", type=str,
+                        help="Record timings, call counters and cache hit rates, and write a Chrome trace JSON here")
+    parser.add_argument("--cprofile", type=str, help="Also write cProfile statistics to this file")
+    args = parser.parse_args()
+
+    recorder = profiler = None
+    if args.profile:
+        from instrumentation import enable
+
+        recorder = enable()
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        main(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            print(f"cProfile stats written to {args.cprofile}")
+        if recorder is not None:
+            recorder.register_cache("history_cache.history", get_default_cache().history)
+            recorder.register_cache("history_cache.info", get_default_cache().info)
+            recorder.register_cache("quotes", get_default_quote_service().quotes)
+            if get_default_client().cache is not None:
+                recorder.register_cache("gemini.response_cache", get_default_client().cache)
+            recorder.write_trace(args.profile)
+            print("Run profile:")
+            print(recorder.report())
+            print(f"Trace written to {args.profile} (open it in chrome://tracing or ui.perfetto.dev)")
@@ -0,0 +1,199 @@
+"""
+Universe scans: rank thousands of tickers by confidence score.
+
+The ticker list is split into shards that are analyzed on a process pool.
+Each worker reads price history from a local HistoryStore and takes the
+fundamentals it needs from the parent's FundamentalsSnapshot, so a scan over
+a store and snapshot filled earlier makes no network requests. (Without a
+store, workers download history through the HistoryCache instead.) Workers keep only the best `top_k`
+results of their shard, and the parent merges them into the global top-k
+with a bounded heap as shards finish, printing progress as it goes.
+"""
+import csv
+import heapq
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from analysis_records import AnalysisResult, FAILED, IndicatorValues, NO_DATA
+from stock_analyzer import confidence_score
+
+# The fundamentals read by confidence_score().
+INFO_FIELDS = ("trailingPE", "forwardPE", "dividendYield")
+
+_worker_store = None
+_worker_period = "1y"
+_worker_refresh = False
+
+
+def read_ticker_list(path):
+    """
+    Reads a ticker universe from a text file with one symbol per line, or
+    from a CSV file with a "Symbol" or "Ticker" column. Blank lines and lines
+    starting with "#" are skipped, and duplicates are dropped, keeping the
+    first occurrence.
+    """
+    with open(path, newline="") as f:
+        lines = [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    if lines and "," in lines[0]:
+        rows = list(csv.DictReader(lines))
+        names = {name.strip().lower(): name for name in rows[0]} if rows else {}
+        column = names.get("symbol") or names.get("ticker")
+        if column is None:
+            raise ValueError(f"{path} has no Symbol or Ticker column")
+        symbols = [row[column] for row in rows]
+    else:
+        symbols = lines
+    return list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol and symbol.strip()))
+
+
+def shard_tickers(tickers, shard_size):
+    """Splits the universe into (start position, tickers) shards of at most `shard_size` tickers."""
+    return [(start, tickers[start:start + shard_size]) for start in range(0, len(tickers), shard_size)]
+
+
+def _info(row):
+    """Converts a fundamentals row into the info dict confidence_score() expects, leaving out missing values."""
+    return {field: float(row[field]) for field in INFO_FIELDS
+            if row.get(field) is not None and not math.isnan(row[field])}
+
+
+def _init_worker(history_dir, period, refresh):
+    global _worker_store, _worker_period, _worker_refresh
+    if history_dir:
+        from history_store import HistoryStore
+
+        _worker_store = HistoryStore(history_dir)
+    _worker_period = period
+    _worker_refresh = refresh
+
+
+def _indicator_values(ticker):
+    from indicator_kernel import compute_indicators, compute_indicators_from_frame
+
+    if _worker_store is None:
+        from history_cache import get_default_cache
+
+        hist = get_default_cache().get_history(ticker, period=_worker_period)
+        return IndicatorValues.from_mapping(compute_indicators_from_frame(hist)) if not hist.empty else None
+
+    bars = _worker_store.bars(ticker, period=_worker_period, refresh=_worker_refresh)
+    if not len(bars):
+        return None
+    return IndicatorValues.from_mapping(compute_indicators(
+        bars["Close"], high=bars["High"], low=bars["Low"], volume=bars["Volume"], last_only=True))
+
+
+def analyze_ticker(ticker, info):
+    """Analyzes one ticker from cached history, matching StockAnalyzer.analyze()."""
+    try:
+        values = _indicator_values(ticker)
+    except Exception as e:
+        return AnalysisResult(ticker, error=f"{FAILED}: {e}")
+    if values is None:
+        return AnalysisResult(ticker, confidence_score(info), error=NO_DATA)
+    return AnalysisResult(ticker, confidence_score(info, values.ma50, values.ma200, values.rsi), values)
+
+
+def _keep(heap, entry, top_k):
+    """Adds an entry to a min-heap holding at most `top_k` of the largest entries."""
+    if len(heap) < top_k:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+
+def scan_shard(shard, infos, top_k):
+    """
+    Analyzes one shard and returns its best `top_k` results with a count of
+    scanned, unavailable and failed tickers.
+
+    Results are ranked by confidence score, and ties go to the ticker that
+    comes first in the universe. Tickers without indicators are not ranked.
+
+    Returns:
+        tuple: (entries, counts), where entries are (confidence, -position, ticker, result) tuples.
+    """
+    start, tickers = shard
+    heap = []
+    counts = {"scanned": 0, "no_data": 0, "failed": 0}
+    for position, ticker in enumerate(tickers, start):
+        result = analyze_ticker(ticker, infos.get(ticker, {}))
+        counts["scanned"] += 1
+        if result.ok:
+            _keep(heap, (result.confidence, -position, ticker, result), top_k)
+        elif result.error == NO_DATA:
+            counts["no_data"] += 1
+        else:
+            counts["failed"] += 1
+    return heap, counts
+
+
+def scan_universe(tickers, history_dir=None, fundamentals=None, top_k=20, period="1y", workers=None,
+                  shard_size=100, refresh=False, progress=True):
+    """
+    Analyzes every ticker of a universe on a process pool and returns the
+    `top_k` best by confidence score.
+
+    Args:
+        tickers (list): The universe, e.g. from read_ticker_list().
+        history_dir (str): The root of a HistoryStore holding the price history. Without
+            one, each worker downloads history through its own HistoryCache.
+        fundamentals (FundamentalsSnapshot): The source of the fundamental factors.
+        top_k (int): The number of results to return.
+        period (str): The history each analysis is computed on.
+        workers (int): The number of worker processes (defaults to all cores).
+        shard_size (int): Tickers analyzed per task.
+        refresh (bool): Bring stale history and fundamentals up to date first. Otherwise
+            only the fundamentals snapshot and the history store are read, and tickers
+            without stored history are skipped. Without a `history_dir`, history is
+            downloaded either way.
+        progress (bool): Print progress as shards finish.
+
+    Returns:
+        tuple: (results, counts), where results are the top AnalysisResults, best first,
+        and counts holds the number of tickers scanned, without data and failed.
+    """
+    from fundamentals import FundamentalsSnapshot
+
+    tickers = list(dict.fromkeys(tickers))
+    fundamentals = fundamentals if fundamentals is not None else FundamentalsSnapshot()
+    table = fundamentals.get(tickers) if refresh else fundamentals.table.reindex(tickers)
+    infos = {ticker: _info(row) for ticker, row in zip(tickers, table.to_dict("records"))}
+
+    shards = shard_tickers(tickers, shard_size)
+    heap = []
+    counts = {"scanned": 0, "no_data": 0, "failed": 0}
+    started = time.perf_counter()
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(history_dir, period, refresh)) as executor:
+        pending = {executor.submit(scan_shard, shard, {t: infos[t] for t in shard[1]}, top_k)
+                   for shard in shards}
+        while pending:
+            completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                entries, shard_counts = future.result()
+                for entry in entries:
+                    _keep(heap, entry, top_k)
+                for name, value in shard_counts.items():
+                    counts[name] += value
+            if progress:
+                elapsed = time.perf_counter() - started
+                leader = max(heap) if heap else None
+                best = f", best: {leader[2]} ({leader[0]:.2f}%)" if leader else ""
+                print(f"  - {counts['scanned']}/{len(tickers)} tickers scanned "
+                      f"({counts['scanned'] / elapsed:,.0f}/s){best}", flush=True)
+
+    return [entry[3] for entry in sorted(heap, reverse=True)], counts
+
+
+def format_ranking(results):
+    """Formats scan results as a ranked table of confidence scores and key indicators."""
+    lines = [f"{'Rank':>4}  {'Ticker':<8} {'Confidence':>10} {'50-Day MA':>10} {'200-Day MA':>10} {'RSI (14)':>8}"]
+    for rank, result in enumerate(results, 1):
+        values = result.indicators
+        lines.append(f"{rank:>4}  {result.ticker:<8} {result.format_confidence():>10} "
+                     f"{values.ma50:>10.2f} {values.ma200:>10.2f} {values.rsi:>8.2f}")
+    return "\n".join(lines)